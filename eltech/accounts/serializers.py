@@ -3,19 +3,22 @@ from rest_framework import serializers
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
-from django.core.mail import send_mail
 from django.urls import reverse
 from django.conf import settings
 
+from core.outbox import enqueue_email
+from core.serializers import SrcsetField
+
 
 User = get_user_model()
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for the user object"""
+    profile_picture_srcset = SrcsetField()
 
     class Meta:
         model = User
-        fields = ('email', 'password', 'mobile_phone', 'profile_picture',
+        fields = ('email', 'password', 'mobile_phone', 'profile_picture', 'profile_picture_srcset',
                   'birth_date', 'country', 'is_subscribed', 'first_name', 'last_name',
                   'facebook_profile', 'instagram_profile', 'twitter_profile')
         extra_kwargs = {
@@ -39,8 +42,8 @@ class UserSerializer(serializers.ModelSerializer):
         from_email = '0eltech0@gmail.com'
         recipient_list = [user.email]
 
-        # Send email
-        send_mail(subject, message, from_email, recipient_list)
+        # Queue email, the outbox worker sends it
+        enqueue_email(subject, message, from_email, recipient_list)
 
         return user
 
@@ -6,6 +6,7 @@ app_name = 'accounts'
 urlpatterns = [
     path('create/', views.CreateUserView.as_view(), name='create'),
     path('token/', views.CreateTokenView.as_view(), name='token'),
+    path('logout/', views.LogoutView.as_view(), name='logout'),
     path('me/', views.ManageUserView.as_view(), name='me'),
     path('verify-email/<uidb64>/<token>/', views.VerifyEmailView.as_view(), name='verify-email'),
     path('password-reset/', views.PasswordResetRequestView.as_view(), name='password-reset-request'),
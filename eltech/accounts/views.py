@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
@@ -19,10 +19,15 @@ from django.utils.encoding import force_bytes
 from django.utils.http import urlsafe_base64_encode
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.utils.http import urlsafe_base64_decode
-from django.core.mail import send_mail
+
+from core.authentication import CachedTokenAuthentication
+from core.throttling import AccountRateThrottle, LoginFailureThrottle
+from core.outbox import enqueue_email
 
 from rest_framework import status, views
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from rest_framework.throttling import ScopedRateThrottle
 from rest_framework.views import APIView
 
 import logging
@@ -35,6 +40,8 @@ class CreateUserView(generics.CreateAPIView):
     """Create a new user in the system"""
 
     serializer_class = UserSerializer
+    throttle_classes = [ScopedRateThrottle, AccountRateThrottle]
+    throttle_scope = 'signup'
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -71,13 +78,34 @@ class CreateTokenView(ObtainAuthToken):
 
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    throttle_classes = [LoginFailureThrottle, ScopedRateThrottle, AccountRateThrottle]
+    throttle_scope = 'login'
+
+    def post(self, request, *args, **kwargs):
+        try:
+            return super().post(request, *args, **kwargs)
+        except ValidationError:
+            LoginFailureThrottle().record_failure(request)
+            raise
+
+
+class LogoutView(APIView):
+    """Delete the auth token of the authenticated user"""
+
+    authentication_classes = (CachedTokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def post(self, request):
+        # deleting the token also drops it from the auth cache
+        request.auth.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
 
 
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
 
     serializer_class = UserSerializer
-    authentication_classes = (authentication.TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_object(self):
@@ -109,6 +137,8 @@ class VerifyEmailView(APIView):
 class PasswordResetRequestView(generics.GenericAPIView):
     permission_classes = []
     serializer_class = PasswordResetRequestSerializer
+    throttle_classes = [ScopedRateThrottle, AccountRateThrottle]
+    throttle_scope = 'password_reset'
 
 
     def post(self, request):
@@ -126,11 +156,11 @@ class PasswordResetRequestView(generics.GenericAPIView):
                     reverse('accounts:password-reset-confirm', args=[uid, token])
                 )
 
-                # Send email
+                # Queue email, the outbox worker sends it
                 subject = "Password Reset Requested"
                 message = f"Please follow this link to reset your password: {reset_link}"
                 from_email = None  # Use the DEFAULT_FROM_EMAIL from settings
-                send_mail(subject, message, from_email, [user.email])
+                enqueue_email(subject, message, from_email, [user.email])
 
         # Always return the same message whether the user exists or not
         # to prevent data leakage
@@ -158,6 +188,8 @@ class PasswordResetConfirmView(generics.GenericAPIView):
 class SubscribeView(APIView):
     permission_classes = []
     serializer_class = SubscribeSerializer
+    throttle_classes = [ScopedRateThrottle, AccountRateThrottle]
+    throttle_scope = 'subscribe'
 
     def post(self, request, *args, **kwargs):
         serializer = SubscribeSerializer(data=request.data)
@@ -0,0 +1,5 @@
+"""
+Benchmarks, run with the test runner so they get a throwaway database:
+
+    python manage.py test benchmarks --pattern="bench_*.py"
+"""
@@ -0,0 +1,69 @@
+"""Catalog reads through the WSGI viewsets and the async views under load"""
+
+import asyncio
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncClient, Client, TestCase, override_settings
+from django.urls import include, path
+
+from benchmarks.utils import create_products, measure, report
+from core import models
+from product import async_views
+
+CONCURRENCY = 20
+
+# the async views mounted where the viewsets are, see product/urls.py
+urlpatterns = [
+    path('api/product/products/', async_views.product_list),
+    path('api/product/products/<int:pk>/', async_views.product_detail),
+    path('api/product/categories/<int:pk>/', async_views.category_detail),
+    path('', include('eltech.urls')),
+]
+
+
+class AsyncCatalogBenchmark(TestCase):
+    """Compare requests served one by one with concurrent async ones."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email='bench@example.com', password='bench123',
+            mobile_phone='01000000000')
+        self.category = models.Category.objects.create(name='Category')
+        products = create_products(24, self.category)
+        for product in products:
+            models.ProductImage.objects.create(
+                product=product, is_thumbnail=True,
+                image=SimpleUploadedFile('p.jpg', b'', content_type='image/jpeg'))
+            models.ProductFeature.objects.create(product=product, feature='Fast')
+            models.Rating.objects.create(product=product, user=user, rating=4)
+            models.Review.objects.create(product=product, user=user, content='Good')
+
+        self.urls = {
+            'product list': '/api/product/products/',
+            'product detail': f'/api/product/products/{products[0].pk}/',
+            'category detail': f'/api/product/categories/{self.category.pk}/',
+        }
+
+    def _burst(self, url):
+        """Return a callable sending CONCURRENCY requests at once."""
+        client = AsyncClient()
+
+        async def send():
+            await asyncio.gather(*[client.get(url) for _ in range(CONCURRENCY)])
+        return async_to_sync(send)
+
+    def test_catalog_throughput(self):
+        client = Client()
+        rows = []
+        for name, url in self.urls.items():
+            queries, ms = measure(lambda: client.get(url))
+            rows.append((f'{name} WSGI viewset', queries, ms))
+
+            with override_settings(ROOT_URLCONF='benchmarks.bench_async'):
+                queries, ms = measure(self._burst(url), repeat=5)
+            rows.append((f'{name} async x{CONCURRENCY}',
+                         queries / CONCURRENCY, ms / CONCURRENCY))
+
+        report('Catalog reads, per request', rows)
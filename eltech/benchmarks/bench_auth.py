@@ -0,0 +1,56 @@
+"""Per-request cost of token authentication on cart and order endpoints"""
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from benchmarks.utils import create_products, measure, report
+from cart.views import CartViewSet
+from core import models
+from order.views import OrderViewSet
+
+ENDPOINTS = {
+    'cart': '/api/cart/carts/get_cart/',
+    'orders': '/api/order/orders/',
+}
+
+
+class TokenAuthenticationBenchmark(TestCase):
+    """Compare DRF token authentication with the cached one."""
+
+    def setUp(self):
+        cache.clear()
+        user = models.User.objects.create_user(
+            email='bench@example.com', password='bench123',
+            mobile_phone='01000000000')
+        token = Token.objects.create(user=user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+        products = create_products(3)
+        cart = models.Cart.objects.create(user=user)
+        order = models.Order.objects.create(user=user)
+        for product in products:
+            models.CartProduct.objects.create(cart=cart, product=product)
+            models.OrderProduct.objects.create(order=order, product=product)
+
+    def _get(self, url):
+        return lambda: self.client.get(url)
+
+    def test_authentication_cost(self):
+        rows = []
+        for name, url in ENDPOINTS.items():
+            with patch.object(CartViewSet, 'authentication_classes', [TokenAuthentication]), \
+                    patch.object(OrderViewSet, 'authentication_classes', [TokenAuthentication]):
+                queries, ms = measure(self._get(url))
+            rows.append((f'{name} TokenAuthentication', queries, ms))
+
+            queries, ms = measure(self._get(url))
+            rows.append((f'{name} CachedTokenAuthentication', queries, ms))
+
+        report('Token authentication per request', rows)
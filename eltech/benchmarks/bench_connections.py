@@ -0,0 +1,51 @@
+"""Per-request cost of opening database connections
+
+In-memory SQLite connections are never closed, run this one against
+PostgreSQL (the development settings) to see the handshake cost.
+"""
+
+import time
+
+from django.db import connections
+from django.test import TestCase
+
+from benchmarks.utils import report
+
+REQUESTS = 200
+
+
+class ConnectionLifecycleBenchmark(TestCase):
+    """Compare a new connection per request with persistent ones."""
+
+    def _serve(self, conn_max_age):
+        """Replay the connection handling of REQUESTS requests.
+
+        A separate wrapper on the test database goes through what
+        close_old_connections does at the start and end of a request.
+        """
+        settings_dict = {
+            **connections['default'].settings_dict,
+            'CONN_MAX_AGE': conn_max_age,
+            'CONN_HEALTH_CHECKS': True,
+        }
+        wrapper = connections['default'].__class__(settings_dict, alias='benchmark')
+        opened = 0
+        started = time.perf_counter()
+        for _ in range(REQUESTS):
+            wrapper.close_if_unusable_or_obsolete()
+            if wrapper.connection is None:
+                opened += 1
+            with wrapper.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            wrapper.close_if_unusable_or_obsolete()
+        elapsed = time.perf_counter() - started
+        wrapper.close()
+        return opened / REQUESTS, elapsed * 1000 / REQUESTS
+
+    def test_connection_lifecycle(self):
+        rows = []
+        for label, conn_max_age in [('CONN_MAX_AGE=0', 0), ('CONN_MAX_AGE=60', 60)]:
+            connects, ms = self._serve(conn_max_age)
+            rows.append((f'{label} ({connects:.2f} connects/request)', 1, ms))
+
+        report('Connection lifecycle, per request', rows)
@@ -0,0 +1,71 @@
+"""List serialization with the DRF serializers and the `.values()` based ones"""
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase
+
+from benchmarks.utils import create_products, measure, report
+from core import models
+from post.serializers import (
+    CommentSerializer,
+    FastCommentSerializer,
+    FastPostSerializer,
+    PostSerializer,
+)
+from product.serializers import FastProductSerializer, ProductSerializer
+
+ROWS = 500
+REPEAT = 10
+
+
+class FastSerializerBenchmark(TestCase):
+    """Compare serializing a large page of rows both ways."""
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(
+            email='user@example.com', password='bench123', mobile_phone='01000000000')
+        category = models.Category.objects.create(name='Category')
+        products = create_products(ROWS, category)
+        image = SimpleUploadedFile('p.jpg', b'', content_type='image/jpeg')
+        thumbnail = models.ProductImage.objects.create(
+            product=products[0], is_thumbnail=True, image=image)
+        models.ProductImage.objects.bulk_create([
+            models.ProductImage(product=product, is_thumbnail=True, image=thumbnail.image.name)
+            for product in products[1:]
+        ])
+        post = models.Post.objects.create(
+            title='Post', content='Content', image=image, user=user, category=category)
+        models.Post.objects.bulk_create([
+            models.Post(title=f'Post {i}', content='Content ' * 20, image=post.image.name,
+                        user=user, category=category)
+            for i in range(ROWS - 1)
+        ])
+        models.Comment.objects.bulk_create([
+            models.Comment(post=post, user=user, content='Comment ' * 10)
+            for _ in range(ROWS)
+        ])
+        self.context = {'request': RequestFactory().get('/')}
+
+    def test_list_serialization(self):
+        cases = [
+            ('products', ProductSerializer, FastProductSerializer,
+             models.Product.objects.with_thumbnail()),
+            ('posts', PostSerializer, FastPostSerializer,
+             models.Post.objects.select_related('user', 'category')),
+            ('comments', CommentSerializer, FastCommentSerializer,
+             models.Comment.objects.select_related('user')),
+        ]
+
+        rows = []
+        for name, serializer_class, fast_serializer_class, queryset in cases:
+            for label, serialize in [
+                ('serializer', lambda: serializer_class(
+                    queryset.all(), many=True, context=self.context).data),
+                ('fast serializer', lambda: fast_serializer_class(
+                    fast_serializer_class.values(queryset), context=self.context).data),
+            ]:
+                queries, ms = measure(serialize, REPEAT)
+                rows.append((
+                    f'{name} {label} ({ROWS * 1000 / ms:,.0f} rows/s)', queries, ms))
+
+        report(f'List serialization, {ROWS} rows per call', rows)
@@ -0,0 +1,63 @@
+"""JSON rendering of product payloads with DRF's renderer and the orjson one"""
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, TestCase
+
+from rest_framework.renderers import JSONRenderer
+
+from benchmarks.utils import create_products, report
+from core import models
+from core.renderers import FastJSONRenderer
+from product.serializers import ProductDetailSerializer
+
+REPEAT = 500
+
+
+def timed(func, repeat=REPEAT):
+    """Return ms per call of `func`."""
+    func()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+class RendererBenchmark(TestCase):
+    """Compare JSONRenderer with FastJSONRenderer."""
+
+    def setUp(self):
+        users = [
+            get_user_model().objects.create_user(
+                email=f'user{i}@example.com', password='bench123',
+                mobile_phone=f'0100000000{i}')
+            for i in range(10)
+        ]
+        products = create_products(100)
+        product = products[0]
+        for i in range(5):
+            models.ProductImage.objects.create(
+                product=product, is_thumbnail=i == 0,
+                image=SimpleUploadedFile(f'p{i}.jpg', b'', content_type='image/jpeg'))
+        for i in range(10):
+            models.ProductFeature.objects.create(product=product, feature=f'Feature {i}')
+        for i in range(50):
+            models.Rating.objects.create(product=product, user=users[i % 10], rating=i % 5 + 1)
+            models.Review.objects.create(
+                product=product, user=users[i % 10], content='Great laptop. ' * 10)
+
+        request = RequestFactory().get('/')
+        self.detail = ProductDetailSerializer(product, context={'request': request}).data
+        # native Decimal and datetime values, as returned by .values()
+        self.rows = list(models.Product.objects.values())
+
+    def test_renderers(self):
+        rows = []
+        for name, data in [('product detail', self.detail), ('100 product rows', self.rows)]:
+            for renderer in (JSONRenderer(), FastJSONRenderer()):
+                ms = timed(lambda: renderer.render(data))
+                rows.append((f'{name} {renderer.__class__.__name__}', 0, ms))
+
+        report('JSON rendering, per payload', rows)
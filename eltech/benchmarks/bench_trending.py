@@ -0,0 +1,65 @@
+"""Trending scores computed per product and in one aggregate query"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.test import TestCase
+from django.utils import timezone
+
+from benchmarks.utils import create_products, measure, report
+from core import models
+from core.trending import WEIGHTS, score_trending_products
+
+PRODUCTS = 4000
+DAYS = 7
+REPEAT = 1
+
+
+def score_per_product(today):
+    """The per-row ORM loop the job replaces."""
+    half_life = settings.TRENDING_HALF_LIFE_DAYS
+    for product in models.Product.objects.all():
+        score = 0.0
+        for activity in product.activity.all():
+            age = (today - activity.day).days
+            score += 0.5 ** (age / half_life) * sum(
+                getattr(activity, name) * weight for name, weight in WEIGHTS.items())
+        product.trending_score = score
+        product.save(update_fields=['trending_score'])
+
+
+class TrendingScoreBenchmark(TestCase):
+    """Compare scoring a catalog with daily activity both ways."""
+
+    def setUp(self):
+        products = []
+        for _ in range(PRODUCTS // 500):
+            products += create_products(500)
+        self.today = timezone.localdate()
+        models.ProductActivity.objects.bulk_create([
+            models.ProductActivity(
+                product=product, day=self.today - timedelta(days=age),
+                views=(product.pk * 7 + age) % 50, cart_adds=age % 3,
+                favorites=product.pk % 2, sales=age % 2)
+            for product in products
+            for age in range(DAYS)
+        ], batch_size=1000)
+
+    def test_scoring(self):
+        def reset_and(score):
+            # every run starts unscored, so it writes all the scores
+            def run():
+                models.Product.objects.update(
+                    trending_score=0, is_trending=False, is_hot=False)
+                score(self.today)
+            return run
+
+        rows = []
+        for label, score in [
+            ('per product ORM loop', score_per_product),
+            ('aggregate query', score_trending_products),
+        ]:
+            queries, ms = measure(reset_and(score), REPEAT)
+            rows.append((label, queries, ms))
+
+        report(f'Trending scores, {PRODUCTS} products with {DAYS} days of activity', rows)
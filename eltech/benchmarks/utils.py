@@ -0,0 +1,43 @@
+"""Helpers shared by the benchmarks"""
+
+import time
+from decimal import Decimal
+
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext
+
+from core import models
+
+
+def measure(func, repeat=50):
+    """Run `func` `repeat` times, return (queries per call, ms per call)."""
+    func()  # warm up
+    reset_queries()  # the query log keeps at most 9000 queries
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        elapsed = time.perf_counter() - started
+    return len(queries) / repeat, elapsed * 1000 / repeat
+
+
+def report(title, rows):
+    """Print a small table of (label, queries, ms) rows."""
+    print(f'\n{title}')
+    for label, queries, ms in rows:
+        print(f'  {label:<40} {queries:>6.1f} queries {ms:>9.2f} ms')
+
+
+def create_products(count, category=None):
+    """Create and return sample products"""
+    category = category or models.Category.objects.create(name='Category')
+    return models.Product.objects.bulk_create([
+        models.Product(
+            name=f'Product {i}',
+            description='Description',
+            price=Decimal('10.00') + i,
+            stock=100,
+            category=category,
+        )
+        for i in range(count)
+    ])
@@ -4,6 +4,8 @@ Serializers for cart APIs
 from rest_framework import serializers
 
 from core import models
+from core.images import build_srcset
+from core.serializers import SparseFieldsMixin
 
 
 class ProductThumbnailSerializer(serializers.ModelSerializer):
@@ -17,11 +19,18 @@ class ProductThumbnailSerializer(serializers.ModelSerializer):
     def to_representation(self, instance):
         """Only return the image if it is a thumbnail."""
         if instance.is_thumbnail:
-            return {'image': self.context['request'].build_absolute_uri(instance.image.url)}
+            request = self.context['request']
+            return {
+                'image': request.build_absolute_uri(instance.image.url),
+                'srcset': build_srcset(instance.image, instance.image_variants, request),
+                'width': instance.width,
+                'height': instance.height,
+                'placeholder': instance.placeholder,
+            }
         return {}
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for products."""
     thumbnail = ProductThumbnailSerializer(read_only=True)
 
@@ -34,7 +43,10 @@ class ProductSerializer(serializers.ModelSerializer):
         """Add thumbnail to serialized data."""
         representation = super().to_representation(instance)
 
-        thumbnail = instance.images.filter(is_thumbnail=True).first()
+        if not self.wants('thumbnail'):
+            return representation
+
+        thumbnail = instance.get_thumbnail()
         if thumbnail:
             representation['thumbnail'] = ProductThumbnailSerializer(thumbnail, context=self.context).data
         else:
@@ -1,3 +1,42 @@
+"""Tests for the cart APIs"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-# Create your tests here.
+from rest_framework.test import APIClient
+
+from core import models
+
+
+class CartFieldsTests(TestCase):
+    """Test `?fields=` picks the fields of the cart products."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+            mobile_phone='01000000000',
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        category = models.Category.objects.create(name='Category')
+        self.product = models.Product.objects.create(
+            name='Product', price=Decimal('10.00'), stock=5, category=category)
+        cart = models.Cart.objects.create(user=self.user)
+        models.CartProduct.objects.create(cart=cart, product=self.product, quantity=2)
+
+    def test_get_cart_product_fields(self):
+        res = self.client.get('/api/cart/carts/get_cart/', {'fields': 'id,price'})
+
+        products = res.json()['products']
+        self.assertEqual(products[0]['product'], {'id': self.product.pk, 'price': '10.00'})
+        self.assertEqual(products[0]['total_price'], 20.0)
+
+    def test_get_cart_defaults(self):
+        res = self.client.get('/api/cart/carts/get_cart/')
+
+        product = res.json()['products'][0]['product']
+        self.assertEqual(list(product), ['id', 'name', 'price', 'stock', 'thumbnail'])
+        self.assertEqual(product['thumbnail'], {})
@@ -5,14 +5,17 @@ from drf_spectacular.utils import extend_schema
 
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from django.db.models import Prefetch
 
 from rest_framework import viewsets, mixins, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication
+from core.authentication import CachedTokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 
-from core.models import Cart, CartProduct, Coupon, Order, OrderProduct, Product
+from core.models import Cart, CartProduct, Coupon, Order, OrderProduct, Product, \
+    thumbnail_prefetch
+from core.serializers import sparse_fields
 
 from cart import serializers
 
@@ -24,17 +27,31 @@ class CartViewSet(mixins.DestroyModelMixin,
     """
     queryset = Cart.objects.all()
     serializer_class = serializers.CartSerializer
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         return self.queryset.filter(user=self.request.user)
+
+    def get_serializer_context(self):
+        """Apply `?fields=` to the products of the cart."""
+        context = super().get_serializer_context()
+        context['fields'] = sparse_fields(
+            self.request.query_params, serializers.ProductSerializer.Meta.fields)
+        return context
     
     @action(detail=False, methods=['get'])
     def get_cart(self, request):
         """get user's cart."""
-        cart = Cart.objects.get(user=request.user)
-        serializer = serializers.CartSerializer(cart, context={'request': request})
+        context = self.get_serializer_context()
+        queryset = Cart.objects.select_related('coupon').prefetch_related(
+            Prefetch('cartproduct_set',
+                     queryset=CartProduct.objects.select_related('product')))
+        if context['fields'] is None or 'thumbnail' in context['fields']:
+            queryset = queryset.prefetch_related(
+                thumbnail_prefetch('cartproduct_set__product__images'))
+        cart = queryset.get(user=request.user)
+        serializer = serializers.CartSerializer(cart, context=context)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @extend_schema(request=serializers.CartProductSerializer)
@@ -64,7 +81,7 @@ class CartViewSet(mixins.DestroyModelMixin,
 
         cart_product.save()
 
-        serializer = serializers.CartProductSerializer(cart_product, context={'request': request})
+        serializer = serializers.CartProductSerializer(cart_product, context=self.get_serializer_context())
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     
     @extend_schema(request=serializers.CartProductSerializer)
@@ -93,7 +110,7 @@ class CartViewSet(mixins.DestroyModelMixin,
 
         cart_product.save()
 
-        serializer = serializers.CartProductSerializer(cart_product, context={'request': request})
+        serializer = serializers.CartProductSerializer(cart_product, context=self.get_serializer_context())
         return Response(serializer.data, status=status.HTTP_200_OK)
     
     @extend_schema(request=serializers.CartProductSerializer)
@@ -107,7 +124,7 @@ class CartViewSet(mixins.DestroyModelMixin,
         product = Product.objects.get(id=product_id, cart=cart)
         cartProduct = CartProduct.objects.get(product=product, cart=cart)
 
-        serializer = serializers.CartProductSerializer(cartProduct, context={'request': request})
+        serializer = serializers.CartProductSerializer(cartProduct, context=self.get_serializer_context())
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @extend_schema(request=serializers.CartProductSerializer)
@@ -97,6 +97,8 @@ class ProductAdmin(admin.ModelAdmin):
                RatingInline, ReviewInline]
     list_display = ('name', 'price', 'is_hot', 'is_on_sale', 'is_weekly_deal')
     list_filter = ('is_hot', 'is_on_sale')
+    # derived from the activity, see core.trending
+    readonly_fields = ('trending_score', 'is_hot', 'is_trending')
 
     def is_weekly_deal(self, obj):
         """Return whether the product is a weekly deal."""
@@ -138,6 +140,20 @@ class ServiceAdmin(admin.ModelAdmin):
     search_fields = ('title', 'description')
 
 
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'send_after', 'sent_at')
+    list_filter = ('status',)
+    search_fields = ('subject',)
+
+
+class NewsletterCampaignAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'sent_count', 'failed_count',
+                    'started_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('status', 'last_recipient_id', 'sent_count',
+                       'failed_count', 'started_at', 'finished_at')
+
+
 admin.site.register(models.User, UserAdmin)
 admin.site.register(models.Product, ProductAdmin)
 admin.site.register(models.Category, CategoryAdmin)
@@ -148,3 +164,5 @@ admin.site.register(models.Cart)
 admin.site.register(models.Service)
 admin.site.register(models.CartProduct)
 admin.site.register(models.Coupon)
+admin.site.register(models.OutboxEmail, OutboxEmailAdmin)
+admin.site.register(models.NewsletterCampaign, NewsletterCampaignAdmin)
@@ -4,3 +4,22 @@ from django.apps import AppConfig
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        # connect the cache invalidation signals
+        from core import authentication  # noqa: F401
+        from core import db_metrics, images, recommendations, storage, trending
+
+        db_metrics.connect_signals()
+        images.connect_signals()
+        recommendations.connect_signals()
+        storage.connect_signals()
+        trending.connect_signals()
+
+        # the product app is not installed, its caches are wired up here
+        from product import categories, deals, facets, home
+
+        categories.connect_signals()
+        deals.connect_signals()
+        facets.connect_signals()
+        home.connect_signals()
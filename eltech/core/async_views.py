@@ -0,0 +1,69 @@
+"""
+Helpers shared by the async views
+"""
+import asyncio
+import functools
+
+from django.http import JsonResponse
+
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def json_response(data, status=200):
+    """Return `data` encoded like DRF's JSONRenderer."""
+    return JsonResponse(
+        data, status=status, safe=False, encoder=JSONEncoder,
+        json_dumps_params={'ensure_ascii': False, 'separators': (',', ':')},
+    )
+
+
+def not_found(detail='Not found.'):
+    return json_response({'detail': detail}, status=404)
+
+
+async def fetch(queryset):
+    """Evaluate `queryset` and return it with its results cached."""
+    async for _ in queryset:
+        pass
+    return queryset
+
+
+def safe_methods_only(view):
+    """Answer 405 to anything but GET and HEAD, like the read-only viewsets."""
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return json_response(
+                {'detail': f'Method "{request.method}" not allowed.'}, status=405)
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+async def paginate(request, queryset, page_size):
+    """Return `(page, count, next, previous)`, or None for an invalid page."""
+    try:
+        number = int(request.GET.get('page', 1))
+    except ValueError:
+        return None
+    if number < 1:
+        return None
+
+    offset = (number - 1) * page_size
+    count, page = await asyncio.gather(
+        queryset.acount(),
+        fetch(queryset[offset:offset + page_size]),
+    )
+    if number > 1 and offset >= count:
+        return None
+
+    url = request.build_absolute_uri()
+    next_link = replace_query_param(url, 'page', number + 1) \
+        if offset + page_size < count else None
+    if number == 1:
+        previous_link = None
+    elif number == 2:
+        previous_link = remove_query_param(url, 'page')
+    else:
+        previous_link = replace_query_param(url, 'page', number - 1)
+    return page, count, next_link, previous_link
@@ -0,0 +1,65 @@
+"""
+Token authentication with the token-to-user lookup cached.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+def token_cache_key(key):
+    """Return the cache key for a token, never the raw token itself."""
+    return 'auth-token:' + hashlib.sha256(key.encode()).hexdigest()
+
+
+def invalidate_user_tokens(user_id):
+    """Drop the cached tokens of a user."""
+    keys = Token.objects.filter(user_id=user_id).values_list('key', flat=True)
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that keeps the resolved token and its user in the
+    cache for AUTH_TOKEN_CACHE_TIMEOUT seconds.
+
+    Entries are dropped when the user is saved (password change,
+    deactivation) and when the token is deleted (logout).
+    """
+
+    def authenticate_credentials(self, key):
+        cache_key = token_cache_key(key)
+        token = cache.get(cache_key)
+
+        if token is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related('user').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed(_('Invalid token.'))
+            cache.set(cache_key, token, settings.AUTH_TOKEN_CACHE_TIMEOUT)
+
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+
+        return (token.user, token)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_tokens_on_user_change(sender, instance, created, **kwargs):
+    """Password changes and deactivation must apply immediately."""
+    if not created:
+        invalidate_user_tokens(instance.pk)
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    """A deleted token must stop authenticating at once."""
+    cache.delete(token_cache_key(instance.key))
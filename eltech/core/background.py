@@ -0,0 +1,49 @@
+"""
+Run short tasks off the request path.
+
+Tasks are submitted once the current transaction commits and run on a
+small per-process thread pool. With BACKGROUND_TASKS_EAGER they run
+inline instead, which tests rely on.
+"""
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.BACKGROUND_TASKS_WORKERS,
+            thread_name_prefix='background',
+        )
+    return _executor
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception('Background task %s failed', func.__name__)
+    finally:
+        if not settings.BACKGROUND_TASKS_EAGER:
+            # worker threads must not keep their own connections open
+            connections.close_all()
+
+
+def _submit(func, args, kwargs):
+    if settings.BACKGROUND_TASKS_EAGER:
+        _run(func, args, kwargs)
+    else:
+        _get_executor().submit(_run, func, args, kwargs)
+
+
+def run_in_background(func, *args, **kwargs):
+    """Run `func(*args, **kwargs)` in the background after commit."""
+    transaction.on_commit(lambda: _submit(func, args, kwargs))
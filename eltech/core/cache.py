@@ -0,0 +1,91 @@
+"""
+Payloads served from the cache and rebuilt in the background.
+
+A CachedPayload is built once per origin (scheme and host, since payloads
+hold absolute urls) and kept in the cache without expiry. Once it is older
+than its timeout, or after `invalidate()`, the stored payload keeps being
+served while a background task builds the next one, so only the very
+first request of an origin waits for a build.
+"""
+import time
+
+from django.core.cache import cache
+from django.http import HttpRequest
+
+from core.background import run_in_background
+
+
+class OriginRequest(HttpRequest):
+    """Request building absolute urls for `origin`, for background builds."""
+
+    def __init__(self, origin):
+        super().__init__()
+        self._origin_scheme, host = origin.split('://', 1)
+        self.META['HTTP_HOST'] = host
+        self.method = 'GET'
+
+    def _get_scheme(self):
+        return self._origin_scheme
+
+
+class CachedPayload:
+    """A payload built by `build(request)`, cached and refreshed in the background."""
+
+    def __init__(self, name, build, timeout):
+        self.name = name
+        self.build = build
+        self.timeout = timeout
+
+    def _key(self, *parts):
+        return ':'.join([self.name, *map(str, parts)])
+
+    def get(self, request):
+        """Return the payload for the origin of `request`."""
+        origin = f'{request.scheme}://{request.get_host()}'
+        entry = cache.get(self._key('payload', origin))
+        if entry is None:
+            self._add_origin(origin)
+            return self.rebuild(origin, request)
+
+        built_at, generation, payload = entry
+        if generation != self._generation() or built_at + self.timeout < time.time():
+            if cache.get(self._lock_key(origin)) is None:
+                run_in_background(self._rebuild_once, origin)
+        return payload
+
+    def rebuild(self, origin, request=None):
+        """Build and store the payload of `origin`, return it."""
+        generation = self._generation()
+        payload = self.build(request or OriginRequest(origin))
+        cache.set(self._key('payload', origin),
+                  (time.time(), generation, payload), None)
+        return payload
+
+    def invalidate(self):
+        """Rebuild the payload of every origin once the transaction commits."""
+        try:
+            cache.incr(self._key('generation'))
+        except ValueError:
+            cache.set(self._key('generation'), 1, None)
+        run_in_background(self.refresh)
+
+    def refresh(self):
+        """Rebuild the payloads of every origin served so far."""
+        for origin in cache.get(self._key('origins'), ()):
+            self._rebuild_once(origin)
+
+    def _generation(self):
+        return cache.get(self._key('generation'), 0)
+
+    def _add_origin(self, origin):
+        origins = cache.get(self._key('origins'), set())
+        if origin not in origins:
+            cache.set(self._key('origins'), origins | {origin}, None)
+
+    def _lock_key(self, origin):
+        return self._key('rebuilding', origin, self._generation())
+
+    def _rebuild_once(self, origin):
+        # a burst of changes or stale reads rebuilds each origin once
+        if cache.add(self._lock_key(origin), True, max(self.timeout // 2, 1)):
+            self.rebuild(origin)
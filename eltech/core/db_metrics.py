@@ -0,0 +1,55 @@
+"""
+Database connection metrics of the current worker process.
+
+Counts the requests served and the connections opened per database
+alias, so the reuse of persistent connections can be checked on a live
+worker through the `api/health-check/db/` endpoint.
+"""
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
+
+_lock = threading.Lock()
+_requests = 0
+_connections = Counter()
+
+
+def _count_request(sender, **kwargs):
+    global _requests
+    with _lock:
+        _requests += 1
+
+
+def _count_connection(sender, connection, **kwargs):
+    with _lock:
+        _connections[connection.alias] += 1
+
+
+def snapshot():
+    """Return the connection metrics of this process."""
+    with _lock:
+        requests, connections = _requests, dict(_connections)
+
+    opened = sum(connections.values())
+    return {
+        'pid': os.getpid(),
+        'requests': requests,
+        'connections_opened': connections,
+        # share of requests that did not open a connection
+        'reuse_ratio': round(max(0, 1 - opened / requests), 3) if requests else None,
+        'conn_max_age': {
+            alias: database.get('CONN_MAX_AGE', 0)
+            for alias, database in settings.DATABASES.items()
+        },
+    }
+
+
+def connect_signals():
+    """Start counting requests and new connections."""
+    request_started.connect(_count_request, dispatch_uid='db-metrics-requests')
+    connection_created.connect(
+        _count_connection, dispatch_uid='db-metrics-connections')
@@ -0,0 +1,79 @@
+"""
+Primary/replica database routing.
+
+Writes always go to `default`. Reads go to one of DATABASE_REPLICAS, but
+only while a safe-method request is being served (see
+ReplicaRoutingMiddleware), so management commands, workers and the
+writes of a POST keep reading their own data from the primary.
+
+A client that wrote is pinned to the primary for READ_YOUR_WRITES_SECONDS,
+keyed on its IP address and on its Authorization header, so the cart or
+order it just changed is never read back from a lagging replica.
+"""
+import contextvars
+import hashlib
+import random
+
+from django.conf import settings
+from django.core.cache import cache
+
+from rest_framework.throttling import BaseThrottle
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_use_replicas = contextvars.ContextVar('use_replicas', default=False)
+
+
+def _pin_keys(request):
+    """Return the cache keys identifying the client of `request`."""
+    idents = [BaseThrottle().get_ident(request) or '']
+    authorization = request.META.get('HTTP_AUTHORIZATION')
+    if authorization:
+        idents.append(authorization)
+    return [
+        'db-pin:' + hashlib.sha256(ident.encode()).hexdigest()
+        for ident in idents
+    ]
+
+
+class PrimaryReplicaRouter:
+    """Send reads to a replica when the current request allows it."""
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and _use_replicas.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+class ReplicaRoutingMiddleware:
+    """Enable replica reads for safe requests of clients that did not write."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+
+        keys = _pin_keys(request)
+        safe = request.method in SAFE_METHODS
+        token = _use_replicas.set(safe and not cache.get_many(keys))
+        try:
+            response = self.get_response(request)
+        finally:
+            _use_replicas.reset(token)
+
+        if not safe:
+            cache.set_many(dict.fromkeys(keys, True),
+                           settings.READ_YOUR_WRITES_SECONDS)
+        return response
@@ -0,0 +1,209 @@
+"""
+Read-only serializers that build list payloads from `.values()` rows.
+
+A FastSerializer mirrors a DRF serializer class: the fields of that
+serializer are turned once into a plan of `(key, getter)` pairs reading
+the columns of a `.values()` row, so a page of results costs neither model
+instances nor the per-field machinery of `Serializer.to_representation`.
+The output is the same as the DRF serializer, key order included.
+
+Only plain model fields, primary key relations, files, SrcsetField and
+nested (non-many) model serializers are planned; anything else raises
+ImproperlyConfigured when the plan is built. Subclasses fill in fields the
+serializer computes itself by overriding `to_representation`, and load
+what those need for the whole page in `prepare`.
+"""
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models.fields.files import FieldFile
+
+from rest_framework import fields, relations, serializers
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from core.images import IMAGE_FIELDS, build_srcset
+from core.serializers import SrcsetField
+
+# fields whose to_representation returns database values unchanged
+IDENTITY_FIELDS = (
+    fields.CharField,
+    fields.IntegerField,
+    fields.BooleanField,
+    fields.ReadOnlyField,
+    relations.PrimaryKeyRelatedField,
+)
+# fields that do not read a single column of the row
+UNPLANNED_FIELDS = (
+    relations.RelatedField,
+    relations.ManyRelatedField,
+    fields.SerializerMethodField,
+    fields.HiddenField,
+)
+
+
+class FastSerializer:
+    """Serialize `.values()` rows like `serializer_class` serializes models.
+
+    Like SparseFieldsMixin, only the fields in `context['fields']` are
+    read and written when it is set.
+    """
+
+    serializer_class = None
+    # fields of serializer_class left to `to_representation`
+    skip_fields = ()
+    # columns read whatever the fields, for `prepare`
+    columns = ()
+
+    _plans = {}
+
+    def __init__(self, rows, context=None):
+        self.rows = rows
+        self.context = context or {}
+        self.request = self.context.get('request')
+        _, self.getters = self.get_plan(self.context.get('fields'))
+
+    def wants(self, name):
+        """Return whether `name` is part of the representation."""
+        selected = self.context.get('fields')
+        return selected is None or name in selected
+
+    @classmethod
+    def get_plan(cls, fields=None):
+        """Return `(columns, [(key, getter), ...])` for the `fields` (all if None)."""
+        key = (cls, None if fields is None else frozenset(fields))
+        if key not in cls._plans:
+            serializer = cls.serializer_class()
+            columns = list(cls.columns)
+            getters = [
+                (name, _plan_field(field, '', columns))
+                for name, field in serializer.fields.items()
+                if not field.write_only and name not in cls.skip_fields
+                and (fields is None or name in fields)
+            ]
+            cls._plans[key] = (tuple(dict.fromkeys(columns)), getters)
+        return cls._plans[key]
+
+    @classmethod
+    def values(cls, queryset, fields=None):
+        """Return `queryset` as the rows this serializer reads."""
+        columns, _ = cls.get_plan(fields)
+        return queryset.prefetch_related(None).values(*columns)
+
+    def prepare(self, rows):
+        """Load what `to_representation` needs for all `rows`."""
+
+    def to_representation(self, row):
+        request = self.request
+        return {key: getter(row, request) for key, getter in self.getters}
+
+    @property
+    def data(self):
+        rows = list(self.rows)
+        self.prepare(rows)
+        return [self.to_representation(row) for row in rows]
+
+
+class FastListModelMixin:
+    """List a queryset with `fast_serializer_class` instead of the serializer."""
+
+    fast_serializer_class = None
+
+    def list(self, request, *args, **kwargs):
+        context = self.get_serializer_context()
+        queryset = self.fast_serializer_class.values(
+            self.filter_queryset(self.get_queryset()), context.get('fields'))
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = self.fast_serializer_class(page, context=context)
+            return self.get_paginated_response(serializer.data)
+
+        serializer = self.fast_serializer_class(queryset, context=context)
+        return Response(serializer.data)
+
+
+def _plan_field(field, prefix, columns):
+    """Return a `getter(row, request)` for a bound serializer field."""
+    if isinstance(field, SrcsetField):
+        return _srcset_getter(field.parent.Meta.model, prefix, columns)
+
+    if isinstance(field, serializers.ListSerializer) \
+            or not field.source_attrs or field.source == '*':
+        raise ImproperlyConfigured(
+            f'Cannot plan field "{field.field_name}" of {field.parent.__class__.__name__}.')
+
+    column = prefix + '__'.join(field.source_attrs)
+
+    if isinstance(field, serializers.ModelSerializer):
+        return _nested_getter(field, column, columns)
+
+    columns.append(column)
+
+    if isinstance(field, fields.FileField):
+        return _file_getter(field, column)
+
+    if isinstance(field, IDENTITY_FIELDS):
+        return lambda row, request: row[column]
+
+    if isinstance(field, UNPLANNED_FIELDS):
+        raise ImproperlyConfigured(
+            f'Cannot plan field "{field.field_name}" of {field.parent.__class__.__name__}.')
+
+    to_representation = field.to_representation
+
+    def getter(row, request):
+        value = row[column]
+        return None if value is None else to_representation(value)
+    return getter
+
+
+def _nested_getter(serializer, column, columns):
+    """Return a getter for a nested serializer of a foreign key."""
+    columns.append(column)
+    getters = [
+        (name, _plan_field(field, column + '__', columns))
+        for name, field in serializer.fields.items()
+        if not field.write_only
+    ]
+
+    def getter(row, request):
+        if row[column] is None:
+            return None
+        return {key: get(row, request) for key, get in getters}
+    return getter
+
+
+def _field_file(model, field_name):
+    """Return `name -> FieldFile` for a file field of `model`."""
+    model_field = model._meta.get_field(field_name)
+    return lambda name: FieldFile(None, model_field, name)
+
+
+def _file_getter(field, column):
+    """Return a getter for a FileField, see FileField.to_representation."""
+    model = field.parent.Meta.model
+    make_file = _field_file(model, field.source_attrs[-1])
+    use_url = getattr(field, 'use_url', api_settings.UPLOADED_FILES_USE_URL)
+
+    def getter(row, request):
+        name = row[column]
+        if not name:
+            return None
+        if not use_url:
+            return name
+        url = make_file(name).url
+        return request.build_absolute_uri(url) if request is not None else url
+    return getter
+
+
+def _srcset_getter(model, prefix, columns):
+    """Return a getter for a SrcsetField of `model`."""
+    image_field, variants_field = IMAGE_FIELDS[model._meta.label]
+    make_file = _field_file(model, image_field)
+    image_column = prefix + image_field
+    variants_column = prefix + variants_field
+    columns.extend([image_column, variants_column])
+
+    def getter(row, request):
+        return build_srcset(
+            make_file(row[image_column]), row[variants_column], request)
+    return getter
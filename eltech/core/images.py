@@ -0,0 +1,224 @@
+"""
+Responsive image variants.
+
+After an image is uploaded, resized WebP and JPEG renditions are written
+next to it in the background:
+
+    uploads/product/<name>.jpg
+    uploads/product/variants/<name>.jpg/400.webp
+
+and recorded on the row in its `*_variants` field as
+`{'source': <image name>, '<format>': {'<width>': <variant name>}}`.
+
+Models listed in PLACEHOLDER_FIELDS also get the intrinsic size and a
+tiny base64 preview of the image, so clients can lay out and paint it
+before the real file arrives.
+"""
+import base64
+import logging
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models.signals import post_save
+
+from PIL import Image, ImageOps, features
+
+from core.background import run_in_background
+
+logger = logging.getLogger(__name__)
+
+# model label -> (image field, variants field)
+IMAGE_FIELDS = {
+    'core.ProductImage': ('image', 'image_variants'),
+    'core.Category': ('image', 'image_variants'),
+    'core.Post': ('image', 'image_variants'),
+    'core.User': ('profile_picture', 'profile_picture_variants'),
+    'core.Service': ('logo', 'logo_variants'),
+}
+
+# model label -> (width field, height field, placeholder field)
+PLACEHOLDER_FIELDS = {
+    'core.ProductImage': ('width', 'height', 'placeholder'),
+    'core.Post': ('image_width', 'image_height', 'image_placeholder'),
+}
+
+FORMATS = {
+    'webp': ('WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', 'jpg', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+
+def variant_name(source_name, width, fmt):
+    """Return the storage name of a variant of `source_name`."""
+    directory, basename = os.path.split(source_name)
+    extension = FORMATS[fmt][1]
+    return os.path.join(directory, 'variants', basename, f'{width}.{extension}')
+
+
+def variant_source_name(name):
+    """Return the source image name of a variant name, or None."""
+    head, _ = os.path.split(name)
+    directory, basename = os.path.split(head)
+    parent, folder = os.path.split(directory)
+    if folder != 'variants' or not basename:
+        return None
+    return os.path.join(parent, basename)
+
+
+def _available_formats():
+    formats = settings.IMAGE_VARIANT_FORMATS
+    if 'webp' in formats and not features.check('webp'):
+        logger.warning('Pillow was built without WebP support')
+        formats = [fmt for fmt in formats if fmt != 'webp']
+    return formats
+
+
+def _to_rgb(image):
+    """Flatten transparency on white, JPEG has no alpha channel."""
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def open_image(field_file):
+    """Return the decoded image, rotated as it is displayed."""
+    with field_file.open('rb') as file:
+        image = Image.open(file)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    return image
+
+
+def generate_variants(field_file, image=None):
+    """Write the variants of an image file and return their names."""
+    storage = field_file.storage
+    if image is None:
+        image = open_image(field_file)
+
+    variants = {'source': field_file.name}
+    for fmt in _available_formats():
+        pil_format, _, options = FORMATS[fmt]
+        renditions = {}
+        for width in settings.IMAGE_VARIANT_WIDTHS:
+            if width >= image.width:
+                continue
+            height = max(1, round(image.height * width / image.width))
+            resized = image.resize((width, height), Image.LANCZOS)
+            if pil_format == 'JPEG':
+                resized = _to_rgb(resized)
+
+            buffer = BytesIO()
+            resized.save(buffer, pil_format, **options)
+
+            name = variant_name(field_file.name, width, fmt)
+            if storage.exists(name):
+                storage.delete(name)
+            renditions[str(width)] = storage.save(name, ContentFile(buffer.getvalue()))
+        variants[fmt] = renditions
+
+    return variants
+
+
+def generate_placeholder(image):
+    """Return a base64 JPEG data URI of a tiny copy of `image`."""
+    preview = image.copy()
+    size = settings.IMAGE_PLACEHOLDER_SIZE
+    preview.thumbnail((size, size))
+
+    buffer = BytesIO()
+    _to_rgb(preview).save(buffer, 'JPEG', quality=40)
+    encoded = base64.b64encode(buffer.getvalue()).decode('ascii')
+    return f'data:image/jpeg;base64,{encoded}'
+
+
+def placeholder_values(label, image):
+    """Return the placeholder field values of a row, if it has them."""
+    if label not in PLACEHOLDER_FIELDS:
+        return {}
+    width_field, height_field, placeholder_field = PLACEHOLDER_FIELDS[label]
+    return {
+        width_field: image.width,
+        height_field: image.height,
+        placeholder_field: generate_placeholder(image),
+    }
+
+
+def process_image(label, pk):
+    """Generate and store the variants of one row's image."""
+    model = apps.get_model(label)
+    image_field, variants_field = IMAGE_FIELDS[label]
+
+    instance = model.objects.filter(pk=pk).only('pk', image_field).first()
+    if instance is None:
+        return
+    field_file = getattr(instance, image_field)
+    if not field_file:
+        return
+
+    image = open_image(field_file)
+    variants = generate_variants(field_file, image)
+
+    # skip the write if the image was replaced meanwhile
+    model.objects.filter(pk=pk, **{image_field: field_file.name}) \
+        .update(**{variants_field: variants},
+                **placeholder_values(label, image))
+
+
+def needs_variants(field_file, variants):
+    """Return whether the variants do not belong to the current image."""
+    return bool(field_file) and (variants or {}).get('source') != field_file.name
+
+
+def build_srcset(field_file, variants, request=None):
+    """Return `{format: {width: url}}` for the current image variants."""
+    if needs_variants(field_file, variants):
+        return {}
+
+    storage = field_file.storage
+    srcset = {}
+    for fmt in FORMATS:
+        urls = {}
+        for width, name in variants.get(fmt, {}).items():
+            url = storage.url(name)
+            urls[width] = request.build_absolute_uri(url) if request else url
+        if urls:
+            srcset[fmt] = urls
+    return srcset
+
+
+def _clear_placeholder(model, instance):
+    """Forget the size and preview of a replaced image."""
+    fields = PLACEHOLDER_FIELDS.get(model._meta.label)
+    if not fields or not getattr(instance, fields[2]):
+        return
+    values = dict(zip(fields, (None, None, '')))
+    model.objects.filter(pk=instance.pk).update(**values)
+    for field, value in values.items():
+        setattr(instance, field, value)
+
+
+def _schedule_variants(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    label = sender._meta.label
+    image_field, variants_field = IMAGE_FIELDS[label]
+    if needs_variants(getattr(instance, image_field),
+                      getattr(instance, variants_field)):
+        _clear_placeholder(sender, instance)
+        run_in_background(process_image, label, instance.pk)
+
+
+def connect_signals():
+    """Generate variants whenever a registered image is saved."""
+    for label in IMAGE_FIELDS:
+        post_save.connect(
+            _schedule_variants,
+            sender=apps.get_model(label),
+            dispatch_uid=f'image-variants-{label}',
+        )
@@ -0,0 +1,127 @@
+""" Django command to remove media files no row refers to """
+
+import os
+import time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.images import IMAGE_FIELDS, variant_source_name
+from core.models import MediaBlob
+
+
+def _scan(directory):
+    """Yield `(path, stat)` for every file below `directory`, depth first."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scan(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry.path, entry.stat(follow_symlinks=False)
+
+
+class Command(BaseCommand):
+    """Django command to garbage collect orphaned media files."""
+
+    help = ('Delete files under MEDIA_ROOT that are not referenced by any '
+            'image field, together with variants of unreferenced images.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report the orphaned files.')
+        parser.add_argument(
+            '--grace-period', type=int, default=24,
+            help='Ignore files modified within this many hours.')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Number of paths checked per query.')
+
+    def _referenced(self, names):
+        """Return the subset of `names` stored in an image field."""
+        referenced = set()
+        for label, (image_field, _) in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            referenced.update(
+                model.objects.filter(**{f'{image_field}__in': names})
+                .values_list(image_field, flat=True))
+        return referenced
+
+    def _prune(self, directory):
+        """Remove empty directories up to MEDIA_ROOT."""
+        while directory != self.media_root:
+            try:
+                os.rmdir(directory)
+            except OSError:
+                # the directory is not empty
+                return
+            directory = os.path.dirname(directory)
+
+    def _touched(self, path):
+        """Return whether an upload reused the file since it was scanned."""
+        try:
+            return os.stat(path).st_mtime > self.cutoff
+        except FileNotFoundError:
+            return True
+
+    def _collect(self, batch, dry_run):
+        """Remove the unreferenced files of a batch, return (count, size)."""
+        sources = {name: variant_source_name(name) or name
+                   for name, _, _ in batch}
+        referenced = self._referenced(set(sources.values()))
+
+        count = size = 0
+        orphaned_blobs = []
+        for name, path, stat in batch:
+            if sources[name] in referenced or self._touched(path):
+                continue
+            count += 1
+            size += stat.st_size
+            if dry_run:
+                self.stdout.write(name)
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            if sources[name] == name:
+                orphaned_blobs.append(name)
+            self._prune(os.path.dirname(path))
+
+        if orphaned_blobs:
+            MediaBlob.objects.filter(name__in=orphaned_blobs).delete()
+        return count, size
+
+    def handle(self, *args, **options):
+        """Stream the media tree and collect orphans in batches"""
+        self.media_root = media_root = os.path.abspath(settings.MEDIA_ROOT)
+        if not os.path.isdir(media_root):
+            self.stdout.write('MEDIA_ROOT does not exist, nothing to do.')
+            return
+
+        self.cutoff = cutoff = time.time() - options['grace_period'] * 3600
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        scanned = orphans = reclaimed = 0
+        batch = []
+        for path, stat in _scan(media_root):
+            scanned += 1
+            # leave in-flight uploads alone
+            if stat.st_mtime > cutoff:
+                continue
+            name = os.path.relpath(path, media_root).replace(os.sep, '/')
+            batch.append((name, path, stat))
+            if len(batch) >= batch_size:
+                count, size = self._collect(batch, dry_run)
+                orphans, reclaimed = orphans + count, reclaimed + size
+                batch = []
+        if batch:
+            count, size = self._collect(batch, dry_run)
+            orphans, reclaimed = orphans + count, reclaimed + size
+
+        verb = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f'Scanned {scanned} files. {verb} {orphans} orphans '
+            f'({reclaimed / 1024 / 1024:.1f} MB).'))
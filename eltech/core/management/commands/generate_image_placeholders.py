@@ -0,0 +1,61 @@
+""" Django command to backfill image sizes and placeholders """
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from core.images import IMAGE_FIELDS, PLACEHOLDER_FIELDS, open_image, \
+    placeholder_values
+
+
+class Command(BaseCommand):
+    """Django command to backfill image placeholders."""
+
+    help = 'Store the size and inline preview of existing images.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=200,
+            help='Number of rows written per query.')
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Regenerate placeholders that are already set.')
+
+    def _backfill(self, label, batch_size, force):
+        model = apps.get_model(label)
+        image_field, _ = IMAGE_FIELDS[label]
+        fields = PLACEHOLDER_FIELDS[label]
+
+        rows = model.objects.exclude(**{image_field: ''}) \
+            .exclude(**{f'{image_field}__isnull': True})
+        if not force:
+            rows = rows.filter(**{fields[2]: ''})
+        rows = rows.only('pk', image_field).iterator(chunk_size=batch_size)
+
+        done = failed = 0
+        batch = []
+        for row in rows:
+            try:
+                image = open_image(getattr(row, image_field))
+            except Exception as error:
+                failed += 1
+                self.stderr.write(f'{label} {row.pk}: {error}')
+                continue
+            for field, value in placeholder_values(label, image).items():
+                setattr(row, field, value)
+            batch.append(row)
+            if len(batch) >= batch_size:
+                model.objects.bulk_update(batch, fields)
+                done += len(batch)
+                batch = []
+        if batch:
+            model.objects.bulk_update(batch, fields)
+            done += len(batch)
+        return done, failed
+
+    def handle(self, *args, **options):
+        """Fill in every row that has no placeholder yet"""
+        for label in PLACEHOLDER_FIELDS:
+            done, failed = self._backfill(
+                label, options['batch_size'], options['force'])
+            self.stdout.write(self.style.SUCCESS(
+                f'{label}: {done} processed, {failed} failed.'))
@@ -0,0 +1,74 @@
+""" Django command to generate responsive variants for existing images """
+
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.images import IMAGE_FIELDS, needs_variants, process_image
+
+
+def _init_worker():
+    # spawned workers start without Django configured
+    django.setup()
+
+
+def _process(job):
+    label, pk = job
+    try:
+        process_image(label, pk)
+    except Exception as error:
+        return label, pk, str(error)
+    finally:
+        connections.close_all()
+    return label, pk, None
+
+
+class Command(BaseCommand):
+    """Django command to backfill image variants."""
+
+    help = 'Generate resized WebP/JPEG variants for existing uploads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Number of worker processes.')
+        parser.add_argument(
+            '--force', action='store_true',
+            help='Regenerate variants that are already up to date.')
+
+    def _jobs(self, force):
+        for label, (image_field, variants_field) in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            rows = model.objects.exclude(**{image_field: ''}) \
+                .exclude(**{f'{image_field}__isnull': True}) \
+                .only('pk', image_field, variants_field) \
+                .iterator(chunk_size=500)
+            for row in rows:
+                if force or needs_variants(getattr(row, image_field),
+                                           getattr(row, variants_field)):
+                    yield label, row.pk
+
+    def handle(self, *args, **options):
+        """Process every image that is missing variants"""
+        jobs = list(self._jobs(options['force']))
+        self.stdout.write(f'Generating variants for {len(jobs)} images...')
+
+        # forked workers must not share the parent's connection
+        connections.close_all()
+
+        failed = 0
+        with ProcessPoolExecutor(max_workers=options['workers'],
+                                 initializer=_init_worker) as executor:
+            futures = [executor.submit(_process, job) for job in jobs]
+            for future in as_completed(futures):
+                label, pk, error = future.result()
+                if error:
+                    failed += 1
+                    self.stderr.write(f'{label} {pk}: {error}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Done, {len(jobs) - failed} processed, {failed} failed.'))
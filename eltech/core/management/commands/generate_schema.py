@@ -0,0 +1,20 @@
+""" Django command to prebuild the OpenAPI schema """
+
+import os
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    """Django command to write the schema served by /api/schema/."""
+
+    help = 'Generate the OpenAPI schema into API_SCHEMA_FILE.'
+
+    def handle(self, *args, **options):
+        """Write the schema next to the other deploy artifacts"""
+        path = settings.API_SCHEMA_FILE
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        call_command('spectacular', file=path, stdout=self.stdout, stderr=self.stderr)
+        self.stdout.write(self.style.SUCCESS(f'Schema written to {path}'))
@@ -0,0 +1,100 @@
+""" Django command to move existing uploads into content-addressed storage """
+
+import os
+
+from django.apps import apps
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from core.images import IMAGE_FIELDS, variant_name
+from core.storage import ContentAddressedStorage, is_blob_name
+
+
+class Command(BaseCommand):
+    """Django command to rewrite legacy upload paths as blobs."""
+
+    help = ('Move files stored under their upload_to names into the '
+            'sharded blob layout and update the rows pointing at them.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only report the files that would be moved.')
+
+    def _move_variants(self, old_variants, new_name):
+        """Move variant files next to the blob and return the new mapping."""
+        variants = {'source': new_name}
+        for fmt, renditions in old_variants.items():
+            if fmt == 'source':
+                continue
+            moved = {}
+            for width, old in renditions.items():
+                new = variant_name(new_name, width, fmt)
+                old_path, new_path = default_storage.path(old), default_storage.path(new)
+                if not os.path.exists(old_path):
+                    continue
+                if os.path.exists(new_path):
+                    os.remove(old_path)
+                else:
+                    os.makedirs(os.path.dirname(new_path), exist_ok=True)
+                    os.replace(old_path, new_path)
+                moved[width] = new
+            variants[fmt] = moved
+        return variants
+
+    def _migrate(self, model, image_field, variants_field, row):
+        old_name = getattr(row, image_field).name
+        with default_storage.open(old_name, 'rb') as file:
+            new_name = default_storage.save(old_name, file)
+
+        old_variants = getattr(row, variants_field) or {}
+        if old_variants.get('source') == old_name:
+            variants = self._move_variants(old_variants, new_name)
+        else:
+            variants = {}
+
+        updated = model.objects.filter(pk=row.pk, **{image_field: old_name}) \
+            .update(**{image_field: new_name, variants_field: variants})
+        if not updated:
+            # the row changed meanwhile, drop the reference taken above
+            default_storage.delete(new_name)
+            return
+
+        if not model.objects.filter(**{image_field: old_name}).exists():
+            old_path = default_storage.path(old_name)
+            os.remove(old_path)
+            directory, basename = os.path.split(old_path)
+            variants_dir = os.path.join(directory, 'variants', basename)
+            if os.path.isdir(variants_dir) and not os.listdir(variants_dir):
+                os.rmdir(variants_dir)
+
+    def handle(self, *args, **options):
+        """Rewrite every legacy file of the registered image fields"""
+        if not isinstance(default_storage, ContentAddressedStorage):
+            raise CommandError(
+                'The default storage is not ContentAddressedStorage.')
+
+        moved = missing = 0
+        for label, (image_field, variants_field) in IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            rows = model.objects.exclude(**{image_field: ''}) \
+                .exclude(**{f'{image_field}__isnull': True}) \
+                .only('pk', image_field, variants_field) \
+                .iterator(chunk_size=500)
+            for row in rows:
+                name = getattr(row, image_field).name
+                if is_blob_name(name):
+                    continue
+                if not default_storage.exists(name):
+                    missing += 1
+                    self.stderr.write(f'{label} {row.pk}: {name} is missing')
+                    continue
+                if options['dry_run']:
+                    self.stdout.write(f'{label} {row.pk}: {name}')
+                else:
+                    self._migrate(model, image_field, variants_field, row)
+                moved += 1
+
+        verb = 'Would move' if options['dry_run'] else 'Moved'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {moved} files, {missing} missing.'))
@@ -0,0 +1,21 @@
+""" Django command to rebuild the most viewed products leaderboards """
+
+from django.core.management.base import BaseCommand
+
+from core.popularity import rank_popular_products
+
+
+class Command(BaseCommand):
+    """Django command to rank the most viewed products."""
+
+    help = 'Rebuild the leaderboards served by ?is_popular=1, run it periodically.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=None,
+            help='Products ranked overall and per category, '
+                 'POPULARITY_RANK_SIZE by default.')
+
+    def handle(self, *args, **options):
+        count = rank_popular_products(options['size'])
+        self.stdout.write(self.style.SUCCESS(f'{count} ranks stored.'))
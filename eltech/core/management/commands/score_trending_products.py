@@ -0,0 +1,16 @@
+""" Django command to recompute the trending products """
+
+from django.core.management.base import BaseCommand
+
+from core.trending import score_trending_products
+
+
+class Command(BaseCommand):
+    """Django command to score the products by their recent activity."""
+
+    help = 'Recompute the trending scores and the is_trending and is_hot flags, ' \
+           'run it periodically.'
+
+    def handle(self, *args, **options):
+        count = score_trending_products()
+        self.stdout.write(self.style.SUCCESS(f'{count} scores updated.'))
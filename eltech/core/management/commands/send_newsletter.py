@@ -0,0 +1,43 @@
+""" Django command to send a newsletter campaign to subscribers """
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import NewsletterCampaign
+from core.newsletter import deliver_campaign
+
+
+class Command(BaseCommand):
+    """Django command to deliver a newsletter campaign."""
+
+    help = 'Send a newsletter campaign, resuming from its last checkpoint.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign_id', type=int)
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help='Number of subscribers fetched from the database at once.')
+        parser.add_argument(
+            '--rate-limit', type=float, default=None,
+            help='Maximum messages per second, 0 for no limit.')
+
+    def handle(self, *args, **options):
+        """Deliver the campaign"""
+        try:
+            campaign = NewsletterCampaign.objects.get(pk=options['campaign_id'])
+        except NewsletterCampaign.DoesNotExist:
+            raise CommandError('Campaign does not exist.')
+
+        try:
+            delivered = deliver_campaign(
+                campaign,
+                batch_size=options['batch_size'],
+                chunk_size=options['chunk_size'],
+                rate_limit=options['rate_limit'],
+            )
+        except OSError as error:
+            raise CommandError(
+                f'Mail server unreachable ({error}), '
+                f'{campaign.sent_count} emails sent. Run again to resume.')
+        self.stdout.write(self.style.SUCCESS(
+            f'Sent {delivered} emails, {campaign.sent_count} in total.'))
@@ -0,0 +1,33 @@
+""" Django command to deliver queued emails """
+
+import time
+from django.core.management.base import BaseCommand
+
+from core.outbox import send_queued_emails
+
+
+class Command(BaseCommand):
+    """Django command to drain the email outbox."""
+
+    help = 'Send queued emails in batches over a single connection.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep polling the outbox instead of exiting when empty.')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to sleep between polls when the outbox is empty.')
+
+    def handle(self, *args, **options):
+        """Send batches until the outbox is drained"""
+        while True:
+            sent, failed = send_queued_emails(options['batch_size'])
+            if sent or failed:
+                self.stdout.write(f'Sent {sent} emails, {failed} failed.')
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(self.style.SUCCESS('Outbox drained.'))
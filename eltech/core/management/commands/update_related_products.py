@@ -0,0 +1,22 @@
+""" Django command to count the new and changed orders in the related products """
+
+from django.core.management.base import BaseCommand
+
+from core.recommendations import update_related_products
+
+
+class Command(BaseCommand):
+    """Django command to update the "customers also bought" products."""
+
+    help = 'Count the orders placed or changed since the last run in the ' \
+           'related products, run it periodically.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help='Orders counted per transaction, '
+                 'RELATED_PRODUCTS_BATCH_SIZE by default.')
+
+    def handle(self, *args, **options):
+        count = update_related_products(options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{count} orders counted.'))
@@ -0,0 +1,20 @@
+""" Django command to render the next weekly deal ahead of its start """
+
+from django.core.management.base import BaseCommand
+
+from product.deals import warm_weekly_deal
+
+
+class Command(BaseCommand):
+    """Django command to warm the weekly deal cache."""
+
+    help = 'Resolve and render the weekly deals starting soon, run it every minute.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead', type=int, default=None,
+            help='Seconds to look ahead, WEEKLY_DEAL_WARM_AHEAD by default.')
+
+    def handle(self, *args, **options):
+        count = warm_weekly_deal(options['ahead'])
+        self.stdout.write(self.style.SUCCESS(f'{count} payloads rendered.'))
@@ -0,0 +1,26 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_image_placeholders'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopularityRank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rank', models.PositiveIntegerField()),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.category')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='popularity_ranks', to='core.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['category', 'rank'], name='core_popula_categor_7f3b3e_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:41
+
+import datetime
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def schedule_deals(apps, schema_editor):
+    """Run the existing deals for a week from their day."""
+    WeeklyDeal = apps.get_model('core', 'WeeklyDeal')
+    deals = list(WeeklyDeal.objects.filter(starts_at__isnull=True))
+    for deal in deals:
+        day = deal.deal_time or timezone.localdate()
+        deal.starts_at = timezone.make_aware(
+            datetime.datetime.combine(day, datetime.time.min))
+        deal.ends_at = deal.starts_at + datetime.timedelta(weeks=1)
+    WeeklyDeal.objects.bulk_update(deals, ['starts_at', 'ends_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_related_products'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='weeklydeal',
+            name='ends_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='weeklydeal',
+            name='starts_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='weeklydeal',
+            index=models.Index(fields=['starts_at', 'ends_at'], name='core_weekly_starts__ae8e6d_idx'),
+        ),
+        migrations.RunPython(schedule_deals, migrations.RunPython.noop),
+    ]
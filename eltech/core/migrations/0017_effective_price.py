@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:44
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import migrations, models
+
+
+def compute_effective_prices(apps, schema_editor):
+    """Store the price with the sale applied, as Product.save() does."""
+    Product = apps.get_model('core', 'Product')
+    products = list(Product.objects.only('price', 'is_on_sale', 'sale_amount'))
+    for product in products:
+        product.effective_price = product.price
+        if product.is_on_sale and product.sale_amount:
+            discount = min(product.sale_amount, 100)
+            product.effective_price = (product.price * (100 - discount) / 100) \
+                .quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+    Product.objects.bulk_update(products, ['effective_price'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_weekly_deal_schedule'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='effective_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=5),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', 'effective_price'], name='core_produc_categor_b7198e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['effective_price'], name='core_produc_effecti_b30e66_idx'),
+        ),
+        migrations.RunPython(compute_effective_prices, migrations.RunPython.noop),
+    ]
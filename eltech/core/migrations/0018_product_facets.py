@@ -0,0 +1,42 @@
+# Generated by Django 4.2.7 on 2026-10-19 03:47
+
+from django.db import migrations, models
+from django.db.models import Avg, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def compute_rating_averages(apps, schema_editor):
+    """Store the average rating of every product."""
+    Product = apps.get_model('core', 'Product')
+    Rating = apps.get_model('core', 'Rating')
+    Product.objects.update(rating_average=Coalesce(Subquery(
+        Rating.objects.filter(product=OuterRef('pk')).values('product')
+        .annotate(value=Avg('rating')).values('value')), 0.0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_effective_price'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='rating_average',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', 'is_on_sale', 'effective_price'], name='core_produc_categor_cd5a36_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['category', 'rating_average'], name='core_produc_categor_bfc9a8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('stock__gt', 0)), fields=['category', 'effective_price'], name='product_in_stock_price_idx'),
+        ),
+        migrations.RunPython(compute_rating_averages, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-19 04:02
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+
+def mark_counted_orders(apps, schema_editor):
+    """Record the baskets of the orders the checkpoint already counted."""
+    Checkpoint = apps.get_model('core', 'Checkpoint')
+    Order = apps.get_model('core', 'Order')
+    OrderProduct = apps.get_model('core', 'OrderProduct')
+
+    checkpoint = Checkpoint.objects.filter(name='related_products').first()
+    if checkpoint is None:
+        return
+    baskets = defaultdict(set)
+    for order_id, product_id in OrderProduct.objects \
+            .filter(order_id__lte=checkpoint.position).values_list('order_id', 'product_id'):
+        baskets[order_id].add(product_id)
+
+    orders = list(Order.objects.filter(pk__lte=checkpoint.position).only('pk'))
+    for order in orders:
+        order.counted_version = order.basket_version
+        order.counted_products = sorted(baskets[order.pk])
+    Order.objects.bulk_update(orders, ['counted_version', 'counted_products'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_product_facets'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='basket_version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='counted_products',
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.AddField(
+            model_name='order',
+            name='counted_version',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(condition=models.Q(('basket_version__gt', models.F('counted_version'))), fields=['id'], name='order_uncounted_idx'),
+        ),
+        migrations.RunPython(mark_counted_orders, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name='Checkpoint',
+        ),
+    ]
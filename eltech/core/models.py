@@ -2,11 +2,13 @@
 
 import uuid
 import os
-from datetime import datetime
+from datetime import datetime, time, timedelta
+from decimal import ROUND_HALF_UP, Decimal
 
 from django.conf import settings
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
@@ -104,6 +106,8 @@ class User(AbstractBaseUser, PermissionsMixin):
         null=True,
         blank=True
     )
+    profile_picture_variants = models.JSONField(
+        default=dict, blank=True, editable=False)
     birth_date = models.DateField(null=True, blank=True)
     # name = models.CharField(max_length=255)
     country = models.CharField(max_length=50, null=True, blank=True)
@@ -130,17 +134,72 @@ class User(AbstractBaseUser, PermissionsMixin):
         return f'{self.first_name} {self.last_name}'
 
 
+class CategoryQuerySet(models.QuerySet):
+    """Queryset helpers for categories"""
+
+    def with_product_count(self):
+        """Count the products of every category in the same query."""
+        return self.annotate(product_count=models.Count('products'))
+
+
 class Category(models.Model):
     """Category object"""
     name = models.CharField(max_length=255)
     image = models.ImageField(upload_to=category_image_file_path)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     updated_at = models.DateTimeField(auto_now=True, editable=False)
 
+    objects = CategoryQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
 
+def thumbnail_prefetch(lookup='images'):
+    """Prefetch only thumbnail images into `thumbnail_images`."""
+    return models.Prefetch(
+        lookup,
+        queryset=ProductImage.objects.filter(is_thumbnail=True),
+        to_attr='thumbnail_images'
+    )
+
+
+# fields the effective price of a product is computed from
+SALE_FIELDS = {'price', 'is_on_sale', 'sale_amount'}
+
+
+class ProductQuerySet(models.QuerySet):
+    """Queryset helpers for products"""
+
+    def with_thumbnail(self):
+        """Prefetch the thumbnail of every product in one query."""
+        return self.prefetch_related(thumbnail_prefetch())
+
+    def popular(self, category=None):
+        """Most viewed first, paged through PopularityRank once it is built."""
+        if not PopularityRank.objects.filter(category=category).exists():
+            return self.order_by('-view_count')
+        return self.filter(popularity_ranks__category=category) \
+            .order_by('popularity_ranks__rank')
+
+    def bulk_create(self, objs, *args, **kwargs):
+        """Store the effective price of the products, like save() does."""
+        objs = list(objs)
+        for product in objs:
+            product.effective_price = product.get_effective_price()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        """Update the effective price along with the sale fields."""
+        if set(fields) & SALE_FIELDS:
+            objs = list(objs)
+            for product in objs:
+                product.effective_price = product.get_effective_price()
+            fields = [*fields, 'effective_price']
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+
 class Product(models.Model):
     """Product object"""
     name = models.CharField(max_length=255)
@@ -150,17 +209,62 @@ class Product(models.Model):
     updated_at = models.DateTimeField(auto_now=True, editable=False)
     stock = models.PositiveIntegerField()
     view_count = models.PositiveIntegerField(default=0)
+    # is_hot and is_trending are derived from the score, see core.trending
+    trending_score = models.FloatField(default=0, editable=False)
     is_hot = models.BooleanField(default=False)
     is_on_sale = models.BooleanField(default=False)
+    # percent off the price while on sale
     sale_amount = models.PositiveSmallIntegerField(default=0)
+    # price with the sale applied, kept up to date by save()
+    effective_price = models.DecimalField(
+        max_digits=5, decimal_places=2, default=0, editable=False)
+    # average of the ratings, kept up to date by product/facets.py
+    rating_average = models.FloatField(default=0, editable=False)
     is_featured = models.BooleanField(default=False)
     is_trending = models.BooleanField(default=False)
     category = models.ForeignKey(
         Category, on_delete=models.CASCADE, related_name='products')
 
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', 'effective_price']),
+            models.Index(fields=['effective_price']),
+            # the facet filters, see product/facets.py
+            models.Index(fields=['category', 'is_on_sale', 'effective_price']),
+            models.Index(fields=['category', 'rating_average']),
+            models.Index(fields=['category', 'effective_price'],
+                         condition=models.Q(stock__gt=0),
+                         name='product_in_stock_price_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        """Store the effective price along with the sale fields."""
+        self.effective_price = self.get_effective_price()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) & SALE_FIELDS:
+            kwargs['update_fields'] = {*update_fields, 'effective_price'}
+        super().save(*args, **kwargs)
+
+    def get_effective_price(self):
+        """Return the price with the sale applied."""
+        price = Decimal(self.price)
+        if not self.is_on_sale or not self.sale_amount:
+            return price
+        discount = min(self.sale_amount, 100)
+        return (price * (100 - discount) / 100).quantize(
+            Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+    def get_thumbnail(self):
+        """Return the thumbnail image, using the prefetched one if present."""
+        if hasattr(self, 'thumbnail_images'):
+            return next(iter(self.thumbnail_images), None)
+        return self.images.filter(is_thumbnail=True).first()
+
 
 class Rating(models.Model):
     """Rating object"""
@@ -191,6 +295,11 @@ class Review(models.Model):
 class ProductImage(models.Model):
     """Product image object"""
     image = models.ImageField(upload_to=product_image_file_path)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # filled in with the variants, see core.images
+    width = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    height = models.PositiveIntegerField(null=True, blank=True, editable=False)
+    placeholder = models.TextField(blank=True, editable=False)
     is_thumbnail = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     updated_at = models.DateTimeField(auto_now=True, editable=False)
@@ -213,10 +322,138 @@ class ProductFeature(models.Model):
         return self.feature
 
 
+class PopularityRank(models.Model):
+    """Position of a product among the most viewed, see core.popularity"""
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name='popularity_ranks')
+    # null for the ranking of all products
+    category = models.ForeignKey(
+        Category, on_delete=models.CASCADE, null=True, blank=True,
+        related_name='+')
+    rank = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=['category', 'rank'])]
+
+
+class ProductActivity(models.Model):
+    """Daily counts of the interactions with a product, see core.trending"""
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name='activity')
+    day = models.DateField()
+    views = models.PositiveIntegerField(default=0)
+    cart_adds = models.PositiveIntegerField(default=0)
+    favorites = models.PositiveIntegerField(default=0)
+    sales = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'day'],
+                                    name='unique_product_activity_day'),
+        ]
+        indexes = [models.Index(fields=['day'])]
+
+
+class ProductCooccurrence(models.Model):
+    """Orders holding both products, see core.recommendations"""
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name='+')
+    # the orders holding the product at all when other is product
+    other = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name='+')
+    orders = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'other'],
+                                    name='unique_product_cooccurrence'),
+        ]
+
+
+# thumbnail columns joined to the related products by RelatedProductQuerySet.cards
+THUMBNAIL_FIELDS = ('image', 'image_variants', 'width', 'height', 'placeholder')
+
+
+def related_products_prefetch():
+    """Prefetch the related products cards, see RelatedProductQuerySet.cards."""
+    return models.Prefetch('related', queryset=RelatedProduct.objects.cards())
+
+
+class RelatedProductQuerySet(models.QuerySet):
+    """Queryset helpers for related products"""
+
+    def cards(self):
+        """Join the related products and their thumbnail, best first."""
+        thumbnails = ProductImage.objects.filter(
+            product=models.OuterRef('related_id'), is_thumbnail=True).order_by('pk')
+        return self.select_related('related').annotate(**{
+            f'thumbnail_{field}': models.Subquery(thumbnails.values(field)[:1])
+            for field in THUMBNAIL_FIELDS
+        }).order_by('rank')
+
+
+class RelatedProduct(models.Model):
+    """Product often bought with another, see core.recommendations"""
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name='related')
+    related = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name='related_to')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    objects = RelatedProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=['product', 'rank'])]
+
+    def get_product(self):
+        """Return the related product, with the thumbnail joined by cards()."""
+        product = self.related
+        if hasattr(self, 'thumbnail_image'):
+            product.thumbnail_images = [ProductImage(
+                product=product, is_thumbnail=True, **{
+                    field: getattr(self, f'thumbnail_{field}')
+                    for field in THUMBNAIL_FIELDS
+                })] if self.thumbnail_image else []
+        return product
+
+
+class WeeklyDealQuerySet(models.QuerySet):
+    """Queryset helpers for weekly deals"""
+
+    def live(self, at):
+        """Deals running at `at`, the most recently started first."""
+        return self.filter(starts_at__lte=at, ends_at__gt=at).order_by('-starts_at')
+
+    def upcoming(self, at):
+        """Deals starting after `at`, the soonest first."""
+        return self.filter(starts_at__gt=at).order_by('starts_at')
+
+
 class WeeklyDeal(models.Model):
     deal_time = models.DateField(null=True)
+    # filled in from deal_time when left empty, see save()
+    starts_at = models.DateTimeField(null=True, blank=True)
+    ends_at = models.DateTimeField(null=True, blank=True)
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
 
+    objects = WeeklyDealQuerySet.as_manager()
+
+    class Meta:
+        indexes = [models.Index(fields=['starts_at', 'ends_at'])]
+
+    def save(self, *args, **kwargs):
+        """Schedule the deal for a week from its day when not scheduled."""
+        if self.starts_at is None:
+            self.starts_at = timezone.make_aware(
+                datetime.combine(self.deal_time, time.min)
+            ) if self.deal_time else timezone.now()
+        if self.ends_at is None:
+            self.ends_at = self.starts_at + timedelta(weeks=1)
+        if self.deal_time is None:
+            self.deal_time = timezone.localdate(self.starts_at)
+        super().save(*args, **kwargs)
+
 
 class Favorite(models.Model):
     """Favorite product object"""
@@ -272,6 +509,17 @@ class Order(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL,
                              on_delete=models.CASCADE)
     products = models.ManyToManyField(Product, through='OrderProduct')
+    # bumped on every change of the products, see core/recommendations.py
+    basket_version = models.PositiveIntegerField(default=1, editable=False)
+    counted_version = models.PositiveIntegerField(default=0, editable=False)
+    counted_products = models.JSONField(default=list, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['id'],
+                         condition=models.Q(basket_version__gt=models.F('counted_version')),
+                         name='order_uncounted_idx'),
+        ]
 
     @property
     def total_price(self):
@@ -297,6 +545,12 @@ class Post(models.Model):
     title = models.CharField(max_length=255)
     content = models.TextField()
     image = models.ImageField(upload_to=post_image_file_path)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
+    image_width = models.PositiveIntegerField(
+        null=True, blank=True, editable=False)
+    image_height = models.PositiveIntegerField(
+        null=True, blank=True, editable=False)
+    image_placeholder = models.TextField(blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True, editable=False)
     updated_at = models.DateTimeField(auto_now=True, editable=False)
     user = models.ForeignKey(settings.AUTH_USER_MODEL,
@@ -328,6 +582,69 @@ class Service(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
     logo = models.ImageField(upload_to=service_image_file_path)
+    logo_variants = models.JSONField(default=dict, blank=True, editable=False)
 
     def __str__(self):
         return self.title
+
+
+class OutboxEmail(models.Model):
+    """Email waiting to be delivered by the outbox worker"""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    )
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    recipients = models.JSONField(default=list)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    send_after = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'send_after'])]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.recipients)}"
+
+
+class NewsletterCampaign(models.Model):
+    """Newsletter sent to every subscribed user"""
+    STATUS_CHOICES = (
+        ('draft', 'Draft'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+    )
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=255, blank=True)
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default='draft')
+    # checkpoint: recipients are sent in primary key order
+    last_recipient_id = models.BigIntegerField(default=0)
+    sent_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.subject
+
+
+class MediaBlob(models.Model):
+    """Content-addressed media file shared by every row that uploads it"""
+    name = models.CharField(max_length=255, unique=True)
+    digest = models.CharField(max_length=64, db_index=True)
+    size = models.BigIntegerField(default=0)
+    ref_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, editable=False)
+
+    def __str__(self):
+        return self.name
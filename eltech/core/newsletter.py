@@ -0,0 +1,117 @@
+"""
+Newsletter delivery.
+
+Subscribers are streamed in primary key order and sent in batches over a
+reused connection. The campaign row is checkpointed after every batch so
+an interrupted run resumes after the last delivered recipient. Recipients
+the server refuses are skipped, but a connection error stops the run
+before the first unsent recipient.
+"""
+import logging
+import time
+from itertools import islice
+from smtplib import SMTPRecipientsRefused
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+def _batched(iterable, size):
+    """Yield lists of `size` items from `iterable`."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _send_batch(connection, messages):
+    """Send a batch one message at a time over the open connection.
+
+    A message the server rejects is counted and skipped; the batch is never
+    resent, so the messages delivered before a failure are not sent twice.
+    A connection error stops the batch and is returned with the counts of
+    the messages before it, to be sent again by the next run.
+    """
+    sent = failed = 0
+    for message in messages:
+        try:
+            connection.send_messages([message])
+        except SMTPRecipientsRefused as error:
+            logger.warning('Newsletter to %s refused: %s', message.to, error)
+            failed += 1
+        except OSError as error:
+            # SMTPServerDisconnected, refused or reset connections, ...
+            return sent, failed, error
+        except Exception as error:
+            logger.warning('Newsletter to %s failed: %s', message.to, error)
+            failed += 1
+        else:
+            sent += 1
+    return sent, failed, None
+
+
+def deliver_campaign(campaign, batch_size=None, chunk_size=None,
+                     rate_limit=None):
+    """Send `campaign` to subscribers not reached yet, return sent count."""
+    batch_size = batch_size or settings.NEWSLETTER_BATCH_SIZE
+    chunk_size = chunk_size or settings.NEWSLETTER_CHUNK_SIZE
+    if rate_limit is None:
+        rate_limit = settings.NEWSLETTER_RATE_LIMIT
+
+    if campaign.status == 'sent':
+        return 0
+    if campaign.status == 'draft':
+        campaign.status = 'sending'
+        campaign.started_at = timezone.now()
+        campaign.save(update_fields=['status', 'started_at'])
+
+    recipients = get_user_model().objects \
+        .filter(is_subscribed=True, pk__gt=campaign.last_recipient_id) \
+        .order_by('pk') \
+        .values_list('pk', 'email') \
+        .iterator(chunk_size=chunk_size)
+
+    delivered = 0
+    connection = get_connection()
+    connection.open()
+    try:
+        for batch in _batched(recipients, batch_size):
+            started = time.monotonic()
+            messages = [
+                EmailMessage(
+                    campaign.subject,
+                    campaign.body,
+                    campaign.from_email or None,
+                    [email],
+                    connection=connection,
+                )
+                for _, email in batch
+            ]
+            sent, failed, error = _send_batch(connection, messages)
+            delivered += sent
+
+            if sent + failed:
+                campaign.last_recipient_id = batch[sent + failed - 1][0]
+                campaign.sent_count += sent
+                campaign.failed_count += failed
+                campaign.save(update_fields=[
+                    'last_recipient_id', 'sent_count', 'failed_count'])
+            if error:
+                # the campaign stays 'sending', resumed by the next run
+                raise error
+
+            if rate_limit:
+                # stay under `rate_limit` messages per second
+                remaining = len(batch) / rate_limit - (time.monotonic() - started)
+                if remaining > 0:
+                    time.sleep(remaining)
+    finally:
+        connection.close()
+
+    campaign.status = 'sent'
+    campaign.finished_at = timezone.now()
+    campaign.save(update_fields=['status', 'finished_at'])
+    return delivered
@@ -0,0 +1,103 @@
+"""
+Transactional email outbox.
+
+Requests only store the message; the `send_queued_emails` worker delivers
+it later over a single reused connection, retrying failures with backoff.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import OutboxEmail
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(subject, message, from_email, recipient_list):
+    """Queue an email for the outbox worker, same arguments as send_mail."""
+    return OutboxEmail.objects.create(
+        subject=subject,
+        body=message,
+        from_email=from_email or '',
+        recipients=list(recipient_list),
+    )
+
+
+def _claim_batch(batch_size):
+    """Lease a batch of due emails so concurrent workers skip them."""
+    now = timezone.now()
+    lease = now + timedelta(seconds=settings.EMAIL_OUTBOX_LEASE_SECONDS)
+
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='pending', send_after__lte=now)
+            .order_by('send_after', 'id')[:batch_size]
+        )
+        OutboxEmail.objects.filter(id__in=[e.id for e in emails]) \
+            .update(send_after=lease)
+
+    return emails
+
+
+def _retry_later(email, error):
+    """Record a failed attempt and schedule the next one."""
+    email.attempts += 1
+    email.last_error = str(error)
+    if email.attempts >= settings.EMAIL_OUTBOX_MAX_ATTEMPTS:
+        email.status = 'failed'
+    else:
+        delay = settings.EMAIL_OUTBOX_RETRY_DELAY * 2 ** (email.attempts - 1)
+        email.send_after = timezone.now() + timedelta(seconds=delay)
+
+
+def send_queued_emails(batch_size=None):
+    """Deliver one batch of due emails, return (sent, failed) counts."""
+    batch_size = batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE
+    emails = _claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+
+    sent = failed = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as error:
+        logger.warning('Email connection failed: %s', error)
+        for email in emails:
+            _retry_later(email, error)
+        failed = len(emails)
+    else:
+        try:
+            for email in emails:
+                message = EmailMessage(
+                    email.subject,
+                    email.body,
+                    email.from_email or None,
+                    email.recipients,
+                    connection=connection,
+                )
+                try:
+                    message.send()
+                except Exception as error:
+                    logger.warning('Sending email %s failed: %s', email.id, error)
+                    _retry_later(email, error)
+                    failed += 1
+                else:
+                    email.status = 'sent'
+                    email.attempts += 1
+                    email.sent_at = timezone.now()
+                    sent += 1
+        finally:
+            connection.close()
+
+    OutboxEmail.objects.bulk_update(
+        emails,
+        ['status', 'attempts', 'last_error', 'send_after', 'sent_at'],
+    )
+    return sent, failed
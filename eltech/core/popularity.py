@@ -0,0 +1,41 @@
+"""
+Leaderboard of the most viewed products.
+
+`?is_popular=1` pages through PopularityRank rows instead of sorting the
+product table by view_count on every request. The `rank_popular_products`
+command rebuilds the rows periodically: the top POPULARITY_RANK_SIZE
+products overall and in every category, computed in two queries and
+swapped in one transaction so readers never see a partial ranking.
+"""
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from core.models import PopularityRank, Product
+
+
+def _ranking(size, partition_by=None):
+    """Return `(product id, category id, rank)` of the top `size` products."""
+    window = Window(RowNumber(), partition_by=partition_by,
+                    order_by=[F('view_count').desc(), F('pk').asc()])
+    return Product.objects.annotate(position=window) \
+        .filter(position__lte=size) \
+        .values_list('pk', 'category_id', 'position')
+
+
+def rank_popular_products(size=None):
+    """Rebuild the leaderboards, return the number of ranks stored."""
+    size = size or settings.POPULARITY_RANK_SIZE
+    ranks = [
+        PopularityRank(product_id=product_id, category_id=None, rank=rank)
+        for product_id, _, rank in _ranking(size)
+    ] + [
+        PopularityRank(product_id=product_id, category_id=category_id, rank=rank)
+        for product_id, category_id, rank in _ranking(size, F('category_id'))
+    ]
+
+    with transaction.atomic():
+        PopularityRank.objects.all().delete()
+        PopularityRank.objects.bulk_create(ranks, batch_size=1000)
+    return len(ranks)
@@ -0,0 +1,153 @@
+"""
+"Customers also bought" recommendations.
+
+ProductCooccurrence is a sparse item-to-item matrix: for every pair of
+products, the number of orders holding both, and on its diagonal the
+number of orders holding each product. Every change of the products of
+an order bumps its basket_version. `update_related_products` (run
+periodically by the `update_related_products` command) locks the orders
+whose basket changed since it was counted, replaces their counted basket
+with the current one in the matrix, then re-ranks the products whose
+scores moved. Orders committed late or out of order, and edited ones, are
+counted once their basket is settled. The score of two products is their
+co-occurrence normalized by their popularity (cosine similarity), and the
+top RELATED_PRODUCTS of each product are stored in RelatedProduct, read
+as is by the product detail.
+"""
+import heapq
+import math
+from collections import Counter, defaultdict
+from itertools import permutations
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+
+from core.models import Order, OrderProduct, Product, ProductCooccurrence, RelatedProduct
+
+
+def _pairs(products):
+    """Yield the co-occurrences of a basket, diagonal included."""
+    yield from ((product, product) for product in products)
+    yield from permutations(products, 2)
+
+
+def _count_changes(orders):
+    """Return the matrix changes and current baskets of `(pk, counted)` orders."""
+    baskets = {pk: set() for pk, _ in orders}
+    for order_id, product_id in OrderProduct.objects \
+            .filter(order_id__in=baskets).values_list('order_id', 'product_id'):
+        baskets[order_id].add(product_id)
+
+    counts = Counter()
+    for pk, counted in orders:
+        counts.update(_pairs(baskets[pk]))
+        counts.subtract(_pairs(set(counted)))
+    return {pair: count for pair, count in counts.items() if count}, baskets
+
+
+def _add_counts(counts):
+    """Add `counts` to the stored matrix, dropping the pairs no order holds."""
+    # a deleted product took its order products and pairs along
+    existing = set(Product.objects
+                   .filter(pk__in={product for product, _ in counts})
+                   .values_list('pk', flat=True))
+    counts = {(product, other): count for (product, other), count in counts.items()
+              if product in existing and other in existing}
+    stored = {
+        (product, other): (pk, orders)
+        for pk, product, other, orders in ProductCooccurrence.objects
+        .filter(product__in=existing)
+        .values_list('pk', 'product', 'other', 'orders')
+        if (product, other) in counts
+    }
+    totals = {
+        pair: max(stored.get(pair, (None, 0))[1] + count, 0)
+        for pair, count in counts.items()
+    }
+    ProductCooccurrence.objects.bulk_create(
+        [
+            ProductCooccurrence(product_id=product, other_id=other, orders=orders)
+            for (product, other), orders in totals.items() if orders
+        ],
+        update_conflicts=True, unique_fields=['product', 'other'],
+        update_fields=['orders'], batch_size=1000,
+    )
+    ProductCooccurrence.objects.filter(pk__in=[
+        stored[pair][0] for pair, orders in totals.items()
+        if not orders and pair in stored
+    ]).delete()
+
+
+def _rank(products, top_k):
+    """Store the top `top_k` neighbours of every product of `products`."""
+    pairs = defaultdict(list)
+    for product, other, orders in ProductCooccurrence.objects \
+            .filter(product__in=products).exclude(other=F('product')) \
+            .values_list('product', 'other', 'orders'):
+        pairs[product].append((other, orders))
+
+    neighbours = {other for rows in pairs.values() for other, _ in rows}
+    totals = dict(ProductCooccurrence.objects
+                  .filter(product=F('other'), product__in=neighbours | set(products))
+                  .values_list('product', 'orders'))
+
+    related = []
+    for product, rows in pairs.items():
+        # ties go to the oldest product
+        scored = heapq.nlargest(top_k, (
+            (orders / math.sqrt(totals[product] * totals[other]), -other)
+            for other, orders in rows
+        ))
+        related += [
+            RelatedProduct(product_id=product, related_id=-negated_id,
+                           score=score, rank=rank)
+            for rank, (score, negated_id) in enumerate(scored, 1)
+        ]
+
+    RelatedProduct.objects.filter(product__in=products).delete()
+    RelatedProduct.objects.bulk_create(related, batch_size=1000)
+
+
+def update_related_products(batch_size=None, top_k=None):
+    """Count the orders placed or changed since the last run, return how many."""
+    batch_size = batch_size or settings.RELATED_PRODUCTS_BATCH_SIZE
+    top_k = top_k or settings.RELATED_PRODUCTS
+
+    counted = 0
+    while True:
+        with transaction.atomic():
+            # the lock holds back the basket_version bumps of these orders
+            orders = list(
+                Order.objects.select_for_update()
+                .filter(basket_version__gt=F('counted_version')).order_by('pk')
+                .values_list('pk', 'basket_version', 'counted_products')[:batch_size])
+            if not orders:
+                return counted
+
+            counts, baskets = _count_changes([(pk, products) for pk, _, products in orders])
+            if counts:
+                _add_counts(counts)
+                changed = {product for product, _ in counts}
+                # the normalization of their neighbours changed too
+                changed |= set(ProductCooccurrence.objects
+                               .filter(product__in=changed)
+                               .values_list('other', flat=True))
+                _rank(changed, top_k)
+
+            Order.objects.bulk_update([
+                Order(pk=pk, counted_version=version, counted_products=sorted(baskets[pk]))
+                for pk, version, _ in orders
+            ], ['counted_version', 'counted_products'])
+        counted += len(orders)
+
+
+def _bump_basket(sender, instance, **kwargs):
+    Order.objects.filter(pk=instance.order_id) \
+        .update(basket_version=F('basket_version') + 1)
+
+
+def connect_signals():
+    post_save.connect(_bump_basket, sender=OrderProduct, dispatch_uid='related-basket')
+    post_delete.connect(_bump_basket, sender=OrderProduct, dispatch_uid='related-basket')
@@ -0,0 +1,66 @@
+"""
+JSON renderer and parser backed by orjson when it is installed.
+
+Both fall back to the DRF implementations (stdlib json) when orjson is
+missing or cannot handle the payload, and produce the same documents:
+`Decimal` as numbers, UTC datetimes with a `Z` suffix, U+2028/U+2029
+escaped, and everything else through DRF's JSONEncoder.
+"""
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# types orjson does not know are converted like DRF does
+_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """Render JSON with orjson, like the DRF JSONRenderer."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+
+        renderer_context = renderer_context or {}
+        # orjson only writes compact, strict UTF-8 documents
+        if orjson is None or not self.compact or self.ensure_ascii \
+                or not self.strict \
+                or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # e.g. integers wider than 64 bits
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # keep the output a strict javascript subset, as JSONRenderer does
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028') \
+            .replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class FastJSONParser(JSONParser):
+    """Parse JSON with orjson, like the DRF JSONParser."""
+
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', 'utf-8')
+        if orjson is None or not self.strict \
+                or encoding.lower().replace('_', '-') != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,70 @@
+"""
+Serializer fields shared by the app serializers
+"""
+from drf_spectacular.utils import extend_schema_field
+from rest_framework import serializers
+
+from core.images import IMAGE_FIELDS, build_srcset
+
+
+def _names(value):
+    """Return the names of a comma separated parameter, None when empty."""
+    names = [name.strip() for name in (value or '').split(',')]
+    return [name for name in names if name] or None
+
+
+def sparse_fields(params, default_fields, expandable_fields=()):
+    """Return the field names asked for with `?fields=` and `?expand=`.
+
+    `?fields=` replaces `default_fields` and `?expand=` adds any of
+    `expandable_fields`. None when neither is given: all the defaults.
+    """
+    fields = _names(params.get('fields'))
+    expand = _names(params.get('expand'))
+    if fields is None and expand is None:
+        return None
+
+    selected = set(default_fields if fields is None else fields)
+    return selected | (set(expand or ()) & set(expandable_fields))
+
+
+@extend_schema_field({
+    'type': 'object',
+    'additionalProperties': {
+        'type': 'object',
+        'additionalProperties': {'type': 'string', 'format': 'uri'},
+    },
+})
+class SrcsetField(serializers.ReadOnlyField):
+    """Map of format -> width -> absolute url of an image's variants."""
+
+    def __init__(self, **kwargs):
+        kwargs['source'] = '*'
+        super().__init__(**kwargs)
+
+    def to_representation(self, instance):
+        image_field, variants_field = IMAGE_FIELDS[instance._meta.label]
+        return build_srcset(
+            getattr(instance, image_field),
+            getattr(instance, variants_field),
+            self.context.get('request'),
+        )
+
+
+class SparseFieldsMixin:
+    """Keep only the fields named in `context['fields']`, when it is set.
+
+    Keys that `to_representation` adds itself are checked with `wants()`,
+    so what they cost is skipped along with them.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.context.get('fields') is None:
+            return fields
+        return {name: field for name, field in fields.items() if self.wants(name)}
+
+    def wants(self, name):
+        """Return whether `name` is part of the representation."""
+        selected = self.context.get('fields')
+        return selected is None or name in selected
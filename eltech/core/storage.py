@@ -0,0 +1,164 @@
+"""
+Content-addressed media storage.
+
+Uploads are hashed while they are streamed to disk and stored once under
+a sharded layout, whatever name `upload_to` produced:
+
+    blobs/ab/cd/abcd1234....jpg
+
+Every stored reference is counted in `MediaBlob`; a blob and its variants
+are removed when the last reference is released, once the transaction
+releasing it commits. Uploads and releases of a blob lock its MediaBlob
+row, so a blob is never removed under an upload that reuses it. Image variants (see
+core.images) are derived files and are stored under their given name.
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from functools import partial
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_init, post_save
+
+BLOB_DIR = 'blobs'
+
+
+def blob_name(digest, extension):
+    """Return the sharded storage name of a blob."""
+    return os.path.join(BLOB_DIR, digest[:2], digest[2:4], f'{digest}{extension}')
+
+
+def is_blob_name(name):
+    """Return whether `name` is a content-addressed blob name."""
+    parts = name.replace('\\', '/').split('/')
+    return len(parts) == 4 and parts[0] == BLOB_DIR and parts[3].startswith(parts[1] + parts[2])
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """File system storage that deduplicates uploads by content hash."""
+
+    def _is_derived(self, name):
+        from core.images import variant_source_name
+        return variant_source_name(name) is not None
+
+    def get_available_name(self, name, max_length=None):
+        if self._is_derived(name):
+            return super().get_available_name(name, max_length)
+        # the final name is only known once the content is hashed
+        return name
+
+    def _save(self, name, content):
+        if self._is_derived(name):
+            return super()._save(name, content)
+
+        from core.models import MediaBlob
+
+        incoming = self.path(os.path.join(BLOB_DIR, '.incoming'))
+        os.makedirs(incoming, exist_ok=True)
+
+        digest = hashlib.sha256()
+        size = 0
+        with tempfile.NamedTemporaryFile(dir=incoming, delete=False) as temporary:
+            for chunk in content.chunks():
+                digest.update(chunk)
+                temporary.write(chunk)
+                size += len(chunk)
+
+        name = blob_name(digest.hexdigest(), os.path.splitext(name)[1].lower())
+        full_path = self.path(name)
+        directory = os.path.dirname(full_path)
+        if self.directory_permissions_mode is not None:
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+        # the row lock orders this upload with a delete() of the same blob
+        with transaction.atomic():
+            blob, _ = MediaBlob.objects.select_for_update().get_or_create(
+                name=name,
+                defaults={'digest': digest.hexdigest(), 'size': size},
+            )
+            if os.path.exists(full_path):
+                os.remove(temporary.name)
+                # restart the grace period of collect_orphaned_media
+                os.utime(full_path)
+            else:
+                os.replace(temporary.name, full_path)
+                if self.file_permissions_mode is not None:
+                    os.chmod(full_path, self.file_permissions_mode)
+            MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') + 1)
+
+        return name
+
+    def delete(self, name):
+        """Release one reference, removing the blob with the last one."""
+        if not name or not is_blob_name(name):
+            return super().delete(name)
+
+        from core.models import MediaBlob
+
+        with transaction.atomic():
+            blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+            if blob is not None and blob.ref_count > 1:
+                MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F('ref_count') - 1)
+                return
+            self.purge(name)
+
+    def purge(self, name):
+        """Remove a blob, its variants and its bookkeeping row."""
+        from core.models import MediaBlob
+
+        super().delete(name)
+        directory, basename = os.path.split(self.path(name))
+        shutil.rmtree(os.path.join(directory, 'variants', basename),
+                      ignore_errors=True)
+        MediaBlob.objects.filter(name=name).delete()
+
+
+def _remember_files(sender, instance, **kwargs):
+    from core.images import IMAGE_FIELDS
+    image_field, _ = IMAGE_FIELDS[sender._meta.label]
+    instance._stored_file_name = getattr(instance, image_field).name
+
+
+def _release(field_file, name):
+    # a rolled back delete or replacement keeps its file
+    if name and isinstance(field_file.storage, ContentAddressedStorage):
+        transaction.on_commit(partial(field_file.storage.delete, name))
+
+
+def _release_replaced_file(sender, instance, raw=False, **kwargs):
+    from core.images import IMAGE_FIELDS
+    image_field, _ = IMAGE_FIELDS[sender._meta.label]
+    field_file = getattr(instance, image_field)
+    previous = getattr(instance, '_stored_file_name', None)
+    if not raw and previous and previous != field_file.name:
+        _release(field_file, previous)
+    instance._stored_file_name = field_file.name
+
+
+def _release_deleted_file(sender, instance, **kwargs):
+    from core.images import IMAGE_FIELDS
+    image_field, _ = IMAGE_FIELDS[sender._meta.label]
+    field_file = getattr(instance, image_field)
+    _release(field_file, field_file.name)
+
+
+def connect_signals():
+    """Release blob references when images are replaced or deleted."""
+    from django.apps import apps
+    from core.images import IMAGE_FIELDS
+
+    for label in IMAGE_FIELDS:
+        model = apps.get_model(label)
+        uid = f'media-blobs-{label}'
+        post_init.connect(_remember_files, sender=model, dispatch_uid=uid)
+        post_save.connect(_release_replaced_file, sender=model, dispatch_uid=uid)
+        post_delete.connect(_release_deleted_file, sender=model, dispatch_uid=uid)
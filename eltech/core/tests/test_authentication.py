@@ -0,0 +1,70 @@
+"""Tests for cached token authentication"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core import models
+from core.authentication import token_cache_key
+
+ORDERS_URL = '/api/order/orders/'
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """Test token resolution is cached and invalidated."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = models.User.objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+            mobile_phone='01000000000',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return len(queries)
+
+    def test_second_request_skips_token_query(self):
+        """Test the token lookup query only runs on a cache miss."""
+        first = self._count_queries(ORDERS_URL)
+        second = self._count_queries(ORDERS_URL)
+
+        self.assertEqual(second, first - 1)
+
+    def test_logout_invalidates_token(self):
+        """Test logging out deletes the token and its cache entry."""
+        self._count_queries(ORDERS_URL)
+
+        res = self.client.post('/api/accounts/logout/')
+
+        self.assertEqual(res.status_code, 204)
+        self.assertIsNone(cache.get(token_cache_key(self.token.key)))
+        self.assertEqual(self.client.get(ORDERS_URL).status_code, 401)
+
+    def test_password_change_invalidates_cache(self):
+        """Test updating the password drops the cached token."""
+        self._count_queries(ORDERS_URL)
+
+        res = self.client.patch('/api/accounts/me/', {'password': 'newpass123'})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIsNone(cache.get(token_cache_key(self.token.key)))
+
+    def test_deactivation_applies_immediately(self):
+        """Test a deactivated user is rejected despite the cache."""
+        self._count_queries(ORDERS_URL)
+
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertEqual(self.client.get(ORDERS_URL).status_code, 401)
@@ -0,0 +1,50 @@
+"""Tests for payloads rebuilt in the background"""
+
+from unittest.mock import Mock, patch
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.test.client import RequestFactory
+
+from core.cache import CachedPayload
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True,
+                   ALLOWED_HOSTS=['shop.example.com', 'other.example.com'])
+class CachedPayloadTests(TestCase):
+    """Test stale payloads are served while they are rebuilt."""
+
+    def setUp(self):
+        cache.clear()
+        self.build = Mock(side_effect=lambda request: request.build_absolute_uri('/'))
+        self.payload = CachedPayload('test', self.build, timeout=60)
+        self.request = RequestFactory().get('/', HTTP_HOST='shop.example.com')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_built_once_per_origin(self):
+        self.assertEqual(self.payload.get(self.request), 'http://shop.example.com/')
+        self.assertEqual(self.payload.get(self.request), 'http://shop.example.com/')
+        other = RequestFactory().get('/', HTTP_HOST='other.example.com', secure=True)
+        self.assertEqual(self.payload.get(other), 'https://other.example.com/')
+
+        self.assertEqual(self.build.call_count, 2)
+
+    def test_stale_payload_served_while_rebuilt(self):
+        self.payload.get(self.request)
+
+        with patch('core.cache.time.time', return_value=10 ** 10), \
+                self.captureOnCommitCallbacks(execute=True):
+            # built before, the rebuild runs after the response
+            self.payload.get(self.request)
+            self.assertEqual(self.build.call_count, 1)
+            self.payload.get(self.request)
+        self.assertEqual(self.build.call_count, 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.payload.invalidate()
+            self.payload.invalidate()
+        self.assertEqual(self.build.call_count, 3)
+        rebuilt_request = self.build.call_args.args[0]
+        self.assertEqual(rebuilt_request.build_absolute_uri('/'), 'http://shop.example.com/')
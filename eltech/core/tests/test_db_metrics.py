@@ -0,0 +1,50 @@
+"""Tests for the database connection metrics"""
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.backends.signals import connection_created
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import db_metrics
+
+DB_METRICS_URL = reverse('health-check-db')
+
+
+class DbMetricsTests(TestCase):
+    """Test the per-process connection metrics."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_snapshot_counts_requests_and_connections(self):
+        before = db_metrics.snapshot()
+
+        self.client.get(reverse('health-check'))
+        connection_created.send(sender=connection.__class__, connection=connection)
+
+        after = db_metrics.snapshot()
+        self.assertEqual(after['requests'], before['requests'] + 1)
+        self.assertEqual(
+            after['connections_opened']['default'],
+            before['connections_opened'].get('default', 0) + 1)
+        self.assertIn('default', after['conn_max_age'])
+
+    def test_endpoint_requires_admin(self):
+        res = self.client.get(DB_METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_endpoint_returns_metrics(self):
+        admin = get_user_model().objects.create_superuser(
+            email='admin@example.com', password='testpass123')
+        self.client.force_authenticate(admin)
+
+        res = self.client.get(DB_METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('reuse_ratio', res.data)
+        self.assertGreaterEqual(res.data['requests'], 1)
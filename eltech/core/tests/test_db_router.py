@@ -0,0 +1,147 @@
+"""Tests for the primary/replica database router"""
+
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+
+from core.db_router import PrimaryReplicaRouter, ReplicaRoutingMiddleware
+from core.models import Cart, Category, Product
+
+
+def read_database_view(request):
+    """Return the alias product and cart reads are routed to."""
+    return HttpResponse(f'{Product.objects.all().db},{Cart.objects.all().db}')
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], READ_YOUR_WRITES_SECONDS=10)
+class ReplicaRoutingTests(SimpleTestCase):
+    """Test reads are routed to replicas only when safe."""
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.middleware = ReplicaRoutingMiddleware(read_database_view)
+
+    def _read_database(self, method='get', **extra):
+        request = getattr(self.factory, method)('/', **extra)
+        return self.middleware(request).content.decode()
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertEqual(Product.objects.all().db, 'default')
+
+    def test_safe_request_reads_from_replica(self):
+        self.assertEqual(self._read_database(), 'replica,replica')
+
+    def test_writes_go_to_primary(self):
+        self.assertEqual(self._read_database('post'), 'default,default')
+        self.assertEqual(
+            PrimaryReplicaRouter().db_for_write(Product), 'default')
+
+    def test_client_pinned_to_primary_after_write(self):
+        self._read_database('post', HTTP_AUTHORIZATION='Token abc')
+
+        self.assertEqual(self._read_database(), 'default,default')
+        # another client still reads from the replica
+        self.assertEqual(
+            self._read_database(REMOTE_ADDR='10.0.0.2'), 'replica,replica')
+
+    def test_token_pinned_from_another_address(self):
+        self._read_database('post', HTTP_AUTHORIZATION='Token abc')
+
+        self.assertEqual(
+            self._read_database(REMOTE_ADDR='10.0.0.2',
+                                HTTP_AUTHORIZATION='Token abc'),
+            'default,default')
+
+    @override_settings(READ_YOUR_WRITES_SECONDS=0)
+    def test_pin_expires(self):
+        self._read_database('post')
+
+        self.assertEqual(self._read_database(), 'replica,replica')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas_configured(self):
+        self.assertEqual(self._read_database(), 'default,default')
+
+    def test_replicas_are_not_migrated(self):
+        router = PrimaryReplicaRouter()
+
+        self.assertTrue(router.allow_migrate('default', 'core'))
+        self.assertFalse(router.allow_migrate('replica', 'core'))
+
+
+def category_names_view(request):
+    """Create a category on writes, return the names of the categories read."""
+    if request.method == 'POST':
+        Category.objects.create(name='Written')
+    return HttpResponse(','.join(
+        Category.objects.order_by('name').values_list('name', flat=True)))
+
+
+# set up by eltech.settings.sqlite
+REPLICA_CONFIGURED = 'replica' in settings.DATABASES
+
+
+@skipUnless(REPLICA_CONFIGURED, 'run with --settings=eltech.settings.sqlite')
+@override_settings(DATABASE_REPLICAS=['replica'], READ_YOUR_WRITES_SECONDS=10)
+class ReplicaDatabaseTests(TestCase):
+    """Test the rows and reads hit the database the router picks."""
+    # the test runner sets up the databases of skipped tests too
+    databases = {'default', 'replica'} if REPLICA_CONFIGURED else {'default'}
+
+    @classmethod
+    def setUpClass(cls):
+        # replicas are not migrated, they copy the schema of the primary
+        with connections['replica'].schema_editor() as editor:
+            editor.create_model(Category)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        with connections['replica'].schema_editor() as editor:
+            editor.delete_model(Category)
+
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.middleware = ReplicaRoutingMiddleware(category_names_view)
+        Category.objects.create(name='Primary')
+        Category.objects.using('replica').create(name='Replica')
+
+    def tearDown(self):
+        cache.clear()
+
+    def _names(self, method='get', **extra):
+        request = getattr(self.factory, method)('/', **extra)
+        return self.middleware(request).content.decode()
+
+    def _stored(self, alias):
+        return list(Category.objects.using(alias).order_by('name')
+                    .values_list('name', flat=True))
+
+    def test_writes_stored_on_primary(self):
+        Category.objects.create(name='Outside')
+
+        self.assertEqual(self._stored('default'), ['Outside', 'Primary'])
+        self.assertEqual(self._stored('replica'), ['Replica'])
+
+    def test_safe_request_reads_replica(self):
+        self.assertEqual(self._names(), 'Replica')
+
+    def test_write_request_reads_its_own_rows(self):
+        self.assertEqual(self._names('post'), 'Primary,Written')
+        self.assertEqual(self._stored('replica'), ['Replica'])
+
+    def test_client_reads_primary_after_write(self):
+        self._names('post', HTTP_AUTHORIZATION='Token abc')
+
+        self.assertEqual(self._names(), 'Primary,Written')
+        self.assertEqual(self._names(REMOTE_ADDR='10.0.0.2',
+                                     HTTP_AUTHORIZATION='Token abc'), 'Primary,Written')
+        # another client still reads from the replica
+        self.assertEqual(self._names(REMOTE_ADDR='10.0.0.2'), 'Replica')
@@ -0,0 +1,145 @@
+"""Tests for the `.values()` based list serializers"""
+
+import shutil
+import tempfile
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core import models
+from core.fastserializers import FastSerializer
+from post.serializers import (
+    CommentSerializer,
+    FastCommentSerializer,
+    FastPostSerializer,
+    PostSerializer,
+)
+from product.serializers import FastProductSerializer, ProductSerializer
+
+
+def upload(name):
+    return SimpleUploadedFile(name, b'', content_type='image/jpeg')
+
+
+def set_variants(queryset, field='image'):
+    """Record variants for the current images of `queryset`."""
+    for instance in queryset:
+        name = getattr(instance, field).name
+        queryset.filter(pk=instance.pk).update(**{f'{field}_variants': {
+            'source': name,
+            'webp': {'400': f'{name}/400.webp'},
+        }})
+
+
+class FastSerializerParityTests(TestCase):
+    """Test fast serializers render the same bytes as the serializers."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+
+        self.request = APIRequestFactory().get('/')
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='testpass123',
+            mobile_phone='01000000000', first_name='Ahmed', last_name='علي')
+        self.category = models.Category.objects.create(
+            name='Laptops', image=upload('category.jpg'))
+        set_variants(models.Category.objects.all())
+        empty_category = models.Category.objects.create(name='Empty')
+
+        for i in range(5):
+            product = models.Product.objects.create(
+                name=f'Product {i}', description='Fast\u2028laptop',
+                price=Decimal(f'{i}99.9'), stock=i, is_hot=i % 2 == 0,
+                sale_amount=i * 5, category=self.category)
+            for is_thumbnail in [False, True, True][:i]:
+                models.ProductImage.objects.create(
+                    product=product, is_thumbnail=is_thumbnail,
+                    image=upload(f'p{i}.jpg'))
+        models.ProductImage.objects.filter(product__name='Product 2').update(
+            width=400, height=300, placeholder='data:image/jpeg;base64,AAAA')
+        set_variants(models.ProductImage.objects.filter(product__name='Product 3'))
+
+        for i, category in enumerate([self.category, empty_category]):
+            post = models.Post.objects.create(
+                title=f'Post {i}', content='Content', image=upload(f'post{i}.jpg'),
+                user=self.user, category=category, image_width=800)
+        set_variants(models.Post.objects.filter(pk=post.pk))
+        comment = models.Comment.objects.create(post=post, user=self.user, content='First')
+        models.Comment.objects.create(
+            post=post, user=self.user, content='Reply', parent=comment)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def assertSameOutput(self, serializer_class, fast_serializer_class, queryset, context):
+        expected = serializer_class(queryset, many=True, context=context).data
+        data = fast_serializer_class(
+            fast_serializer_class.values(queryset), context=context).data
+
+        self.assertEqual(JSONRenderer().render(data), JSONRenderer().render(expected))
+
+    def test_products(self):
+        queryset = models.Product.objects.order_by('pk')
+
+        for context in [{'request': self.request}, {}]:
+            self.assertSameOutput(ProductSerializer, FastProductSerializer, queryset, context)
+
+    def test_posts(self):
+        queryset = models.Post.objects.order_by('pk')
+
+        for context in [{'request': self.request}, {}]:
+            self.assertSameOutput(PostSerializer, FastPostSerializer, queryset, context)
+
+    def test_comments(self):
+        self.assertSameOutput(
+            CommentSerializer, FastCommentSerializer,
+            models.Comment.objects.order_by('pk'), {})
+
+    def test_list_endpoints(self):
+        client = APIClient()
+        cases = [
+            (reverse('product:product-list'), ProductSerializer,
+             models.Product.objects.all()),
+            (reverse('product:product-list') + '?ordering=-price', ProductSerializer,
+             models.Product.objects.order_by('-price')),
+            (reverse('post:post-list'), PostSerializer, models.Post.objects.all()),
+        ]
+
+        for url, serializer_class, queryset in cases:
+            res = client.get(url)
+            expected = serializer_class(
+                queryset, many=True, context={'request': res.wsgi_request}).data
+            results = res.json()
+            results = results['results'] if 'results' in results else results
+            self.assertEqual(
+                JSONRenderer().render(results), JSONRenderer().render(expected))
+
+        post = models.Post.objects.last()
+        res = client.get(reverse('post:post-comments', args=[post.pk]))
+        expected = CommentSerializer(post.comments.all(), many=True).data
+        self.assertEqual(res.content, JSONRenderer().render(expected))
+
+    def test_unplanned_field_raises(self):
+        class MethodSerializer(serializers.ModelSerializer):
+            upper_name = serializers.SerializerMethodField()
+
+            class Meta:
+                model = models.Category
+                fields = ['id', 'upper_name']
+
+        class FastMethodSerializer(FastSerializer):
+            serializer_class = MethodSerializer
+
+        with self.assertRaises(ImproperlyConfigured):
+            FastMethodSerializer.values(models.Category.objects.all())
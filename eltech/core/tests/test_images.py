@@ -0,0 +1,132 @@
+"""Tests for responsive image variants"""
+
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from PIL import Image
+from rest_framework.test import APIRequestFactory
+
+from core import models
+from core.images import build_srcset, variant_name, variant_source_name
+from product.serializers import ProductThumbnailSerializer
+
+
+def image_upload(name='image.png', size=(1000, 500), mode='RGBA'):
+    """Return an uploaded PNG image of the given size"""
+    buffer = BytesIO()
+    Image.new(mode, size, (255, 0, 0, 128)).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class VariantNameTests(TestCase):
+    """Test variant naming."""
+
+    def test_variant_name_round_trip(self):
+        name = variant_name('uploads/product/abc.jpg', 400, 'webp')
+
+        self.assertEqual(name, 'uploads/product/variants/abc.jpg/400.webp')
+        self.assertEqual(variant_source_name(name), 'uploads/product/abc.jpg')
+        self.assertIsNone(variant_source_name('uploads/product/abc.jpg'))
+
+
+@override_settings(
+    BACKGROUND_TASKS_EAGER=True,
+    IMAGE_VARIANT_WIDTHS=[200, 400, 2000],
+    IMAGE_VARIANT_FORMATS=['webp', 'jpeg'],
+)
+class ImageVariantTests(TestCase):
+    """Test variants are generated after upload."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        category = models.Category.objects.create(name='Category')
+        self.product = models.Product.objects.create(
+            name='Product', price='10.00', stock=1, category=category)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def _create_image(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image = models.ProductImage.objects.create(
+                product=self.product, is_thumbnail=True, image=image_upload())
+        image.refresh_from_db()
+        return image
+
+    def test_variants_generated_after_upload(self):
+        """Test smaller renditions are written in every format."""
+        image = self._create_image()
+
+        variants = image.image_variants
+        self.assertEqual(variants['source'], image.image.name)
+        # never upscale past the original width
+        self.assertEqual(sorted(variants['webp']), ['200', '400'])
+        self.assertEqual(sorted(variants['jpeg']), ['200', '400'])
+
+        storage = image.image.storage
+        with storage.open(variants['jpeg']['200']) as file:
+            rendition = Image.open(file)
+            self.assertEqual(rendition.format, 'JPEG')
+            self.assertEqual(rendition.size, (200, 100))
+
+    def test_replaced_image_has_no_srcset_until_processed(self):
+        """Test stale variants are never served for a new image."""
+        image = self._create_image()
+        image.image = image_upload('other.png')
+        models.ProductImage.objects.bulk_update([image], ['image'])
+
+        self.assertEqual(build_srcset(image.image, image.image_variants), {})
+
+    def test_thumbnail_serializer_exposes_srcset(self):
+        """Test the thumbnail representation maps formats to urls."""
+        image = self._create_image()
+        request = APIRequestFactory().get('/')
+
+        data = ProductThumbnailSerializer(image, context={'request': request}).data
+
+        self.assertEqual(
+            set(data['srcset']), {'webp', 'jpeg'})
+        self.assertTrue(data['srcset']['webp']['200'].startswith('http://testserver/'))
+
+    def test_placeholder_and_size_stored_after_upload(self):
+        """Test the intrinsic size and inline preview are stored."""
+        image = self._create_image()
+
+        self.assertEqual((image.width, image.height), (1000, 500))
+        self.assertTrue(image.placeholder.startswith('data:image/jpeg;base64,'))
+
+        request = APIRequestFactory().get('/')
+        data = ProductThumbnailSerializer(image, context={'request': request}).data
+        self.assertEqual(data['placeholder'], image.placeholder)
+        self.assertEqual((data['width'], data['height']), (1000, 500))
+
+    def test_replaced_image_clears_placeholder(self):
+        """Test the preview of a replaced image is not kept."""
+        image = self._create_image()
+
+        image.image = image_upload('other.png', size=(300, 600))
+        with self.captureOnCommitCallbacks(execute=False):
+            image.save()
+        image.refresh_from_db()
+
+        self.assertEqual(image.placeholder, '')
+        self.assertIsNone(image.width)
+
+    def test_backfill_placeholders(self):
+        """Test the command fills in rows without a placeholder."""
+        image = self._create_image()
+        models.ProductImage.objects.update(width=None, height=None, placeholder='')
+
+        call_command('generate_image_placeholders', stdout=StringIO())
+
+        image.refresh_from_db()
+        self.assertEqual((image.width, image.height), (1000, 500))
+        self.assertTrue(image.placeholder)
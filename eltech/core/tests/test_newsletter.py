@@ -0,0 +1,167 @@
+"""Tests for newsletter delivery"""
+
+import os
+import tempfile
+from smtplib import SMTPRecipientsRefused, SMTPServerDisconnected
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+from core import models
+from core.newsletter import deliver_campaign
+
+
+def create_subscribers(count, subscribed=True):
+    """Create and return users with the given subscription state"""
+    return [
+        models.User.objects.create(
+            email=f'user{subscribed}{i}@example.com',
+            mobile_phone=f'{int(subscribed)}{i:010d}',
+            is_subscribed=subscribed,
+        )
+        for i in range(count)
+    ]
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    NEWSLETTER_RATE_LIMIT=0,
+)
+class NewsletterTests(TestCase):
+    """Test newsletter campaigns."""
+
+    def setUp(self):
+        self.campaign = models.NewsletterCampaign.objects.create(
+            subject='News', body='Hello')
+
+    def test_sends_to_subscribers_only(self):
+        """Test only subscribed users receive the campaign."""
+        create_subscribers(5)
+        create_subscribers(2, subscribed=False)
+
+        delivered = deliver_campaign(self.campaign, batch_size=2)
+
+        self.assertEqual(delivered, 5)
+        self.assertEqual(len(mail.outbox), 5)
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'sent')
+        self.assertEqual(self.campaign.sent_count, 5)
+
+    def test_batches_share_one_connection(self):
+        """Test every batch is sent over the same connection."""
+        create_subscribers(5)
+
+        with patch('core.newsletter.get_connection',
+                   wraps=mail.get_connection) as get_connection:
+            deliver_campaign(self.campaign, batch_size=2)
+
+        get_connection.assert_called_once()
+
+    def test_resumes_after_checkpoint(self):
+        """Test a crashed run resumes after the last delivered batch."""
+        users = create_subscribers(5)
+        original = mail.get_connection().__class__.send_messages
+        calls = []
+
+        def crash_on_second_batch(connection, messages):
+            calls.append(messages)
+            # the first message of the second batch
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            return original(connection, messages)
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                   crash_on_second_batch):
+            with self.assertRaises(KeyboardInterrupt):
+                deliver_campaign(self.campaign, batch_size=2)
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'sending')
+        self.assertEqual(self.campaign.last_recipient_id, users[1].pk)
+
+        deliver_campaign(self.campaign, batch_size=2)
+
+        recipients = [m.to[0] for m in mail.outbox]
+        self.assertEqual(recipients, [u.email for u in users])
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.sent_count, 5)
+
+    def test_failed_message_does_not_resend_batch(self):
+        """Test a refused recipient only fails its own message."""
+        users = create_subscribers(3)
+        original = mail.get_connection().__class__.send_messages
+
+        def refuse_second_user(connection, messages):
+            if messages[0].to == [users[1].email]:
+                raise SMTPRecipientsRefused({users[1].email: (550, b'No such user')})
+            return original(connection, messages)
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                   refuse_second_user):
+            delivered = deliver_campaign(self.campaign, batch_size=3)
+
+        self.assertEqual(delivered, 2)
+        self.assertEqual([m.to[0] for m in mail.outbox],
+                         [users[0].email, users[2].email])
+        self.campaign.refresh_from_db()
+        self.assertEqual((self.campaign.sent_count, self.campaign.failed_count), (2, 1))
+
+    def test_backend_down_stops_before_unsent(self):
+        """Test a connection error leaves the rest for the next run."""
+        users = create_subscribers(5)
+        original = mail.get_connection().__class__.send_messages
+        calls = []
+
+        def disconnect_on_second_message(connection, messages):
+            calls.append(messages)
+            if len(calls) == 2:
+                raise SMTPServerDisconnected('Connection unexpectedly closed')
+            return original(connection, messages)
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.send_messages',
+                   disconnect_on_second_message):
+            with self.assertRaises(SMTPServerDisconnected):
+                deliver_campaign(self.campaign, batch_size=3)
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'sending')
+        self.assertEqual(self.campaign.last_recipient_id, users[0].pk)
+        self.assertEqual((self.campaign.sent_count, self.campaign.failed_count), (1, 0))
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.open',
+                   side_effect=ConnectionRefusedError):
+            with self.assertRaises(CommandError):
+                call_command('send_newsletter', self.campaign.id,
+                             batch_size=3, stdout=StringIO())
+
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.last_recipient_id, users[0].pk)
+
+        deliver_campaign(self.campaign, batch_size=3)
+
+        self.assertEqual([m.to[0] for m in mail.outbox], [u.email for u in users])
+        self.campaign.refresh_from_db()
+        self.assertEqual(self.campaign.status, 'sent')
+        self.assertEqual((self.campaign.sent_count, self.campaign.failed_count), (5, 0))
+
+    def test_command_with_file_backend(self):
+        """Test the command writes every message with the file backend."""
+        create_subscribers(3)
+
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(
+                EMAIL_BACKEND='django.core.mail.backends.filebased.EmailBackend',
+                EMAIL_FILE_PATH=directory,
+            ):
+                call_command('send_newsletter', self.campaign.id,
+                             batch_size=2, stdout=StringIO())
+
+            content = ''.join(
+                open(os.path.join(directory, name)).read()
+                for name in os.listdir(directory)
+            )
+
+        self.assertEqual(content.count('Subject: News'), 3)
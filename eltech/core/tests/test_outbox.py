@@ -0,0 +1,99 @@
+"""Tests for the transactional email outbox"""
+
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import models
+from core.outbox import enqueue_email, send_queued_emails
+
+
+@override_settings(
+    EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend',
+    EMAIL_OUTBOX_MAX_ATTEMPTS=2,
+    EMAIL_OUTBOX_RETRY_DELAY=60,
+)
+class OutboxTests(TestCase):
+    """Test queueing and delivering emails."""
+
+    def test_enqueue_does_not_send(self):
+        """Test queueing an email stores it without sending."""
+        enqueue_email('Subject', 'Body', None, ['user@example.com'])
+
+        self.assertEqual(len(mail.outbox), 0)
+        email = models.OutboxEmail.objects.get()
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.recipients, ['user@example.com'])
+
+    def test_send_queued_emails(self):
+        """Test the worker sends due emails and marks them sent."""
+        for i in range(3):
+            enqueue_email(f'Subject {i}', 'Body', 'from@example.com',
+                          [f'user{i}@example.com'])
+
+        with patch('core.outbox.get_connection',
+                   wraps=mail.get_connection) as get_connection:
+            sent, failed = send_queued_emails(batch_size=10)
+
+        get_connection.assert_called_once()
+        self.assertEqual((sent, failed), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertFalse(
+            models.OutboxEmail.objects.exclude(status='sent').exists())
+
+    def test_failed_email_is_retried_with_backoff(self):
+        """Test a failing email is rescheduled, then marked failed."""
+        enqueue_email('Subject', 'Body', None, ['user@example.com'])
+
+        with patch('core.outbox.EmailMessage.send', side_effect=OSError('down')):
+            sent, failed = send_queued_emails()
+
+        self.assertEqual((sent, failed), (0, 1))
+        email = models.OutboxEmail.objects.get()
+        self.assertEqual(email.status, 'pending')
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.send_after, timezone.now() + timedelta(seconds=50))
+
+        # not due yet
+        self.assertEqual(send_queued_emails(), (0, 0))
+
+        models.OutboxEmail.objects.update(send_after=timezone.now())
+        with patch('core.outbox.EmailMessage.send', side_effect=OSError('down')):
+            send_queued_emails()
+
+        email.refresh_from_db()
+        self.assertEqual(email.status, 'failed')
+        self.assertEqual(email.last_error, 'down')
+
+    @override_settings(
+        EMAIL_BACKEND='django.core.mail.backends.filebased.EmailBackend')
+    def test_command_drains_outbox_with_file_backend(self):
+        """Test the management command delivers with the file backend."""
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(EMAIL_FILE_PATH=directory):
+                for i in range(3):
+                    enqueue_email('Subject', 'Body', None, [f'u{i}@example.com'])
+
+                call_command('send_queued_emails', batch_size=2, stdout=StringIO())
+
+            self.assertEqual(
+                models.OutboxEmail.objects.filter(status='sent').count(), 3)
+
+    def test_password_reset_queues_email(self):
+        """Test the password reset request no longer sends inline."""
+        models.User.objects.create_user(
+            email='user@example.com', password='testpass123',
+            mobile_phone='01000000000')
+
+        res = self.client.post('/api/accounts/password-reset/',
+                               {'email': 'user@example.com'})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(models.OutboxEmail.objects.count(), 1)
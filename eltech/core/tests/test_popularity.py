@@ -0,0 +1,70 @@
+"""Tests for the most viewed products leaderboards"""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from rest_framework.test import APIClient
+
+from core import models
+from core.popularity import rank_popular_products
+
+PRODUCTS_URL = '/api/product/products/'
+
+
+class PopularityRankTests(TestCase):
+    """Test popular products are paged through the stored ranking."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.laptops = models.Category.objects.create(name='Laptops')
+        self.phones = models.Category.objects.create(name='Phones')
+        self.products = [
+            models.Product.objects.create(
+                name=f'Product {i}', price=Decimal('10.00'), stock=1,
+                view_count=views, category=category)
+            for i, (views, category) in enumerate([
+                (5, self.laptops), (50, self.phones), (20, self.laptops),
+                (20, self.phones), (1, self.laptops),
+            ])
+        ]
+
+    def _popular_ids(self, **params):
+        res = self.client.get(PRODUCTS_URL, {'is_popular': 1, **params})
+        return [product['id'] for product in res.json()['results']]
+
+    def test_rankings_stored_per_category(self):
+        out = StringIO()
+        call_command('rank_popular_products', '--size', '2', stdout=out)
+
+        self.assertIn('6 ranks stored.', out.getvalue())
+        ranks = models.PopularityRank.objects.order_by('category', 'rank') \
+            .values_list('category', 'product', 'rank')
+        ids = [product.pk for product in self.products]
+        self.assertEqual(list(ranks), [
+            (None, ids[1], 1), (None, ids[2], 2),
+            (self.laptops.pk, ids[2], 1), (self.laptops.pk, ids[0], 2),
+            (self.phones.pk, ids[1], 1), (self.phones.pk, ids[3], 2),
+        ])
+
+    def test_popular_list_pages_through_ranking(self):
+        live = self._popular_ids()
+        rank_popular_products()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._popular_ids(), live)
+        self.assertFalse(any('view_count" DESC' in query['sql'] for query in queries))
+
+        # the ranking only moves when it is rebuilt
+        models.Product.objects.filter(pk=self.products[4].pk).update(view_count=100)
+        self.assertEqual(self._popular_ids(), live)
+        self.assertEqual(
+            self._popular_ids(category=self.laptops.pk),
+            [self.products[2].pk, self.products[0].pk, self.products[4].pk])
+
+        rank_popular_products()
+        self.assertEqual(self._popular_ids()[0], self.products[4].pk)
@@ -0,0 +1,127 @@
+"""Tests for the "customers also bought" recommendations"""
+
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from rest_framework.test import APIClient
+
+from core import models
+from core.recommendations import update_related_products
+
+
+@override_settings(RELATED_PRODUCTS=2)
+class RelatedProductsTests(TestCase):
+    """Test related products are ranked from the orders, incrementally."""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='testpass123', mobile_phone='01000000000')
+        category = models.Category.objects.create(name='Category')
+        self.a, self.b, self.c, self.d = [
+            models.Product.objects.create(
+                name=name, price=Decimal('10.00'), stock=5, category=category)
+            for name in 'ABCD'
+        ]
+
+    def _order(self, *products):
+        order = models.Order.objects.create(user=self.user)
+        for product in products:
+            models.OrderProduct.objects.create(order=order, product=product)
+        return order
+
+    def _related(self, product):
+        return list(models.RelatedProduct.objects.filter(product=product)
+                    .order_by('rank').values_list('related', flat=True))
+
+    def test_ranked_incrementally(self):
+        self._order(self.a, self.b, self.c)
+        self._order(self.a, self.b)
+        self._order(self.b, self.d)
+
+        out = StringIO()
+        call_command('update_related_products', stdout=out)
+        self.assertIn('3 orders counted.', out.getvalue())
+        # B and C tie for A, the oldest product wins
+        self.assertEqual(self._related(self.a), [self.b.pk, self.c.pk])
+        self.assertEqual(self._related(self.b), [self.a.pk, self.c.pk])
+        self.assertEqual(self._related(self.d), [self.b.pk])
+        score = models.RelatedProduct.objects.get(product=self.a, related=self.b).score
+        self.assertAlmostEqual(score, 2 / 6 ** 0.5)
+
+        self.assertEqual(update_related_products(), 0)
+
+        self._order(self.c, self.d)
+        self.assertEqual(update_related_products(batch_size=1), 1)
+        self.assertEqual(self._related(self.c), [self.a.pk, self.d.pk])
+        self.assertEqual(self._related(self.d), [self.c.pk, self.b.pk])
+        self.assertEqual(
+            models.ProductCooccurrence.objects.get(product=self.d, other=self.d).orders, 2)
+
+    def test_late_and_edited_baskets_counted(self):
+        # counted before its products were saved, like a commit landing late
+        order = self._order()
+        later = self._order(self.c, self.d)
+        self.assertEqual(update_related_products(), 2)
+        self.assertEqual(self._related(self.a), [])
+
+        for product in (self.a, self.b, self.c):
+            models.OrderProduct.objects.create(order=order, product=product)
+        self.assertEqual(update_related_products(), 1)
+        self.assertEqual(self._related(self.a), [self.b.pk, self.c.pk])
+
+        models.OrderProduct.objects.filter(order=later, product=self.d).delete()
+        self.assertEqual(update_related_products(), 1)
+        self.assertEqual(self._related(self.d), [])
+        self.assertFalse(models.ProductCooccurrence.objects.filter(product=self.d).exists())
+        self.assertEqual(
+            models.ProductCooccurrence.objects.get(product=self.c, other=self.c).orders, 2)
+        self.assertEqual(update_related_products(), 0)
+
+    def test_deleted_product_pairs_dropped(self):
+        self._order(self.a, self.b, self.c)
+        self._order(self.a, self.b)
+        self.assertEqual(update_related_products(), 2)
+
+        # takes its order products and co-occurrences along
+        self.c.delete()
+        self.assertEqual(update_related_products(), 1)
+        self.assertEqual(update_related_products(), 0)
+        self.assertEqual(self._related(self.a), [self.b.pk])
+        self.assertEqual(
+            models.ProductCooccurrence.objects.get(product=self.a, other=self.a).orders, 2)
+
+        self.b.delete()
+        self._order(self.a)
+        self.assertEqual(update_related_products(), 3)
+        self.assertEqual(self._related(self.a), [])
+        self.assertEqual(
+            list(models.ProductCooccurrence.objects.values_list('product', 'other', 'orders')),
+            [(self.a.pk, self.a.pk, 3)])
+
+    def test_product_detail_related_products(self):
+        models.ProductImage.objects.create(
+            product=self.b, is_thumbnail=True,
+            image=SimpleUploadedFile('b.jpg', b'', content_type='image/jpeg'))
+        self._order(self.a, self.b, self.c)
+        update_related_products()
+        client = APIClient()
+
+        with self.assertNumQueries(3):
+            res = client.get(f'/api/product/products/{self.a.pk}/',
+                             {'fields': 'id,related_products'})
+
+        related = res.json()['related_products']
+        self.assertEqual([product['id'] for product in related], [self.b.pk, self.c.pk])
+        self.assertTrue(related[0]['thumbnail']['image'].endswith('.jpg'))
+        self.assertEqual(related[1]['thumbnail'], {})
+
+        res = client.get('/api/product/products/batch/',
+                         {'ids': f'{self.a.pk},{self.b.pk}', 'detail': 1})
+        results = res.json()['results']
+        self.assertEqual([product['id'] for product in results[1]['related_products']],
+                         [self.a.pk, self.c.pk])
@@ -0,0 +1,82 @@
+"""Tests for the orjson backed renderer and parser"""
+
+import datetime
+import uuid
+from collections import OrderedDict
+from decimal import Decimal
+from io import BytesIO
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from core import renderers
+from core.renderers import FastJSONParser, FastJSONRenderer
+
+PAYLOAD = OrderedDict([
+    ('price', Decimal('1999.90')),
+    ('created_at', datetime.datetime(2023, 11, 5, 10, 30, 15, 120000,
+                                     tzinfo=datetime.timezone.utc)),
+    ('local_time', timezone.make_aware(
+        datetime.datetime(2023, 11, 5, 10, 30),
+        timezone=datetime.timezone(datetime.timedelta(hours=2)))),
+    ('deal_time', datetime.date(2023, 11, 5)),
+    ('id', uuid.UUID('12345678-1234-5678-1234-567812345678')),
+    ('label', gettext_lazy('Product')),
+    ('name', 'Laptop\u2028\u2029 الإلكترونيات'),
+    ('duration', datetime.timedelta(minutes=2)),
+    ('ids', (1, 2, 3)),
+    ('nested', [{'rating': 5, 'user': None, 'hot': True}]),
+    (1, 'integer key'),
+])
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """Test the renderer writes what JSONRenderer writes."""
+
+    def test_same_output_as_json_renderer(self):
+        self.assertEqual(
+            FastJSONRenderer().render(PAYLOAD),
+            JSONRenderer().render(PAYLOAD),
+        )
+
+    def test_same_output_without_orjson(self):
+        with patch.object(renderers, 'orjson', None):
+            self.assertEqual(
+                FastJSONRenderer().render(PAYLOAD),
+                JSONRenderer().render(PAYLOAD),
+            )
+
+    def test_indent_and_large_integers_use_json_renderer(self):
+        data = {'big': 2 ** 70, 'name': 'Laptop'}
+
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            FastJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4'),
+        )
+
+    def test_none_renders_empty(self):
+        self.assertEqual(FastJSONRenderer().render(None), b'')
+
+
+class FastJSONParserTests(SimpleTestCase):
+    """Test the parser reads what JSONParser reads."""
+
+    def test_same_result_as_json_parser(self):
+        body = '{"name": "الإلكترونيات", "price": 10.5, "tags": [1, null]}'.encode()
+
+        self.assertEqual(
+            FastJSONParser().parse(BytesIO(body)),
+            JSONParser().parse(BytesIO(body)),
+        )
+
+    def test_invalid_json_raises_parse_error(self):
+        for body in [b'{"name": ', b'{"price": NaN}']:
+            with self.assertRaises(ParseError):
+                FastJSONParser().parse(BytesIO(body))
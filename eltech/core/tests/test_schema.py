@@ -0,0 +1,96 @@
+"""Tests for the cached OpenAPI schema"""
+
+import os
+import shutil
+import tempfile
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from drf_spectacular.generators import SchemaGenerator
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.views import CachedSchemaView
+
+SCHEMA_URL = reverse('api-schema')
+
+
+class CachedSchemaTests(TestCase):
+    """Test the schema is built once and revalidated with an ETag."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.directory = tempfile.mkdtemp()
+        self.schema_file = os.path.join(self.directory, 'schema.yml')
+        self.settings_override = override_settings(API_SCHEMA_FILE=self.schema_file)
+        self.settings_override.enable()
+        CachedSchemaView._rendered.clear()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.directory)
+        CachedSchemaView._rendered.clear()
+
+    def test_schema_generated_once_without_file(self):
+        with patch.object(SchemaGenerator, 'get_schema', autospec=True,
+                          side_effect=SchemaGenerator.get_schema) as generate:
+            first = self.client.get(SCHEMA_URL)
+            second = self.client.get(SCHEMA_URL)
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(first.content, second.content)
+        self.assertIn(b'/api/product/products/', first.content)
+        self.assertEqual(generate.call_count, 1)
+
+    def test_etag_answers_not_modified(self):
+        res = self.client.get(SCHEMA_URL)
+
+        res = self.client.get(SCHEMA_URL, HTTP_IF_NONE_MATCH=res['ETag'])
+
+        self.assertEqual(res.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(res.content, b'')
+
+    def test_prebuilt_file_is_served(self):
+        call_command('generate_schema', stdout=StringIO(), stderr=StringIO())
+        self.assertTrue(os.path.exists(self.schema_file))
+        with open(self.schema_file, 'a', encoding='utf-8') as file:
+            file.write('x-prebuilt: true\n')
+
+        with patch.object(SchemaGenerator, 'get_schema') as generate:
+            res = self.client.get(SCHEMA_URL)
+            json_res = self.client.get(SCHEMA_URL, {'format': 'json'})
+
+        generate.assert_not_called()
+        self.assertIn(b'x-prebuilt: true', res.content)
+        self.assertTrue(json_res['Content-Type'].startswith(
+            'application/vnd.oai.openapi+json'))
+        self.assertTrue(json_res.json()['x-prebuilt'])
+
+    def test_unknown_lang_and_version_share_the_default(self):
+        with patch.object(SchemaGenerator, 'get_schema', autospec=True,
+                          side_effect=SchemaGenerator.get_schema) as generate:
+            for i in range(3):
+                res = self.client.get(SCHEMA_URL, {'lang': f'xx{i}', 'version': f'v{i}'})
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(list(CachedSchemaView._rendered), [
+            ('application/vnd.oai.openapi', None, None)])
+
+    def test_accept_parameters_share_an_entry(self):
+        with patch.object(SchemaGenerator, 'get_schema', autospec=True,
+                          side_effect=SchemaGenerator.get_schema) as generate:
+            for i in range(2):
+                res = self.client.get(
+                    SCHEMA_URL, HTTP_ACCEPT=f'application/vnd.oai.openapi; junk={i}')
+                self.assertEqual(res.status_code, status.HTTP_200_OK)
+                self.assertTrue(res['Content-Type'].startswith('application/vnd.oai.openapi'))
+                self.assertNotIn('junk', res['Content-Type'])
+
+        self.assertEqual(generate.call_count, 1)
+        self.assertEqual(list(CachedSchemaView._rendered), [
+            ('application/vnd.oai.openapi', None, None)])
@@ -0,0 +1,229 @@
+"""Tests for content-addressed media storage"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from core import models
+from core.storage import ContentAddressedStorage, blob_name, is_blob_name
+
+
+class StorageTestCase(TestCase):
+    """Use a throwaway MEDIA_ROOT for every test."""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.category = models.Category.objects.create(name='Category')
+        self.product = models.Product.objects.create(
+            name='Product', price='10.00', stock=1, category=self.category)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def _create_image(self, content=b'image'):
+        return models.ProductImage.objects.create(
+            product=self.product,
+            image=SimpleUploadedFile('image.jpg', content),
+        )
+
+
+class ContentAddressedStorageTests(StorageTestCase):
+    """Test uploads are stored once per content."""
+
+    def test_upload_is_stored_under_sharded_hash(self):
+        image = self._create_image()
+
+        digest = hashlib.sha256(b'image').hexdigest()
+        self.assertEqual(image.image.name, blob_name(digest, '.jpg'))
+        self.assertTrue(image.image.name.startswith(
+            f'blobs/{digest[:2]}/{digest[2:4]}/'))
+        self.assertTrue(is_blob_name(image.image.name))
+        self.assertFalse(is_blob_name('uploads/product/image.jpg'))
+
+    def test_identical_uploads_share_one_blob(self):
+        first = self._create_image()
+        second = self._create_image()
+
+        self.assertEqual(first.image.name, second.image.name)
+        blob = models.MediaBlob.objects.get(name=first.image.name)
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(blob.size, len(b'image'))
+        directory = os.path.dirname(first.image.path)
+        self.assertEqual(os.listdir(directory), [os.path.basename(first.image.path)])
+
+    def test_blob_removed_with_last_reference(self):
+        first = self._create_image()
+        second = self._create_image()
+        path = first.image.path
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(models.MediaBlob.objects.exists())
+
+    def test_rolled_back_delete_keeps_blob(self):
+        image = self._create_image()
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            image.delete()
+            raise RuntimeError
+
+        self.assertTrue(os.path.exists(image.image.path))
+        self.assertEqual(models.MediaBlob.objects.get().ref_count, 1)
+
+    def test_reupload_after_purge_stores_blob_again(self):
+        storage = ContentAddressedStorage()
+        name = storage.save('image.jpg', ContentFile(b'image'))
+        storage.delete(name)
+        self.assertFalse(storage.exists(name))
+
+        self.assertEqual(storage.save('image.jpg', ContentFile(b'image')), name)
+        self.assertTrue(storage.exists(name))
+        self.assertEqual(models.MediaBlob.objects.get(name=name).ref_count, 1)
+
+    def test_replaced_image_releases_previous_blob(self):
+        image = self._create_image()
+        old_path = image.image.path
+
+        image.image = SimpleUploadedFile('image.jpg', b'new image')
+        with self.captureOnCommitCallbacks(execute=True):
+            image.save()
+
+        self.assertFalse(os.path.exists(old_path))
+        self.assertEqual(
+            list(models.MediaBlob.objects.values_list('name', flat=True)),
+            [image.image.name])
+
+    def test_variants_keep_their_name(self):
+        storage = ContentAddressedStorage()
+        name = 'blobs/ab/cd/abcd.jpg'
+        variant = storage.save('blobs/ab/cd/variants/abcd.jpg/200.webp',
+                               ContentFile(b'variant'))
+
+        self.assertEqual(variant, 'blobs/ab/cd/variants/abcd.jpg/200.webp')
+        self.assertFalse(models.MediaBlob.objects.filter(name=name).exists())
+
+
+class MigrateMediaStorageTests(StorageTestCase):
+    """Test the migrate_media_storage command."""
+
+    def test_legacy_files_are_moved_into_blobs(self):
+        legacy = FileSystemStorage()
+        names = [legacy.save('uploads/product/a.jpg', ContentFile(b'same')),
+                 legacy.save('uploads/product/b.jpg', ContentFile(b'same'))]
+        variant = legacy.save('uploads/product/variants/a.jpg/200.webp',
+                              ContentFile(b'variant'))
+        images = models.ProductImage.objects.bulk_create([
+            models.ProductImage(product=self.product, image=name)
+            for name in names
+        ])
+        models.ProductImage.objects.filter(pk=images[0].pk).update(
+            image_variants={'source': names[0], 'webp': {'200': variant}})
+
+        call_command('migrate_media_storage', stdout=StringIO())
+
+        rows = models.ProductImage.objects.order_by('pk')
+        blob = blob_name(hashlib.sha256(b'same').hexdigest(), '.jpg')
+        self.assertEqual([row.image.name for row in rows], [blob, blob])
+        self.assertEqual(models.MediaBlob.objects.get(name=blob).ref_count, 2)
+        for name in names:
+            self.assertFalse(legacy.exists(name))
+
+        variants = rows[0].image_variants
+        self.assertEqual(variants['source'], blob)
+        self.assertTrue(legacy.exists(variants['webp']['200']))
+        self.assertFalse(legacy.exists(variant))
+
+    def test_dry_run_changes_nothing(self):
+        legacy = FileSystemStorage()
+        name = legacy.save('uploads/product/a.jpg', ContentFile(b'data'))
+        models.ProductImage.objects.bulk_create(
+            [models.ProductImage(product=self.product, image=name)])
+
+        call_command('migrate_media_storage', '--dry-run', stdout=StringIO())
+
+        self.assertEqual(models.ProductImage.objects.get().image.name, name)
+        self.assertTrue(legacy.exists(name))
+        self.assertFalse(models.MediaBlob.objects.exists())
+
+
+class CollectOrphanedMediaTests(StorageTestCase):
+    """Test the collect_orphaned_media command."""
+
+    def setUp(self):
+        super().setUp()
+        self.image = self._create_image()
+        storage = self.image.image.storage
+        self.variant = storage.save(
+            f'{os.path.dirname(self.image.image.name)}/variants/'
+            f'{os.path.basename(self.image.image.name)}/200.webp',
+            ContentFile(b'variant'))
+        self.orphan = storage.save('uploads/post/old.jpg', ContentFile(b'old'))
+        self.orphan_variant = storage.save(
+            'uploads/post/variants/old.jpg/200.webp', ContentFile(b'old'))
+        self.storage = storage
+
+    def _collect(self, *args):
+        call_command('collect_orphaned_media', '--grace-period', '0',
+                     '--batch-size', '2', *args, stdout=StringIO())
+
+    def test_orphans_are_deleted(self):
+        # simulate a reference lost without releasing the blob
+        path = self.storage.path(blob_name(
+            hashlib.sha256(b'lost').hexdigest(), '.jpg'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(b'lost')
+
+        self._collect()
+
+        self.assertFalse(self.storage.exists(self.orphan))
+        self.assertFalse(self.storage.exists(self.orphan_variant))
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(os.path.exists(
+            os.path.join(self.media_root, 'uploads')))
+        self.assertTrue(self.storage.exists(self.image.image.name))
+        self.assertTrue(self.storage.exists(self.variant))
+
+    def test_dry_run_keeps_files(self):
+        self._collect('--dry-run')
+
+        self.assertTrue(self.storage.exists(self.orphan))
+        self.assertTrue(self.storage.exists(self.orphan_variant))
+
+    def test_recent_files_are_kept(self):
+        call_command('collect_orphaned_media', stdout=StringIO())
+
+        self.assertTrue(self.storage.exists(self.orphan))
+
+    def test_reused_blob_is_kept(self):
+        # a long orphaned blob an in-flight upload just deduplicated to
+        name = blob_name(hashlib.sha256(b'old').hexdigest(), '.jpg')
+        path = self.storage.path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(b'old')
+        old = time.time() - 48 * 3600
+        os.utime(path, (old, old))
+
+        self.assertEqual(self.storage.save('upload.jpg', ContentFile(b'old')), name)
+        call_command('collect_orphaned_media', stdout=StringIO())
+
+        self.assertTrue(os.path.exists(path))
@@ -0,0 +1,90 @@
+"""Tests for the authentication throttles"""
+
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from rest_framework.test import APIClient
+from rest_framework.throttling import SimpleRateThrottle
+
+from core import models
+
+TOKEN_URL = '/api/accounts/token/'
+PASSWORD_RESET_URL = '/api/accounts/password-reset/'
+
+RATES = {
+    'login': '100/min',
+    'login_account': '100/min',
+    'login_failure': '3/hour',
+    'password_reset': '100/hour',
+    'password_reset_account': '2/hour',
+}
+
+
+@patch.object(SimpleRateThrottle, 'THROTTLE_RATES', RATES)
+class ThrottlingTests(TestCase):
+    """Test throttles on the authentication endpoints."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        models.User.objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+            mobile_phone='01000000000',
+        )
+
+    def _login(self, password, email='user@example.com', ip='10.0.0.1'):
+        return self.client.post(
+            TOKEN_URL, {'email': email, 'password': password},
+            REMOTE_ADDR=ip)
+
+    def test_failed_logins_block_before_hashing(self):
+        """Test the account is locked once failures reach the limit."""
+        for _ in range(3):
+            self.assertEqual(self._login('wrong').status_code, 400)
+
+        with patch('accounts.serializers.authenticate') as authenticate:
+            res = self._login('testpass123')
+
+        self.assertEqual(res.status_code, 429)
+        authenticate.assert_not_called()
+
+    def test_failures_counted_per_account_across_ips(self):
+        """Test changing IP does not reset the account failure window."""
+        for i in range(3):
+            self._login('wrong', ip=f'10.0.0.{i}')
+
+        self.assertEqual(self._login('testpass123', ip='10.0.0.99').status_code, 429)
+
+    def test_spoofed_forwarded_for_keeps_ip_window(self):
+        """Test a client set X-Forwarded-For does not reset the IP failures."""
+        for i in range(3):
+            self.client.post(
+                TOKEN_URL, {'email': f'user{i}@example.com', 'password': 'wrong'},
+                REMOTE_ADDR='10.0.0.200', HTTP_X_FORWARDED_FOR=f'1.2.3.{i}, 10.0.0.1')
+
+        res = self.client.post(
+            TOKEN_URL, {'email': 'other@example.com', 'password': 'wrong'},
+            REMOTE_ADDR='10.0.0.200', HTTP_X_FORWARDED_FOR='1.2.3.99, 10.0.0.1')
+        self.assertEqual(res.status_code, 429)
+
+    def test_successful_logins_are_not_failures(self):
+        """Test successful logins do not count towards the lockout."""
+        for _ in range(5):
+            self.assertEqual(self._login('testpass123').status_code, 200)
+
+    def test_password_reset_throttled_per_account(self):
+        """Test password reset requests are limited per email."""
+        for i in range(2):
+            res = self.client.post(PASSWORD_RESET_URL, {'email': 'user@example.com'},
+                                   REMOTE_ADDR=f'10.0.0.{i}')
+            self.assertEqual(res.status_code, 200)
+
+        res = self.client.post(PASSWORD_RESET_URL, {'email': 'user@example.com'},
+                               REMOTE_ADDR='10.0.0.50')
+        self.assertEqual(res.status_code, 429)
+
+        res = self.client.post(PASSWORD_RESET_URL, {'email': 'other@example.com'})
+        self.assertEqual(res.status_code, 200)
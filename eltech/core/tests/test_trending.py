@@ -0,0 +1,128 @@
+"""Tests for the trending products scores"""
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from core import models
+from core.trending import count_view, flush_activity, score_trending_products
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class ProductActivityTests(TestCase):
+    """Test interactions with a product are counted per day."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com', password='testpass123', mobile_phone='01000000000')
+        category = models.Category.objects.create(name='Category')
+        self.product = models.Product.objects.create(
+            name='Product', price=Decimal('10.00'), stock=5, category=category)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_interactions_counted(self):
+        client = APIClient()
+        with self.captureOnCommitCallbacks(execute=True):
+            client.get(f'/api/product/products/{self.product.pk}/')
+            client.get(f'/api/product/products/{self.product.pk}/')
+            cart = models.Cart.objects.create(user=self.user)
+            models.CartProduct.objects.create(cart=cart, product=self.product)
+            models.Favorite.objects.create(user=self.user, product=self.product)
+            order = models.Order.objects.create(user=self.user)
+            models.OrderProduct.objects.create(order=order, product=self.product, quantity=3)
+
+        # the interactions wait in the cache for the scoring job
+        self.assertFalse(models.ProductActivity.objects.exists())
+        self.assertEqual(flush_activity(), 7)
+
+        activity = models.ProductActivity.objects.get(product=self.product)
+        self.assertEqual(activity.day, timezone.localdate())
+        self.assertEqual(
+            (activity.views, activity.cart_adds, activity.favorites, activity.sales),
+            (2, 1, 1, 3))
+
+    def test_views_counted_without_background_tasks(self):
+        client = APIClient()
+        with self.captureOnCommitCallbacks() as callbacks:
+            client.get(f'/api/product/products/{self.product.pk}/')
+        self.assertEqual(callbacks, [])
+
+        count_view(self.product.pk)
+        self.assertEqual(flush_activity(), 2)
+        # the counter restarts from what was flushed
+        count_view(self.product.pk)
+        self.assertEqual(flush_activity(), 1)
+        self.assertEqual(flush_activity(), 0)
+        self.assertEqual(
+            models.ProductActivity.objects.get(product=self.product).views, 3)
+
+    def test_rolled_back_interactions_not_counted(self):
+        cart = models.Cart.objects.create(user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            models.CartProduct.objects.create(cart=cart, product=self.product)
+        with self.captureOnCommitCallbacks() as callbacks:
+            models.Favorite.objects.create(user=self.user, product=self.product)
+        # the favorite's transaction never commits
+        self.assertEqual(len(callbacks), 1)
+
+        self.assertEqual(flush_activity(), 1)
+        activity = models.ProductActivity.objects.get(product=self.product)
+        self.assertEqual((activity.cart_adds, activity.favorites), (1, 0))
+
+
+@override_settings(TRENDING_WINDOW_DAYS=28, TRENDING_HALF_LIFE_DAYS=3,
+                   TRENDING_PRODUCTS=2, HOT_PRODUCTS=1)
+class TrendingScoreTests(TestCase):
+    """Test the scores decay with time and drive the flags."""
+
+    def setUp(self):
+        category = models.Category.objects.create(name='Category')
+        self.today = timezone.localdate()
+        self.products = [
+            models.Product.objects.create(
+                name=f'Product {i}', price=Decimal('10.00'), stock=5, category=category)
+            for i in range(4)
+        ]
+
+    def _activity(self, product, age, **counts):
+        models.ProductActivity.objects.create(
+            product=product, day=self.today - timedelta(days=age), **counts)
+
+    def _flags(self):
+        return list(models.Product.objects.order_by('pk')
+                    .values_list('is_trending', 'is_hot'))
+
+    def test_scores_decay(self):
+        first, second, third, idle = self.products
+        self._activity(first, 0, views=10)
+        self._activity(second, 3, views=10, sales=2)
+        self._activity(third, 6, views=100)
+        self._activity(third, 30, views=1000)
+        idle.is_trending = idle.is_hot = True
+        idle.save()
+
+        self.assertEqual(score_trending_products(self.today), 3)
+
+        scores = [product.trending_score
+                  for product in models.Product.objects.order_by('pk')]
+        self.assertEqual(scores, [10.0, 15.0, 25.0, 0.0])
+        self.assertEqual(self._flags(), [
+            (False, False), (True, False), (True, True), (False, False)])
+        # activity older than the window is dropped
+        self.assertFalse(models.ProductActivity.objects.filter(views=1000).exists())
+
+        # a day later the fresher activity wins
+        self._activity(first, -1, views=20)
+        self.assertEqual(score_trending_products(self.today + timedelta(days=1)), 3)
+        self.assertEqual(self._flags(), [
+            (True, True), (False, False), (True, False), (False, False)])
+        self.assertEqual(score_trending_products(self.today + timedelta(days=1)), 0)
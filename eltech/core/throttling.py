@@ -0,0 +1,100 @@
+"""
+Throttles for the CPU-heavy authentication endpoints.
+
+Rates live in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']. Views set a
+`throttle_scope`; `ScopedRateThrottle` limits it per IP and
+`AccountRateThrottle` per targeted email under `<scope>_account`. All
+histories are sliding windows of timestamps kept in the cache.
+"""
+import hashlib
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+def _account_ident(request):
+    """Return a hashed, normalized email from the request body, if any."""
+    try:
+        email = request.data.get('email')
+    except AttributeError:
+        return None
+    if not email or not isinstance(email, str):
+        return None
+    return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+
+class AccountRateThrottle(SimpleRateThrottle):
+    """
+    Limits requests targeting the same account, whatever IP they come from.
+    """
+
+    def __init__(self):
+        # the rate is resolved from the view in `allow_request`
+        pass
+
+    def allow_request(self, request, view):
+        scope = getattr(view, 'throttle_scope', None)
+        if not scope:
+            return True
+
+        self.scope = f'{scope}_account'
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+
+        return super().allow_request(request, view)
+
+    def get_cache_key(self, request, view):
+        ident = _account_ident(request)
+        if ident is None:
+            return None
+
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class LoginFailureThrottle(SimpleRateThrottle):
+    """
+    Rejects logins from an IP or for an account with too many recent
+    failures. Only failures recorded with `record_failure` count, and the
+    check runs before the view, so rejected attempts never hash a password.
+    """
+    scope = 'login_failure'
+
+    def get_cache_keys(self, request):
+        keys = [self.cache_format % {
+            'scope': f'{self.scope}_ip',
+            'ident': self.get_ident(request),
+        }]
+        account = _account_ident(request)
+        if account is not None:
+            keys.append(self.cache_format % {
+                'scope': f'{self.scope}_account',
+                'ident': account,
+            })
+        return keys
+
+    def _recent(self, key):
+        return [
+            timestamp for timestamp in self.cache.get(key, [])
+            if timestamp > self.now - self.duration
+        ]
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.now = self.timer()
+        for key in self.get_cache_keys(request):
+            self.history = self._recent(key)
+            if len(self.history) >= self.num_requests:
+                return self.throttle_failure()
+        return True
+
+    def record_failure(self, request):
+        """Remember a failed login for the IP and the account."""
+        if self.rate is None:
+            return
+
+        self.now = self.timer()
+        for key in self.get_cache_keys(request):
+            history = self._recent(key)
+            history.insert(0, self.now)
+            self.cache.set(key, history, self.duration)
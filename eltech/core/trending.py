@@ -0,0 +1,185 @@
+"""
+Trending products, scored from their recent activity.
+
+Views, cart adds, favorites and sales are counted per product in the
+cache, shared by the workers, and moved to ProductActivity, under the day
+of the move, by `score_trending_products`. That job, run periodically by the
+`score_trending_products` command, sums the activity with weights that
+halve every TRENDING_HALF_LIFE_DAYS, in a single aggregate query, and
+writes the changed scores back in chunks. The top products by score get the
+is_trending and is_hot flags, which are no longer set by hand.
+"""
+import heapq
+from array import array
+from collections import defaultdict
+from datetime import timedelta
+from functools import partial
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, F, FloatField, Sum, Value, When
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+from core.models import CartProduct, Favorite, OrderProduct, Product, ProductActivity
+
+# weight of one interaction of each kind in the score
+WEIGHTS = {
+    'views': 1.0,
+    'cart_adds': 5.0,
+    'favorites': 3.0,
+    'sales': 10.0,
+}
+UPDATE_BATCH_SIZE = 1000
+
+
+def _activity_key(name, product_id):
+    return f'trending-{name}:{product_id}'
+
+
+def count_activity(product_id, name, count=1):
+    """Add `count` interactions `name` (e.g. 'views') of a product to the cache, see flush_activity."""
+    key = _activity_key(name, product_id)
+    try:
+        cache.incr(key, count)
+    except ValueError:
+        # the first interaction counted, unless a concurrent one added it
+        if not cache.add(key, count, None):
+            cache.incr(key, count)
+
+
+def count_view(product_id):
+    """Count a view of a product in the cache."""
+    count_activity(product_id, 'views')
+
+
+def flush_activity(today=None):
+    """Add the interactions counted in the cache to today's activity, return how many."""
+    today = today or timezone.localdate()
+    ids = array('q', Product.objects.order_by('pk').values_list('pk', flat=True)
+                .iterator(chunk_size=10000))
+
+    flushed = 0
+    for start in range(0, len(ids), UPDATE_BATCH_SIZE):
+        keys = {
+            _activity_key(name, pk): (pk, name)
+            for pk in ids[start:start + UPDATE_BATCH_SIZE] for name in WEIGHTS
+        }
+        counts = defaultdict(dict)
+        for key, count in cache.get_many(keys).items():
+            if count:
+                pk, name = keys[key]
+                counts[pk][name] = count
+        if not counts:
+            continue
+
+        stored = {
+            row.pop('product_id'): row
+            for row in ProductActivity.objects.filter(day=today, product_id__in=counts)
+            .values('product_id', *WEIGHTS)
+        }
+        ProductActivity.objects.bulk_create(
+            [
+                ProductActivity(product_id=pk, day=today, **{
+                    name: stored.get(pk, {}).get(name, 0) + product_counts.get(name, 0)
+                    for name in WEIGHTS
+                })
+                for pk, product_counts in counts.items()
+            ],
+            update_conflicts=True, unique_fields=['product', 'day'],
+            update_fields=list(WEIGHTS),
+        )
+        # decr keeps the interactions counted since get_many
+        for pk, product_counts in counts.items():
+            for name, count in product_counts.items():
+                cache.decr(_activity_key(name, pk), count)
+                flushed += count
+    return flushed
+
+
+def _decayed_scores(today, window_days, half_life):
+    """Return `(product ids, scores)` arrays of the products active lately."""
+    interactions = sum(F(name) * weight for name, weight in WEIGHTS.items())
+    decay = Case(
+        *[When(day=today - timedelta(days=age), then=Value(0.5 ** (age / half_life)))
+          for age in range(window_days)],
+        default=Value(0.0), output_field=FloatField(),
+    )
+    rows = ProductActivity.objects.filter(day__gt=today - timedelta(days=window_days)) \
+        .values('product_id') \
+        .annotate(score=Sum(interactions * decay, output_field=FloatField())) \
+        .values_list('product_id', 'score') \
+        .order_by()
+
+    ids, scores = array('q'), array('d')
+    for product_id, score in rows.iterator(chunk_size=10000):
+        ids.append(product_id)
+        scores.append(score)
+    return ids, scores
+
+
+def _top(ids, scores, count):
+    """Return the ids of the `count` best scored products."""
+    positions = heapq.nlargest(
+        count, (i for i in range(len(ids)) if scores[i] > 0),
+        key=lambda i: (scores[i], -ids[i]))
+    return {ids[i] for i in positions}
+
+
+def _flag(field, ids):
+    """Set the boolean `field` on the products of `ids` only."""
+    Product.objects.filter(**{field: True}).exclude(pk__in=ids).update(**{field: False})
+    Product.objects.filter(pk__in=ids, **{field: False}).update(**{field: True})
+
+
+def score_trending_products(today=None):
+    """Recompute the trending scores and flags, return the scores changed."""
+    today = today or timezone.localdate()
+    flush_activity(today)
+    window_days = settings.TRENDING_WINDOW_DAYS
+    ids, scores = _decayed_scores(today, window_days, settings.TRENDING_HALF_LIFE_DAYS)
+    new_scores = dict(zip(ids, scores))
+
+    # products neither scored before nor now keep their zero score
+    previous = dict(Product.objects.filter(trending_score__gt=0)
+                    .values_list('pk', 'trending_score').iterator(chunk_size=10000))
+    changed = [
+        Product(pk=pk, trending_score=new_scores.get(pk, 0.0))
+        for pk in previous.keys() | new_scores.keys()
+        if new_scores.get(pk, 0.0) != previous.get(pk, 0.0)
+    ]
+    for start in range(0, len(changed), UPDATE_BATCH_SIZE):
+        with transaction.atomic():
+            Product.objects.bulk_update(
+                changed[start:start + UPDATE_BATCH_SIZE], ['trending_score'])
+
+    # only a few products carry the flags, no need to go through bulk_update
+    with transaction.atomic():
+        _flag('is_trending', _top(ids, scores, settings.TRENDING_PRODUCTS))
+        _flag('is_hot', _top(ids, scores, settings.HOT_PRODUCTS))
+
+    ProductActivity.objects.filter(day__lte=today - timedelta(days=window_days)).delete()
+    return len(changed)
+
+
+def _count_cart_add(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(partial(count_activity, instance.product_id, 'cart_adds'))
+
+
+def _count_favorite(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(partial(count_activity, instance.product_id, 'favorites'))
+
+
+def _count_sale(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(
+            partial(count_activity, instance.product_id, 'sales', instance.quantity))
+
+
+def connect_signals():
+    post_save.connect(_count_cart_add, sender=CartProduct, dispatch_uid='trending-cart')
+    post_save.connect(_count_favorite, sender=Favorite, dispatch_uid='trending-favorite')
+    post_save.connect(_count_sale, sender=OrderProduct, dispatch_uid='trending-sale')
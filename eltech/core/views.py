@@ -1,10 +1,91 @@
 """ Core views for app """
 
-from rest_framework.decorators import api_view
+import hashlib
+import os
+
+import yaml
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.translation import get_supported_language_variant
+from drf_spectacular.views import SpectacularAPIView
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+from core import db_metrics
 
 
 @api_view(['GET'])
 def health_check(request):
     """Returns a successful response"""
-    return Response({'healthy': True})
\ No newline at end of file
+    return Response({'healthy': True})
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def db_connections(request):
+    """Returns the connection metrics of the worker serving the request"""
+    return Response(db_metrics.snapshot())
+
+
+class CachedSchemaView(SpectacularAPIView):
+    """
+    OpenAPI schema built once per process instead of on every request.
+
+    The default schema is read from API_SCHEMA_FILE when `manage.py
+    generate_schema` wrote it at deploy time, and generated on the first
+    request otherwise. Responses carry an ETag so clients revalidate it.
+    """
+    # (media type, lang, version) -> (content, etag), unknown values dropped
+    # so the query string and the Accept header cannot grow it
+    _rendered = {}
+
+    def _get_language(self, request):
+        """Return the supported `?lang=`, None for the default language."""
+        lang = request.GET.get('lang')
+        if not settings.USE_I18N or not lang:
+            return None
+        try:
+            return get_supported_language_variant(lang)
+        except LookupError:
+            # translation.override falls back to the default language too
+            return None
+
+    def _get_version_parameter(self, request):
+        # spectacular accepts any version without ALLOWED_VERSIONS
+        version = request.GET.get('version')
+        return version if version in (api_settings.ALLOWED_VERSIONS or ()) else None
+
+    def _load_schema(self, request, lang, version):
+        path = settings.API_SCHEMA_FILE
+        if not lang and not version and path and os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                return yaml.safe_load(file)
+        return super()._get_schema_response(request).data
+
+    def _get_schema_response(self, request):
+        renderer = request.accepted_renderer
+        lang = self._get_language(request)
+        version = self._get_version_parameter(request)
+        # the renderer's media type, without the client's Accept parameters
+        key = (renderer.media_type, lang, version)
+        if key not in self._rendered:
+            content = renderer.render(
+                self._load_schema(request, lang, version),
+                renderer_context=self.get_renderer_context())
+            etag = f'"{hashlib.sha256(content).hexdigest()}"'
+            self._rendered[key] = content, etag
+        content, etag = self._rendered[key]
+
+        if etag in request.headers.get('If-None-Match', ''):
+            response = HttpResponseNotModified()
+        else:
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type = f'{content_type}; charset={renderer.charset}'
+            response = HttpResponse(content, content_type=content_type)
+            response['Content-Disposition'] = \
+                f'inline; filename="{self._get_filename(request, key[2])}"'
+        response['ETag'] = etag
+        return response
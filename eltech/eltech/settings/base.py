@@ -36,6 +36,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.db_router.ReplicaRoutingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -64,6 +65,28 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'eltech.wsgi.application'
 
+# serve the catalog reads from async views, for ASGI deployments
+ASYNC_CATALOG_VIEWS = os.environ.get('ASGI') == 'true'
+
+
+# Connection lifecycle shared by the DATABASES entries of every environment:
+# connections live DB_CONN_MAX_AGE seconds (0 closes them after each request)
+# and are checked before reuse. Async views need them closed per request.
+# With DB_POOLER=pgbouncer, DB_HOST is a transaction pooling PgBouncer,
+# which cannot keep server-side cursors open between transactions.
+DB_CONNECTION_OPTIONS = {
+    'CONN_MAX_AGE': int(os.environ.get(
+        'DB_CONN_MAX_AGE', 0 if ASYNC_CATALOG_VIEWS else 60)),
+    'CONN_HEALTH_CHECKS': True,
+    'DISABLE_SERVER_SIDE_CURSORS': os.environ.get('DB_POOLER') == 'pgbouncer',
+}
+
+# Safe requests read from these DATABASES aliases, see core/db_router.py
+DATABASE_REPLICAS = []
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+# seconds a client reads from the primary after sending a write
+READ_YOUR_WRITES_SECONDS = int(os.environ.get('READ_YOUR_WRITES_SECONDS', 10))
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -95,15 +118,115 @@ MEDIA_URL = '/media/'
 STATIC_ROOT = '/vol/web/static'
 MEDIA_ROOT = '/vol/web/media'
 
+# uploads are deduplicated by content hash, see core/storage.py
+STORAGES = {
+    'default': {
+        'BACKEND': 'core.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.CachedTokenAuthentication',
+    ],
+    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
+    # orjson backed when installed, see core/renderers.py
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     ],
-    'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema'
+    'DEFAULT_PARSER_CLASSES': [
+        'core.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # the client IP is the address the proxy (see proxy/) appended last
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 1)),
+    # scopes are limited per IP, `<scope>_account` per targeted email
+    'DEFAULT_THROTTLE_RATES': {
+        'login': os.environ.get('THROTTLE_LOGIN', '20/min'),
+        'login_account': os.environ.get('THROTTLE_LOGIN_ACCOUNT', '10/min'),
+        'login_failure': os.environ.get('THROTTLE_LOGIN_FAILURE', '10/hour'),
+        'signup': os.environ.get('THROTTLE_SIGNUP', '10/hour'),
+        'signup_account': os.environ.get('THROTTLE_SIGNUP_ACCOUNT', '3/hour'),
+        'password_reset': os.environ.get('THROTTLE_PASSWORD_RESET', '10/hour'),
+        'password_reset_account': os.environ.get(
+            'THROTTLE_PASSWORD_RESET_ACCOUNT', '3/hour'),
+        'subscribe': os.environ.get('THROTTLE_SUBSCRIBE', '10/hour'),
+        'subscribe_account': os.environ.get('THROTTLE_SUBSCRIBE_ACCOUNT', '3/hour'),
+    },
 }
 
 SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True,
 }
 
+# written by `manage.py generate_schema` on deploy, served by /api/schema/
+API_SCHEMA_FILE = os.environ.get('API_SCHEMA_FILE', '/vol/web/schema.yml')
+
 AUTH_USER_MODEL = 'core.User'
+
+# Cache, shared between workers in production (see production.py)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# seconds a resolved auth token stays cached
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.environ.get('AUTH_TOKEN_CACHE_TIMEOUT', 60))
+
+# Transactional email outbox, drained by `manage.py send_queued_emails`
+EMAIL_OUTBOX_BATCH_SIZE = int(os.environ.get('EMAIL_OUTBOX_BATCH_SIZE', 50))
+EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.environ.get('EMAIL_OUTBOX_MAX_ATTEMPTS', 5))
+# seconds before the first retry, doubled after every failed attempt
+EMAIL_OUTBOX_RETRY_DELAY = int(os.environ.get('EMAIL_OUTBOX_RETRY_DELAY', 60))
+# seconds a claimed batch stays hidden from other workers
+EMAIL_OUTBOX_LEASE_SECONDS = 300
+
+# Newsletter delivery, see `manage.py send_newsletter`
+NEWSLETTER_BATCH_SIZE = int(os.environ.get('NEWSLETTER_BATCH_SIZE', 100))
+NEWSLETTER_CHUNK_SIZE = 2000
+# messages per second, 0 disables the limit
+NEWSLETTER_RATE_LIMIT = float(os.environ.get('NEWSLETTER_RATE_LIMIT', 10))
+
+# Background tasks (core.background), run inline when eager
+BACKGROUND_TASKS_EAGER = False
+BACKGROUND_TASKS_WORKERS = 2
+
+# Responsive image renditions generated after upload (core.images)
+IMAGE_VARIANT_WIDTHS = [200, 400, 800, 1200]
+IMAGE_VARIANT_FORMATS = ['webp', 'jpeg']
+# longest side of the inline base64 preview, in pixels
+IMAGE_PLACEHOLDER_SIZE = 16
+
+# Most ids `GET /api/product/products/batch/?ids=` accepts at once
+PRODUCT_BATCH_MAX_IDS = int(os.environ.get('PRODUCT_BATCH_MAX_IDS', 50))
+
+# seconds the cached /api/home/ payload is served before a background refresh
+HOME_CACHE_TIMEOUT = int(os.environ.get('HOME_CACHE_TIMEOUT', 300))
+
+# products kept in the ?is_popular=1 leaderboards, see `manage.py rank_popular_products`
+POPULARITY_RANK_SIZE = int(os.environ.get('POPULARITY_RANK_SIZE', 500))
+
+# Trending score, see `manage.py score_trending_products`
+# days of activity counted, and days after which an interaction weighs half
+TRENDING_WINDOW_DAYS = int(os.environ.get('TRENDING_WINDOW_DAYS', 28))
+TRENDING_HALF_LIFE_DAYS = float(os.environ.get('TRENDING_HALF_LIFE_DAYS', 3))
+# best scored products flagged is_trending, and is_hot
+TRENDING_PRODUCTS = int(os.environ.get('TRENDING_PRODUCTS', 24))
+HOT_PRODUCTS = int(os.environ.get('HOT_PRODUCTS', 8))
+
+# "Customers also bought", see `manage.py update_related_products`
+# related products stored per product, and orders added per transaction
+RELATED_PRODUCTS = int(os.environ.get('RELATED_PRODUCTS', 8))
+RELATED_PRODUCTS_BATCH_SIZE = 500
+
+# seconds the cached first page of a category's products is served before a background refresh
+CATEGORY_PRODUCTS_CACHE_TIMEOUT = int(os.environ.get('CATEGORY_PRODUCTS_CACHE_TIMEOUT', 300))
+
+# seconds ahead `manage.py warm_weekly_deal`, run every minute, renders the next weekly deal
+WEEKLY_DEAL_WARM_AHEAD = int(os.environ.get('WEEKLY_DEAL_WARM_AHEAD', 120))
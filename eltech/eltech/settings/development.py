@@ -22,9 +22,17 @@ DATABASES = {
         'PASSWORD':os.environ.get('DB_PASS'),
         'HOST': os.environ.get('DB_HOST'),
         'PORT':os.environ.get('DB_PORT', '5432'),
+        **DB_CONNECTION_OPTIONS,
     }
 }
 
+# With DB_POOLER set, connect through the pgbouncer service of docker-compose
+if os.environ.get('DB_POOLER'):
+    DATABASES['default'].update(
+        HOST=os.environ.get('DB_POOLER_HOST', 'pgbouncer'),
+        PORT=os.environ.get('DB_POOLER_PORT', '5432'),
+    )
+
 # Email backend for development
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
@@ -15,9 +15,31 @@ DATABASES = {
         'PASSWORD':os.environ.get('DB_PASS'),
         'HOST':os.environ.get('DB_HOST'),
         'PORT':os.environ.get('DB_PORT', '5432'),
+        **DB_CONNECTION_OPTIONS,
     }
 }
 
+# Streaming replicas of the primary, comma separated hosts
+DATABASE_REPLICAS = []
+for index, host in enumerate(os.environ.get('DB_REPLICA_HOSTS', '').split(',')):
+    if host.strip():
+        alias = f'replica{index + 1}'
+        DATABASES[alias] = {
+            **DATABASES['default'],
+            'HOST': host.strip(),
+            'TEST': {'MIRROR': 'default'},
+        }
+        DATABASE_REPLICAS.append(alias)
+
+# Cache shared by all workers
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+
 # Email backend for production
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
 EMAIL_HOST = 'smtp.yourprovider.com'
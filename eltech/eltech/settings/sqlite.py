@@ -0,0 +1,22 @@
+"""
+Development settings on two local SQLite databases, a primary and a
+replica, to exercise the replica routing (see core/db_router.py) without
+PostgreSQL:
+
+    python manage.py test core.tests.test_db_router \
+        --settings=eltech.settings.sqlite
+"""
+from .base import BASE_DIR
+from .development import *  # noqa
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.sqlite3',
+    },
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db-replica.sqlite3',
+    },
+}
+DATABASE_REPLICAS = ['replica']
@@ -14,28 +14,29 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
-from drf_spectacular.views import (
-    SpectacularAPIView,
-    SpectacularSwaggerView
-)
+from drf_spectacular.views import SpectacularSwaggerView
 from django.contrib import admin
 from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
 
 from core import views as core_views
+from product.home import HomeView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     # just for testing the api health
     path('api/health-check/', core_views.health_check, name='health-check'),
+    path('api/health-check/db/', core_views.db_connections,
+         name='health-check-db'),
 
-    path('api/schema/', SpectacularAPIView.as_view(), name='api-schema'),
+    path('api/schema/', core_views.CachedSchemaView.as_view(), name='api-schema'),
     path('api/docs/',
          SpectacularSwaggerView.as_view(url_name='api-schema'),
          name='api-docs'
          ),
 
+    path('api/home/', HomeView.as_view(), name='home'),
     path('api/accounts/', include('accounts.urls')),
     path('api/product/', include('product.urls')),
     path('api/post/', include('post.urls')),
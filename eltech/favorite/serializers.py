@@ -1,10 +1,40 @@
 from rest_framework import serializers
-from core.models import Favorite
+from core.models import Favorite, Product
 from rest_framework.exceptions import ValidationError
 
+from product.serializers import ProductThumbnailSerializer
+
+
+class ProductCardSerializer(serializers.ModelSerializer):
+    """Serializer for the product card embedded in a favorite."""
+
+    class Meta:
+        model = Product
+        fields = ['id', 'name', 'price', 'is_on_sale',
+                  'sale_amount', 'stock']
+        read_only_fields = fields
+
+    def to_representation(self, instance):
+        """Add thumbnail to serialized data."""
+        representation = super().to_representation(instance)
+
+        thumbnail = instance.get_thumbnail()
+        if thumbnail:
+            representation['thumbnail'] = ProductThumbnailSerializer(thumbnail, context=self.context).data
+        else:
+            representation['thumbnail'] = {}
+
+        return representation
+
 
 class FavoriteSerializer(serializers.ModelSerializer):
     class Meta:
         model = Favorite
         fields = ['id', 'user', 'product']
         read_only_fields = ['user']
+
+    def to_representation(self, instance):
+        """Embed the product card instead of the product id."""
+        representation = super().to_representation(instance)
+        representation['product'] = ProductCardSerializer(instance.product, context=self.context).data
+        return representation
@@ -0,0 +1,86 @@
+"""Tests for the favorite APIs"""
+
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import models
+
+FAVORITES_URL = reverse('favorites-list')
+
+
+def create_product(category, **params):
+    """Create and return a sample product"""
+    defaults = {
+        'name': 'Product',
+        'price': Decimal('10.00'),
+        'stock': 5,
+        'category': category,
+    }
+    defaults.update(params)
+    return models.Product.objects.create(**defaults)
+
+
+class PrivateFavoriteApiTests(TestCase):
+    """Test authenticated favorite API requests"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+            mobile_phone='01000000000',
+        )
+        self.client.force_authenticate(self.user)
+        self.category = models.Category.objects.create(name='Category1')
+
+    def _create_favorites(self, count):
+        for i in range(count):
+            product = create_product(self.category, name=f'Product{i}')
+            models.ProductImage.objects.create(
+                product=product,
+                is_thumbnail=True,
+                image=SimpleUploadedFile(f'p{i}.jpg', b'', content_type='image/jpeg'),
+            )
+            models.Favorite.objects.create(user=self.user, product=product)
+
+    def test_list_embeds_product_card(self):
+        """Test favorites list returns the product card inline"""
+        self._create_favorites(1)
+
+        res = self.client.get(FAVORITES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        card = res.data['results'][0]['product']
+        self.assertEqual(card['name'], 'Product0')
+        self.assertEqual(card['price'], '10.00')
+        self.assertEqual(card['stock'], 5)
+        self.assertIn('image', card['thumbnail'])
+
+    def test_list_query_count_is_constant(self):
+        """Test listing favorites does not run a query per favorite"""
+        self._create_favorites(2)
+        with self.assertNumQueries(3):
+            self.client.get(FAVORITES_URL)
+
+        self._create_favorites(5)
+        with self.assertNumQueries(3):
+            res = self.client.get(FAVORITES_URL)
+
+        self.assertEqual(res.data['count'], 7)
+
+    def test_create_favorite_by_product_id(self):
+        """Test a favorite is still created from a product id"""
+        product = create_product(self.category)
+
+        res = self.client.post(FAVORITES_URL, {'product': product.id})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['product']['id'], product.id)
+        self.assertTrue(models.Favorite.objects.filter(user=self.user, product=product).exists())
@@ -1,18 +1,24 @@
 from rest_framework import viewsets, status
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from core.models import Favorite
+from core.models import Favorite, thumbnail_prefetch
 from .serializers import FavoriteSerializer
 from favorite import serializers
+from product.views import ProductPagination
 
 
 class FavoriteViewSet(viewsets.ModelViewSet):
     queryset = Favorite.objects.all()
     serializer_class = FavoriteSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = ProductPagination
 
     def get_queryset(self):
-        return Favorite.objects.filter(user=self.request.user)
+        """Favorites of the user with their product cards preloaded."""
+        return Favorite.objects.filter(user=self.request.user) \
+            .select_related('product') \
+            .prefetch_related(thumbnail_prefetch('product__images')) \
+            .order_by('-id')
 
     def perform_create(self, serializer):
         user = self.request.user
@@ -1,8 +1,10 @@
 """
 Serializers for product APIs
 """
+from django.db import transaction
 from rest_framework import serializers
 
+from core.serializers import SparseFieldsMixin
 from core.models import (
     Product,
     Order,
@@ -10,7 +12,7 @@ from core.models import (
 )
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for products."""
 
     class Meta:
@@ -60,14 +62,16 @@ class OrderSerializer(serializers.ModelSerializer):
 
     #     return order
 
+    @transaction.atomic
     def create(self, validated_data):
-        """Create an order"""
+        """Create an order with its products, all at once."""
         products_data = validated_data.pop('products', [])
         order = Order.objects.create(**validated_data)
         for product_data in products_data:
             OrderProduct.objects.create(order=order, **product_data)
         return order
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         """Update an order."""
         products = validated_data.pop("products", None)
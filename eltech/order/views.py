@@ -15,7 +15,8 @@ from rest_framework import (
 )
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication
+from core.authentication import CachedTokenAuthentication
+from core.serializers import sparse_fields
 from rest_framework.permissions import IsAuthenticated
 
 from core.models import (
@@ -31,13 +32,20 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     serializer_class = serializers.OrderSerializer
     queryset = Order.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         """Retrieve orders for authenticated user."""
         return self.queryset.filter(user=self.request.user)
 
+    def get_serializer_context(self):
+        """Apply `?fields=` to the products of the orders."""
+        context = super().get_serializer_context()
+        context["fields"] = sparse_fields(
+            self.request.query_params, serializers.ProductSerializer.Meta.fields)
+        return context
+
     # def get_serializer_class(self):
     #     """Return the serializer class for request."""
     #     if self.action == "list":
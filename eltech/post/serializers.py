@@ -4,6 +4,8 @@ Serializers for product APIs
 from rest_framework import serializers
 
 from core import models
+from core.fastserializers import FastSerializer
+from core.serializers import SrcsetField
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for users."""
@@ -15,11 +17,11 @@ class UserSerializer(serializers.ModelSerializer):
         
 class CategorySerializer(serializers.ModelSerializer):
     """Serializer for categories."""
-
+    srcset = SrcsetField()
 
     class Meta:
         model = models.Category
-        fields = ['id', 'name', 'image']
+        fields = ['id', 'name', 'image', 'srcset']
         read_only_fields = ['id']
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -32,7 +34,18 @@ class CommentSerializer(serializers.ModelSerializer):
 class PostSerializer(serializers.ModelSerializer):
     user = UserSerializer(read_only=True) 
     category = CategorySerializer(read_only=True)  
+    srcset = SrcsetField()
     class Meta:
         model = models.Post
-        fields = '__all__'
-        read_only_fields = ['id', 'created_at', 'updated_at']
\ No newline at end of file
+        exclude = ['image_variants']
+        read_only_fields = ['id', 'created_at', 'updated_at']
+
+
+class FastCommentSerializer(FastSerializer):
+    """CommentSerializer for `.values()` rows of comment lists."""
+    serializer_class = CommentSerializer
+
+
+class FastPostSerializer(FastSerializer):
+    """PostSerializer for `.values()` rows of post lists."""
+    serializer_class = PostSerializer
@@ -18,6 +18,7 @@ from rest_framework.permissions import IsAuthenticated
 
 from django.db.models import Q
 
+from core.fastserializers import FastListModelMixin
 from core.models import Comment , Post
 
 from post.serializers import *
@@ -44,8 +45,9 @@ from post.serializers import *
     description="List and create posts.",
     responses={200: PostSerializer(many=True)},
 )
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(FastListModelMixin, viewsets.ModelViewSet):
     serializer_class = PostSerializer
+    fast_serializer_class = FastPostSerializer
     queryset = Post.objects.all()
 
     def get_queryset(self):
@@ -86,7 +88,7 @@ class PostViewSet(viewsets.ModelViewSet):
 
         elif request.method == 'GET':
             comments = post.comments.all()  # Assuming you have a related_name='comments' in your Post model
-            serializer = CommentSerializer(comments, many=True)
+            serializer = FastCommentSerializer(FastCommentSerializer.values(comments))
             return Response(serializer.data, status=status.HTTP_200_OK)
         
     @extend_schema(request=CommentSerializer,description="List and create comments.", responses={200: CommentSerializer(many=True)})
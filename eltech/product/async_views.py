@@ -0,0 +1,178 @@
+"""
+Async views for the read-only catalog APIs.
+
+They return the same payloads as the ProductViewSet, CategoryViewSet and
+WeeklyDealViewSet reads, but use the async ORM so a worker running under
+ASGI keeps serving other requests while waiting on the database.
+Independent queries of a response are awaited together; serializers only
+run once everything they read is loaded, so they never hit the database.
+
+Routed instead of the viewsets when ASYNC_CATALOG_VIEWS is set.
+"""
+import asyncio
+
+from asgiref.sync import sync_to_async
+from django.db.models import F
+
+from core.async_views import fetch, json_response, not_found, paginate, \
+    safe_methods_only
+from core.models import Category, Product, RelatedProduct
+from core.serializers import sparse_fields
+from core.trending import count_view
+from product import serializers
+from product.categories import products_page
+from product.deals import current_payload
+from product.facets import facet_aggregates, facet_payload
+from product.views import PRODUCT_DETAIL_FIELDS, PRODUCT_FIELDS, \
+    ProductPagination, filter_products, prefetch_product_fields, price_ordering
+
+
+def _ordering(request):
+    """Return the valid `?ordering=` terms, like the OrderingFilter."""
+    terms = [term.strip() for term in request.GET.get('ordering', '').split(',')]
+    return [term for term in terms if term.lstrip('-') == 'price']
+
+
+async def _product_page(request, facets=False):
+    """Return the product list payload, with the facet counts if `facets`."""
+    fields = sparse_fields(request.GET, PRODUCT_FIELDS, PRODUCT_DETAIL_FIELDS)
+    expanded = fields is not None and not fields <= set(PRODUCT_FIELDS)
+    serializer_class = serializers.ProductDetailSerializer if expanded \
+        else serializers.ProductSerializer
+
+    queryset = filter_products(
+        prefetch_product_fields(Product.objects.all(), fields or PRODUCT_FIELDS),
+        request.GET)
+    ordering = _ordering(request)
+    if ordering:
+        queryset = queryset.order_by(*price_ordering(ordering))
+
+    pending = [paginate(request, queryset, ProductPagination.page_size)]
+    if facets:
+        pending.append(filter_products(Product.objects.all(), request.GET, facets=False)
+                       .order_by().aaggregate(**facet_aggregates(request.GET)))
+    result, *counts = await asyncio.gather(*pending)
+    if result is None:
+        return None
+    page, count, next_link, previous_link = result
+
+    payload = {
+        'count': count,
+        'next': next_link,
+        'previous': previous_link,
+        'results': serializer_class(
+            page, many=True, context={'request': request, 'fields': fields}).data,
+    }
+    if facets:
+        payload['facets'] = facet_payload(counts[0])
+    return payload
+
+
+@safe_methods_only
+async def product_list(request):
+    payload = await _product_page(request)
+    if payload is None:
+        return not_found('Invalid page.')
+    return json_response(payload)
+
+
+@safe_methods_only
+async def product_search(request):
+    # the counts are aggregated along with the page, see product/facets.py
+    payload = await _product_page(request, facets=True)
+    if payload is None:
+        return not_found('Invalid page.')
+    return json_response(payload)
+
+
+@safe_methods_only
+async def product_detail(request, pk):
+    fields = sparse_fields(request.GET, PRODUCT_DETAIL_FIELDS, PRODUCT_DETAIL_FIELDS)
+
+    def wants(*names):
+        return fields is None or any(name in fields for name in names)
+
+    queryset = Product.objects.all()
+    if wants('category'):
+        queryset = queryset.select_related('category')
+    try:
+        product = await queryset.aget(pk=pk)
+    except Product.DoesNotExist:
+        return not_found()
+
+    related = {
+        name: related_queryset
+        for name, related_queryset, wanted in [
+            ('images', product.images.all(), wants('images', 'thumbnail')),
+            ('features', product.features.all(), wants('features')),
+            ('ratings', product.ratings.all(), wants('ratings', 'average_rating')),
+            ('reviews', product.reviews.select_related('user'),
+             wants('reviews', 'reviews_count')),
+            ('related', RelatedProduct.objects.filter(product=product).cards(),
+             wants('related_products')),
+        ]
+        if wanted
+    }
+    *loaded, _, _ = await asyncio.gather(
+        *[fetch(related_queryset) for related_queryset in related.values()],
+        Product.objects.filter(pk=pk).aupdate(view_count=F('view_count') + 1),
+        sync_to_async(count_view)(pk),
+    )
+
+    # hand the loaded rows to the serializer as prefetched relations
+    product._prefetched_objects_cache = dict(zip(related, loaded))
+    if 'images' in related:
+        images = product._prefetched_objects_cache['images']
+        product.thumbnail_images = [image for image in images if image.is_thumbnail]
+    if 'ratings' in related:
+        values = [rating.rating for rating in product._prefetched_objects_cache['ratings']
+                  if rating.rating is not None]
+        product.average_rating = sum(values) / len(values) if values else None
+    if 'reviews' in related:
+        product.reviews_count = len(product._prefetched_objects_cache['reviews'])
+
+    return json_response(serializers.ProductDetailSerializer(
+        product, context={'request': request, 'fields': fields}).data)
+
+
+@safe_methods_only
+async def category_list(request):
+    categories = await fetch(Category.objects.with_product_count())
+    return json_response(serializers.CategoryListSerializer(
+        categories, many=True, context={'request': request}).data)
+
+
+@safe_methods_only
+async def category_detail(request, pk):
+    try:
+        category = await Category.objects.aget(pk=pk)
+    except Category.DoesNotExist:
+        return not_found()
+
+    # the first page is served from the cache, see product/categories.py
+    page = await sync_to_async(products_page)(request, category.pk)
+    if page is None:
+        return not_found('Invalid page.')
+
+    return json_response(serializers.CategoryDetailSerializer(
+        category, context={'request': request, 'products_page': page}).data)
+
+
+@safe_methods_only
+async def category_products(request, pk):
+    if not await Category.objects.filter(pk=pk).aexists():
+        return not_found()
+
+    page = await sync_to_async(products_page)(request, pk)
+    if page is None:
+        return not_found('Invalid page.')
+    return json_response(page)
+
+
+@safe_methods_only
+async def weekly_deal_latest(request):
+    # served from the cache, see product/deals.py
+    payload = await sync_to_async(current_payload)(request)
+    if payload is None:
+        return not_found()
+    return json_response(payload)
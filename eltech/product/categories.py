@@ -0,0 +1,96 @@
+"""
+Pages of the products of a category.
+
+`GET categories/<pk>/products/?page=` pages through the products of a
+category, and the category detail embeds the same page. The first page,
+the one every category visit reads, is a CachedPayload per category,
+rebuilt in the background when the products of the category change.
+Changes that send no signal, like a product moved to another category
+(for its former category) or the scores of core.trending, show after
+CATEGORY_PRODUCTS_CACHE_TIMEOUT.
+"""
+from functools import partial
+
+from django.conf import settings
+from django.core.paginator import InvalidPage, Paginator
+from django.db.models.signals import post_delete, post_save
+from django.urls import reverse
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from core.cache import CachedPayload
+from core.models import Product, ProductImage
+from product.serializers import FastProductSerializer
+
+CATEGORY_PRODUCTS_PAGE_SIZE = 5
+
+
+def build_products_page(request, category_id, number=1):
+    """Return page `number` of the category products, None if invalid."""
+    queryset = FastProductSerializer.values(
+        Product.objects.filter(category_id=category_id).order_by('pk'))
+    paginator = Paginator(queryset, CATEGORY_PRODUCTS_PAGE_SIZE)
+    try:
+        page = paginator.page(number)
+    except InvalidPage:
+        return None
+
+    # the links go to the nested route, from the category detail as well
+    url = request.build_absolute_uri(
+        reverse('product:category-products', args=[category_id]))
+    if not page.has_previous():
+        previous_link = None
+    elif number == 2:
+        previous_link = remove_query_param(url, 'page')
+    else:
+        previous_link = replace_query_param(url, 'page', number - 1)
+    return {
+        'links': {
+            'next': replace_query_param(url, 'page', number + 1)
+            if page.has_next() else None,
+            'previous': previous_link,
+        },
+        'count': paginator.count,
+        'results': FastProductSerializer(
+            page.object_list, context={'request': request}).data,
+    }
+
+
+def first_page_payload(category_id):
+    """Return the cached first page of the products of a category."""
+    return CachedPayload(
+        f'category-products:{category_id}',
+        partial(build_products_page, category_id=category_id),
+        settings.CATEGORY_PRODUCTS_CACHE_TIMEOUT,
+    )
+
+
+def products_page(request, category_id):
+    """Return the `?page=` of the category products, None if invalid."""
+    try:
+        number = int(request.GET.get('page', 1))
+    except ValueError:
+        return None
+    if number == 1:
+        return first_page_payload(category_id).get(request)
+    return build_products_page(request, category_id, number)
+
+
+def _invalidate_product(sender, instance, update_fields=None, **kwargs):
+    # product views do not change the cards, see product/home.py
+    if update_fields and set(update_fields) <= {'view_count'}:
+        return
+    first_page_payload(instance.category_id).invalidate()
+
+
+def _invalidate_image(sender, instance, **kwargs):
+    category_id = Product.objects.filter(pk=instance.product_id) \
+        .values_list('category_id', flat=True).first()
+    if category_id is not None:
+        first_page_payload(category_id).invalidate()
+
+
+def connect_signals():
+    for model, receiver in ((Product, _invalidate_product), (ProductImage, _invalidate_image)):
+        uid = f'category-products-{model.__name__}'
+        post_save.connect(receiver, sender=model, dispatch_uid=uid)
+        post_delete.connect(receiver, sender=model, dispatch_uid=uid)
@@ -0,0 +1,140 @@
+"""
+The current weekly deal, served from the cache.
+
+Deals run from starts_at to ends_at, and the current one is the latest
+started of the running ones, resolved through their (starts_at, ends_at)
+index. The schedule, which deal runs until when, and the rendered payload
+of each deal, per origin, are cached until the next deal boundary. The
+`warm_weekly_deal` command, run every minute, resolves and renders the
+coming boundary ahead of time, so the visitors arriving when a deal
+starts are all served from the cache.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.utils import timezone
+
+from core.background import run_in_background
+from core.cache import OriginRequest
+from core.models import Product, ProductImage, WeeklyDeal, thumbnail_prefetch
+from product import serializers
+
+SCHEDULE_KEY = 'weekly-deal:schedule'
+ORIGINS_KEY = 'weekly-deal:origins'
+# longest a resolved schedule segment is trusted without a deal boundary
+MAX_SEGMENT = timedelta(days=1)
+
+
+def _payload_key(deal_id, origin):
+    return f'weekly-deal:payload:{deal_id}:{origin}'
+
+
+def _seconds(delta):
+    return max(int(delta.total_seconds()), 1)
+
+
+def _resolve(at):
+    """Return the `(from, until, deal id, product id)` segment starting `at`."""
+    deal = WeeklyDeal.objects.live(at).values_list('pk', 'product_id', 'ends_at').first()
+    next_start = WeeklyDeal.objects.upcoming(at).values_list('starts_at', flat=True).first()
+
+    boundaries = [at + MAX_SEGMENT, next_start, deal and deal[2]]
+    until = min(boundary for boundary in boundaries if boundary)
+    deal_id, product_id = deal[:2] if deal else (None, None)
+    return at, until, deal_id, product_id
+
+
+def _segment(at):
+    """Return the schedule segment holding `at`, resolving it if needed."""
+    schedule = cache.get(SCHEDULE_KEY, [])
+    for segment in schedule:
+        if segment[0] <= at < segment[1]:
+            return segment
+
+    segment = _resolve(at)
+    now = timezone.now()
+    cache.set(SCHEDULE_KEY, [
+        kept for kept in schedule if kept[1] > now
+    ] + [segment], None)
+    return segment
+
+
+def _render(deal_id, request):
+    deal = WeeklyDeal.objects.filter(pk=deal_id).select_related('product') \
+        .prefetch_related(thumbnail_prefetch('product__images')).first()
+    if deal is None:
+        return None
+    return serializers.WeeklyDealSerializer(deal, context={'request': request}).data
+
+
+def current_payload(request, now=None):
+    """Return the payload of the current deal, None when there is none."""
+    now = now or timezone.now()
+    _, until, deal_id, _ = _segment(now)
+    if deal_id is None:
+        return None
+
+    origin = f'{request.scheme}://{request.get_host()}'
+    key = _payload_key(deal_id, origin)
+    payload = cache.get(key)
+    if payload is None:
+        origins = cache.get(ORIGINS_KEY, set())
+        if origin not in origins:
+            cache.set(ORIGINS_KEY, origins | {origin}, None)
+        payload = _render(deal_id, request)
+        cache.set(key, payload, _seconds(until - now))
+    return payload
+
+
+def warm_weekly_deal(ahead=None, now=None):
+    """Resolve and render the deals of the next `ahead` seconds, return the renders."""
+    now = now or timezone.now()
+    horizon = now + timedelta(seconds=ahead or settings.WEEKLY_DEAL_WARM_AHEAD)
+    origins = cache.get(ORIGINS_KEY, ())
+
+    rendered = 0
+    at = now
+    while at < horizon:
+        _, until, deal_id, _ = _segment(at)
+        for origin in origins if deal_id else ():
+            key = _payload_key(deal_id, origin)
+            if cache.get(key) is None:
+                cache.set(key, _render(deal_id, OriginRequest(origin)), _seconds(until - now))
+                rendered += 1
+        at = until
+    return rendered
+
+
+def invalidate():
+    """Forget the schedule and the payloads, then warm them up again."""
+    schedule = cache.get(SCHEDULE_KEY, [])
+    origins = cache.get(ORIGINS_KEY, ())
+    cache.delete_many([SCHEDULE_KEY] + [
+        _payload_key(segment[2], origin)
+        for segment in schedule if segment[2]
+        for origin in origins
+    ])
+    run_in_background(warm_weekly_deal)
+
+
+def _invalidate_deal(sender, **kwargs):
+    invalidate()
+
+
+def _invalidate_product(sender, instance, update_fields=None, **kwargs):
+    # product views do not change the payload, see product/home.py
+    if update_fields and set(update_fields) <= {'view_count'}:
+        return
+    product_id = instance.pk if sender is Product else instance.product_id
+    if any(segment[3] == product_id for segment in cache.get(SCHEDULE_KEY, [])):
+        invalidate()
+
+
+def connect_signals():
+    for model, receiver in ((WeeklyDeal, _invalidate_deal), (Product, _invalidate_product),
+                            (ProductImage, _invalidate_product)):
+        uid = f'weekly-deal-{model.__name__}'
+        post_save.connect(receiver, sender=model, dispatch_uid=uid)
+        post_delete.connect(receiver, sender=model, dispatch_uid=uid)
@@ -0,0 +1,124 @@
+"""
+Faceted product search.
+
+`GET products/search/` answers the page of products the list would, plus
+the number of products for every value of every facet: price range,
+rating threshold, in stock and on sale. The counts come from a single
+aggregate query over the products matching the other list parameters
+(`category`, `q`, ...), one conditional COUNT per facet value. A facet is
+counted under the values picked for the other facets only, so its counts
+tell how many products each of its values would return.
+
+The facets read columns of the product row: the effective price, the
+stock, the sale flag and the rating average, kept up to date by the
+Rating signals below. Their filters are covered by the product indexes.
+"""
+from decimal import Decimal, InvalidOperation
+
+from django.db.models import Avg, Count, Q
+from django.db.models.signals import post_delete, post_save
+
+from core.background import run_in_background
+from core.models import Product, Rating
+
+# (min_price, max_price) of the price facet, None for unbounded; like the
+# filter, a range holds its min_price but not its max_price, so the ranges
+# do not overlap
+PRICE_RANGES = [(None, 50), (50, 100), (100, 250), (250, 500), (500, None)]
+RATING_THRESHOLDS = [4, 3, 2, 1]
+
+
+def decimal_param(params, name):
+    """Return the `name` decimal parameter, None when missing or invalid."""
+    try:
+        value = Decimal(params.get(name, ''))
+    except InvalidOperation:
+        return None
+    return value if value.is_finite() else None
+
+
+def _price_range(min_price, max_price):
+    condition = Q()
+    if min_price is not None:
+        condition &= Q(effective_price__gte=min_price)
+    if max_price is not None:
+        condition &= Q(effective_price__lt=max_price)
+    return condition
+
+
+def _rating(min_rating):
+    return Q(rating_average__gte=min_rating) if min_rating is not None else Q()
+
+
+def facet_filters(params):
+    """Return the filter of every facet, an empty Q when not picked."""
+    in_stock = bool(int(params.get("in_stock", 0)))
+    on_sale = bool(int(params.get("on_sale", 0)))
+    return {
+        'price': _price_range(decimal_param(params, 'min_price'),
+                              decimal_param(params, 'max_price')),
+        'rating': _rating(decimal_param(params, 'min_rating')),
+        'in_stock': Q(stock__gt=0) if in_stock else Q(),
+        'on_sale': Q(is_on_sale=True) if on_sale else Q(),
+    }
+
+
+def facet_aggregates(params):
+    """Return the conditional counts of every facet value, by alias."""
+    filters = facet_filters(params)
+
+    def count(facet, condition):
+        # the values picked for the other facets still apply
+        for other, other_condition in filters.items():
+            if other != facet:
+                condition &= other_condition
+        return Count('pk', filter=condition or None)
+
+    aggregates = {
+        f'price_{index}': count('price', _price_range(*bounds))
+        for index, bounds in enumerate(PRICE_RANGES)
+    }
+    aggregates.update({
+        f'rating_{threshold}': count('rating', _rating(threshold))
+        for threshold in RATING_THRESHOLDS
+    })
+    aggregates['in_stock'] = count('in_stock', Q(stock__gt=0))
+    aggregates['on_sale'] = count('on_sale', Q(is_on_sale=True))
+    return aggregates
+
+
+def facet_payload(counts):
+    """Return the facets of the aggregated `counts`, with the parameters picking each value."""
+    return {
+        'price': [
+            {'min_price': min_price, 'max_price': max_price, 'count': counts[f'price_{index}']}
+            for index, (min_price, max_price) in enumerate(PRICE_RANGES)
+        ],
+        'rating': [
+            {'min_rating': threshold, 'count': counts[f'rating_{threshold}']}
+            for threshold in RATING_THRESHOLDS
+        ],
+        'in_stock': [{'in_stock': 1, 'count': counts['in_stock']}],
+        'on_sale': [{'on_sale': 1, 'count': counts['on_sale']}],
+    }
+
+
+def facet_counts(queryset, params):
+    """Count the facet values of `queryset` in one query."""
+    return facet_payload(queryset.order_by().aggregate(**facet_aggregates(params)))
+
+
+def update_rating_average(product_id):
+    """Store the average of the ratings of a product."""
+    average = Rating.objects.filter(product_id=product_id) \
+        .aggregate(value=Avg('rating'))['value']
+    Product.objects.filter(pk=product_id).update(rating_average=average or 0)
+
+
+def _update_rating(sender, instance, **kwargs):
+    run_in_background(update_rating_average, instance.product_id)
+
+
+def connect_signals():
+    post_save.connect(_update_rating, sender=Rating, dispatch_uid='facets-rating')
+    post_delete.connect(_update_rating, sender=Rating, dispatch_uid='facets-rating')
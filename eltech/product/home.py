@@ -0,0 +1,89 @@
+"""
+The storefront home page in one payload.
+
+Featured, trending and popular products, the current weekly deal, the
+categories and the services, as the endpoints of each section return
+them. The product sections share one thumbnail query. Anonymous visitors
+are served from a CachedPayload that is rebuilt in the background when
+the catalog changes. The weekly deal is added to every response from its
+own cache, so it changes at the deal boundaries, not with the home page.
+"""
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from drf_spectacular.utils import OpenApiTypes, extend_schema
+
+from rest_framework import views
+from rest_framework.response import Response
+
+from core.authentication import CachedTokenAuthentication
+from core.cache import CachedPayload
+from core.models import Category, Product, ProductImage, Service
+from product import serializers
+from product.deals import current_payload
+from product.views import ProductPagination, filter_products
+from service.serializers import ServiceSerializer
+
+# section -> product list query parameters
+PRODUCT_SECTIONS = {
+    'featured': {'is_featured': 1},
+    'trending': {'is_trending': 1},
+    'popular': {'is_popular': 1},
+}
+
+
+def build_home(request):
+    """Return the home page payload but the weekly deal, urls built for `request`."""
+    context = {'request': request}
+    fast_serializer = serializers.FastProductSerializer
+
+    sections = {
+        name: list(fast_serializer.values(
+            filter_products(Product.objects.all(), params)
+        )[:ProductPagination.page_size])
+        for name, params in PRODUCT_SECTIONS.items()
+    }
+    rows = list({row['id']: row for rows in sections.values() for row in rows}.values())
+    cards = dict(zip(
+        [row['id'] for row in rows],
+        fast_serializer(rows, context=context).data,
+    ))
+
+    payload = {
+        name: [cards[row['id']] for row in section_rows]
+        for name, section_rows in sections.items()
+    }
+    payload['categories'] = serializers.CategoryListSerializer(
+        Category.objects.with_product_count(), many=True, context=context).data
+    payload['services'] = ServiceSerializer(
+        Service.objects.all(), many=True, context=context).data
+    return payload
+
+
+home_payload = CachedPayload('home', build_home, settings.HOME_CACHE_TIMEOUT)
+
+
+class HomeView(views.APIView):
+    """Sections of the home page, cached for anonymous visitors."""
+
+    authentication_classes = [CachedTokenAuthentication]
+
+    @extend_schema(responses={200: OpenApiTypes.OBJECT})
+    def get(self, request):
+        if request.user.is_authenticated:
+            payload = build_home(request)
+        else:
+            payload = home_payload.get(request)
+        return Response({**payload, 'weekly_deal': current_payload(request)})
+
+
+def _invalidate(sender, update_fields=None, **kwargs):
+    # product views only move the popular section, left to the timeout
+    if update_fields and set(update_fields) <= {'view_count'}:
+        return
+    home_payload.invalidate()
+
+
+def connect_signals():
+    for model in (Product, ProductImage, Category, Service):
+        post_save.connect(_invalidate, sender=model, dispatch_uid=f'home-{model.__name__}')
+        post_delete.connect(_invalidate, sender=model, dispatch_uid=f'home-{model.__name__}')
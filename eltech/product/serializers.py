@@ -1,12 +1,16 @@
 """
 Serializers for product APIs
 """
+from drf_spectacular.utils import OpenApiTypes, extend_schema_field
 from rest_framework import serializers
-from rest_framework.pagination import PageNumberPagination
 
 from django.db.models import Avg
+from django.db.models.fields.files import FieldFile
 
 from core import models
+from core.fastserializers import FastSerializer
+from core.images import build_srcset
+from core.serializers import SparseFieldsMixin, SrcsetField
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -48,10 +52,11 @@ class ProductFeatureSerializer(serializers.ModelSerializer):
 
 class ProductImageSerializer(serializers.ModelSerializer):
     """Serializer for product images."""
+    srcset = SrcsetField()
 
     class Meta:
         model = models.ProductImage
-        fields = ['id', 'image']
+        fields = ['id', 'image', 'srcset', 'width', 'height', 'placeholder']
         read_only_fields = ['id', 'image']
 
 
@@ -72,25 +77,34 @@ class ProductThumbnailSerializer(serializers.ModelSerializer):
         """Only return the image if it is a thumbnail."""
         request = self.context.get('request')
         if request and instance.is_thumbnail:
-            return {'image': request.build_absolute_uri(instance.image.url)}
+            return {
+                'image': request.build_absolute_uri(instance.image.url),
+                'srcset': build_srcset(instance.image, instance.image_variants, request),
+                'width': instance.width,
+                'height': instance.height,
+                'placeholder': instance.placeholder,
+            }
         return {}
 
 
-class ProductSerializer(serializers.ModelSerializer):
+class ProductSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     """Serializer for products."""
     thumbnail = ProductThumbnailSerializer(read_only=True)
 
     class Meta:
         model = models.Product
         fields = ['id', 'name', 'price', 'is_hot', 'is_on_sale',
-                  'sale_amount', 'thumbnail', 'description', 'stock']
+                  'sale_amount', 'effective_price', 'thumbnail', 'description', 'stock']
         read_only_fields = ['id']
 
     def to_representation(self, instance):
         """Add thumbnail to serialized data."""
         representation = super().to_representation(instance)
 
-        thumbnail = instance.images.filter(is_thumbnail=True).first()
+        if not self.wants('thumbnail'):
+            return representation
+
+        thumbnail = instance.get_thumbnail()
         if thumbnail:
             representation['thumbnail'] = ProductThumbnailSerializer(thumbnail, context=self.context).data
         else:
@@ -99,26 +113,66 @@ class ProductSerializer(serializers.ModelSerializer):
         return representation
 
 
+class FastProductSerializer(FastSerializer):
+    """ProductSerializer for `.values()` rows of product lists."""
+    serializer_class = ProductSerializer
+    skip_fields = ('thumbnail',)
+    columns = ('id',)
+
+    def prepare(self, rows):
+        """Load the thumbnail of every product in one query."""
+        self.thumbnails = {}
+        if self.request is None or not self.wants('thumbnail'):
+            return
+
+        images = models.ProductImage.objects.filter(
+            product_id__in=[row['id'] for row in rows], is_thumbnail=True,
+        ).order_by('pk').values(
+            'product_id', 'image', 'image_variants', 'width', 'height', 'placeholder')
+        for image in images:
+            self.thumbnails.setdefault(image['product_id'], image)
+
+    def to_representation(self, row):
+        """Add thumbnail, like ProductSerializer does."""
+        representation = super().to_representation(row)
+
+        if not self.wants('thumbnail'):
+            return representation
+
+        image = self.thumbnails.get(row['id'])
+        if image:
+            field_file = FieldFile(
+                None, models.ProductImage._meta.get_field('image'), image['image'])
+            representation['thumbnail'] = {
+                'image': self.request.build_absolute_uri(field_file.url),
+                'srcset': build_srcset(field_file, image['image_variants'], self.request),
+                'width': image['width'],
+                'height': image['height'],
+                'placeholder': image['placeholder'],
+            }
+        else:
+            representation['thumbnail'] = {}
+
+        return representation
+
+
 class CategorySerializer(serializers.ModelSerializer):
     """Serializer for categories."""
+    srcset = SrcsetField()
 
     class Meta:
         model = models.Category
-        fields = ['id', 'name', 'image']
+        fields = ['id', 'name', 'image', 'srcset']
         read_only_fields = ['id']
 
-class CustomPagination(PageNumberPagination):
-    page_size = 10
 
-    def get_paginated_response(self, data):
-        return {
-            'links': {
-                'next': self.get_next_link(),
-                'previous': self.get_previous_link()
-            },
-            'count': self.page.paginator.count,
-            'results': data
-        }
+class CategoryListSerializer(CategorySerializer):
+    """Serializer for categories with their product count."""
+    product_count = serializers.IntegerField(read_only=True)
+
+    class Meta(CategorySerializer.Meta):
+        fields = CategorySerializer.Meta.fields + ['product_count']
+
 
 # class CategoryDetailSerializer(CategorySerializer):
 #     """Serializer for category detail view."""
@@ -129,23 +183,15 @@ class CustomPagination(PageNumberPagination):
 
 class CategoryDetailSerializer(CategorySerializer):
     """Serializer for category detail view."""
-
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        request = self.context.get('request')
-        paginator = CustomPagination()
-        paginator.page_size = 5  # Set the number of items per page here
-
-        # Apply the pagination
-        products = paginator.paginate_queryset(instance.products.all(), request)
-        serializer = ProductSerializer(products, many=True, context={'request': request})
-
-        # Add the paginated results to the representation
-        representation['products'] = paginator.get_paginated_response(serializer.data)
-        return representation
+    products = serializers.SerializerMethodField()
 
     class Meta(CategorySerializer.Meta):
-        fields = ['id', 'name', 'image', 'products']
+        fields = ['id', 'name', 'image', 'srcset', 'products']
+
+    @extend_schema_field(OpenApiTypes.OBJECT)
+    def get_products(self, instance):
+        """Return the page of products loaded by the view, see product/categories.py."""
+        return self.context['products_page']
 
 
 class ProductDetailSerializer(ProductSerializer):
@@ -163,28 +209,42 @@ class ProductDetailSerializer(ProductSerializer):
         ]
 
     def to_representation(self, instance):
-        """Add average rating to serialized data."""
+        """Add average rating and related products to serialized data."""
         representation = super().to_representation(instance)
 
-        thumbnail = instance.images.filter(is_thumbnail=True).first()
-        if thumbnail:
-            representation['thumbnail'] = ProductThumbnailSerializer(thumbnail, context=self.context).data
-        else:
-            representation['thumbnail'] = {}
-
         # average_rating = instance.rating_set.aggregate(
         #     average_rating=Avg('rating')
         # )['average_rating']
-        average_rating = instance.ratings.aggregate(
-            average_rating=Avg('rating')
-        )['average_rating']
-        representation['average_rating'] = average_rating \
-            if average_rating is not None else 0
-        representation['reviews'] = representation.get('reviews', [])
+        # use the values computed by the view when it provides them
+        if self.wants('average_rating'):
+            if hasattr(instance, 'average_rating'):
+                average_rating = instance.average_rating
+            else:
+                average_rating = instance.ratings.aggregate(
+                    average_rating=Avg('rating')
+                )['average_rating']
+            representation['average_rating'] = average_rating \
+                if average_rating is not None else 0
+        if self.wants('reviews'):
+            representation['reviews'] = representation.get('reviews', [])
 
         # Add reviews count
-        reviews_count = instance.reviews.count()
-        representation['reviews_count'] = reviews_count
+        if self.wants('reviews_count'):
+            if hasattr(instance, 'reviews_count'):
+                reviews_count = instance.reviews_count
+            else:
+                reviews_count = instance.reviews.count()
+            representation['reviews_count'] = reviews_count
+
+        if self.wants('related_products'):
+            if 'related' in getattr(instance, '_prefetched_objects_cache', {}):
+                links = instance.related.all()
+            else:
+                links = models.RelatedProduct.objects.filter(product=instance).cards()
+            representation['related_products'] = ProductSerializer(
+                [link.get_product() for link in links], many=True,
+                context={'request': self.context.get('request')},
+            ).data
 
         return representation
 
@@ -204,17 +264,7 @@ class WeeklyDealSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = models.WeeklyDeal
-        fields = ['id', 'deal_time', 'product']
+        fields = ['id', 'deal_time', 'starts_at', 'ends_at', 'product']
         read_only_fields = ['id']
 
-    def to_representation(self, instance):
-        """Add product to serialized data."""
-        representation = super().to_representation(instance)
-
-        product = ProductSerializer(instance.product, context=self.context).data
-        print(product)
-        representation['product'] = product
-
-        return representation
-
 
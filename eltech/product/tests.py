@@ -1,3 +1,589 @@
-from django.test import TestCase
+"""Tests for the product APIs"""
 
-# Create your tests here.
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from core import models
+from product import async_views
+from product.deals import warm_weekly_deal
+from product.home import home_payload
+from service import async_views as service_async_views
+
+
+def create_product(category, **params):
+    """Create and return a sample product"""
+    defaults = {
+        'name': 'Product',
+        'price': Decimal('10.00'),
+        'stock': 5,
+        'category': category,
+    }
+    defaults.update(params)
+    return models.Product.objects.create(**defaults)
+
+
+class AsyncCatalogViewTests(TestCase):
+    """Test the async catalog views answer like the viewsets."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.factory = AsyncRequestFactory()
+        user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+            mobile_phone='01000000000',
+        )
+        self.category = models.Category.objects.create(name='Category')
+        for i in range(14):
+            product = create_product(
+                self.category, name=f'Product{i}', price=Decimal(20 - i))
+            models.ProductImage.objects.create(
+                product=product,
+                is_thumbnail=True,
+                image=SimpleUploadedFile(f'p{i}.jpg', b'', content_type='image/jpeg'),
+            )
+        self.product = product
+        models.ProductFeature.objects.create(product=product, feature='Fast')
+        models.Rating.objects.create(product=product, user=user, rating=4)
+        models.Rating.objects.create(product=product, user=user, rating=5)
+        models.Review.objects.create(product=product, user=user, content='Good')
+        models.WeeklyDeal.objects.create(product=product, deal_time=date.today())
+        models.Service.objects.create(
+            title='Service', description='Description',
+            logo=SimpleUploadedFile('logo.png', b'', content_type='image/png'))
+
+    def tearDown(self):
+        cache.clear()
+
+    async def _get(self, view, url, **kwargs):
+        response = await view(self.factory.get(url), **kwargs)
+        return response.status_code, json.loads(response.content)
+
+    def _get_sync(self, url):
+        response = self.client.get(url)
+        return response.status_code, response.json()
+
+    async def _sync(self, url):
+        return await sync_to_async(self._get_sync)(url)
+
+    async def test_product_list_matches_viewset(self):
+        for query in ['', '?page=2', '?ordering=-price', '?q=Product1&ordering=price']:
+            url = f'/api/product/products/{query}'
+            expected = await self._sync(url)
+            self.assertEqual(await self._get(async_views.product_list, url), expected)
+
+    async def test_product_search_matches_viewset(self):
+        for query in ['', '?page=2', '?min_price=10&ordering=price', '?in_stock=1&on_sale=1']:
+            url = f'/api/product/products/search/{query}'
+            expected = await self._sync(url)
+            self.assertEqual(await self._get(async_views.product_search, url), expected)
+
+    async def test_product_detail_matches_viewset(self):
+        url = f'/api/product/products/{self.product.pk}/'
+        expected = await self._sync(url)
+
+        status, data = await self._get(
+            async_views.product_detail, url, pk=self.product.pk)
+
+        self.assertEqual((status, data), expected)
+        self.assertEqual(data['average_rating'], 4.5)
+        self.assertEqual(data['reviews_count'], 1)
+        product = await models.Product.objects.aget(pk=self.product.pk)
+        self.assertEqual(product.view_count, 2)
+
+    async def test_category_views_match_viewset(self):
+        url = '/api/product/categories/'
+        self.assertEqual(await self._get(async_views.category_list, url),
+                         await self._sync(url))
+
+        for query in ['', '?page=3']:
+            url = f'/api/product/categories/{self.category.pk}/{query}'
+            self.assertEqual(
+                await self._get(async_views.category_detail, url,
+                                pk=self.category.pk),
+                await self._sync(url))
+            url = f'/api/product/categories/{self.category.pk}/products/{query}'
+            self.assertEqual(
+                await self._get(async_views.category_products, url,
+                                pk=self.category.pk),
+                await self._sync(url))
+
+    async def test_weekly_deal_and_services_match_viewset(self):
+        url = '/api/product/weekly-deal/latest/'
+        self.assertEqual(await self._get(async_views.weekly_deal_latest, url),
+                         await self._sync(url))
+
+        url = '/api/service/services/'
+        self.assertEqual(await self._get(service_async_views.service_list, url),
+                         await self._sync(url))
+
+    async def test_missing_product_and_invalid_page(self):
+        status, _ = await self._get(
+            async_views.product_detail, '/api/product/products/0/', pk=0)
+        self.assertEqual(status, 404)
+
+        status, data = await self._get(
+            async_views.product_list, '/api/product/products/?page=9')
+        self.assertEqual((status, data), (404, {'detail': 'Invalid page.'}))
+
+
+class SparseFieldsTests(TestCase):
+    """Test `?fields=` and `?expand=` on the product endpoints."""
+
+    def setUp(self):
+        self.client = APIClient()
+        user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+            mobile_phone='01000000000',
+        )
+        category = models.Category.objects.create(name='Category')
+        self.product = create_product(category)
+        create_product(category, name='Other')
+        models.ProductImage.objects.create(
+            product=self.product,
+            is_thumbnail=True,
+            image=SimpleUploadedFile('p.jpg', b'', content_type='image/jpeg'),
+        )
+        models.Rating.objects.create(product=self.product, user=user, rating=3)
+        models.Review.objects.create(product=self.product, user=user, content='Good')
+        self.detail_url = f'/api/product/products/{self.product.pk}/'
+
+    def test_detail_fields_skip_relations(self):
+        # the product and the view counter update
+        with self.assertNumQueries(2):
+            res = self.client.get(self.detail_url, {'fields': 'price,stock'})
+
+        self.assertEqual(res.json(), {'price': '10.00', 'stock': 5})
+
+    def test_detail_default_and_aggregates(self):
+        default = self.client.get(self.detail_url).json()
+        res = self.client.get(
+            self.detail_url, {'fields': 'id', 'expand': 'average_rating,reviews_count'})
+
+        self.assertEqual(res.json(), {'id': self.product.pk, 'average_rating': 3.0,
+                                      'reviews_count': 1})
+        self.assertEqual(default['average_rating'], 3.0)
+        self.assertEqual(default['reviews_count'], 1)
+        self.assertEqual(len(default['reviews']), 1)
+        self.assertEqual(default['thumbnail']['image'][-4:], '.jpg')
+
+    def test_list_fields_and_expand(self):
+        # count and page, no thumbnails
+        with self.assertNumQueries(2):
+            res = self.client.get('/api/product/products/', {'fields': 'id,price'})
+        self.assertEqual(res.json()['results'][0], {'id': self.product.pk, 'price': '10.00'})
+
+        res = self.client.get(
+            '/api/product/products/', {'fields': 'id', 'expand': 'category'})
+        self.assertEqual(res.json()['results'][0], {
+            'id': self.product.pk,
+            'category': {'id': self.product.category.pk, 'name': 'Category',
+                         'image': None, 'srcset': {}},
+        })
+
+    async def test_async_views_apply_fields(self):
+        for view, url, kwargs in [
+            (async_views.product_detail, self.detail_url, {'pk': self.product.pk}),
+            (async_views.product_list, '/api/product/products/', {}),
+        ]:
+            for params in ['?fields=id,thumbnail', '?fields=id&expand=reviews,ratings']:
+                expected = await sync_to_async(self.client.get)(url + params)
+                response = await view(AsyncRequestFactory().get(url + params), **kwargs)
+                self.assertEqual(json.loads(response.content), expected.json())
+
+
+class ProductBatchTests(TestCase):
+    """Test fetching products by ids in one request."""
+
+    def setUp(self):
+        self.client = APIClient()
+        category = models.Category.objects.create(name='Category')
+        self.products = [create_product(category, name=f'Product{i}') for i in range(3)]
+        for product in self.products:
+            models.ProductImage.objects.create(
+                product=product,
+                is_thumbnail=True,
+                image=SimpleUploadedFile('p.jpg', b'', content_type='image/jpeg'),
+            )
+        models.ProductFeature.objects.create(product=self.products[0], feature='Fast')
+        self.url = '/api/product/products/batch/'
+
+    def test_cards_in_requested_order(self):
+        ids = [self.products[2].pk, 0, self.products[0].pk, self.products[2].pk]
+
+        # products and their thumbnails
+        with self.assertNumQueries(2):
+            res = self.client.get(self.url, {'ids': ','.join(map(str, ids))})
+
+        data = res.json()
+        self.assertEqual([item['id'] for item in data['results']],
+                         [self.products[2].pk, self.products[0].pk])
+        self.assertEqual(data['missing'], [0])
+        card = self.client.get('/api/product/products/').json()['results'][0]
+        self.assertEqual(list(data['results'][0]), list(card))
+        self.assertTrue(data['results'][0]['thumbnail'])
+
+    def test_details_share_prefetches_without_counting_views(self):
+        ids = ','.join(str(product.pk) for product in self.products)
+
+        # one query per relation, related products included
+        with self.assertNumQueries(7):
+            res = self.client.get(self.url, {'ids': ids, 'detail': 1})
+
+        results = res.json()['results']
+        expected = self.client.get(f'/api/product/products/{self.products[1].pk}/').json()
+        self.assertEqual(results[1], expected)
+        self.assertEqual(len(results[0]['features']), 1)
+        self.assertFalse(models.Product.objects.filter(
+            pk__in=[self.products[0].pk, self.products[2].pk], view_count__gt=0).exists())
+
+    def test_fields_and_invalid_ids(self):
+        res = self.client.get(self.url, {'ids': str(self.products[0].pk),
+                                         'fields': 'price', 'expand': 'features'})
+        self.assertEqual(res.json()['results'], [
+            {'price': '10.00', 'features': [
+                {'id': self.products[0].features.get().pk, 'feature': 'Fast'}]},
+        ])
+
+        for ids in ['1,a', ','.join(['1'] * 2 + [str(i) for i in range(2, 60)])]:
+            res = self.client.get(self.url, {'ids': ids})
+            self.assertEqual(res.status_code, 400)
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class HomeTests(TestCase):
+    """Test the composite home page endpoint."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        category = models.Category.objects.create(name='Category')
+        for i in range(4):
+            product = create_product(
+                category, name=f'Product{i}', is_featured=i % 2 == 0,
+                is_trending=i > 1, view_count=i)
+            models.ProductImage.objects.create(
+                product=product,
+                is_thumbnail=True,
+                image=SimpleUploadedFile(f'p{i}.jpg', b'', content_type='image/jpeg'),
+            )
+        self.product = product
+        models.WeeklyDeal.objects.create(product=product, deal_time=date.today())
+        models.Service.objects.create(
+            title='Service', description='Description',
+            logo=SimpleUploadedFile('logo.png', b'', content_type='image/png'))
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_sections_match_endpoints(self):
+        data = self.client.get('/api/home/').json()
+
+        for name, query in [('featured', 'is_featured=1'), ('trending', 'is_trending=1'),
+                            ('popular', 'is_popular=1')]:
+            expected = self.client.get(f'/api/product/products/?{query}').json()
+            self.assertEqual(data[name], expected['results'])
+        self.assertEqual(data['weekly_deal'],
+                         self.client.get('/api/product/weekly-deal/latest/').json())
+        self.assertEqual(data['categories'],
+                         self.client.get('/api/product/categories/').json())
+        self.assertEqual(data['services'],
+                         self.client.get('/api/service/services/').json())
+
+    def test_cached_and_rebuilt_in_background(self):
+        first = self.client.get('/api/home/').json()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get('/api/home/').json(), first)
+
+        # views do not invalidate the page
+        generation = home_payload._generation()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(f'/api/product/products/{self.product.pk}/')
+        self.assertEqual(home_payload._generation(), generation)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = 'Renamed'
+            self.product.save()
+
+        with self.assertNumQueries(0):
+            data = self.client.get('/api/home/').json()
+        self.assertEqual(data['trending'][-1]['name'], 'Renamed')
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class CategoryTests(TestCase):
+    """Test the category list counts and the category product pages."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.category = models.Category.objects.create(name='Category')
+        models.Category.objects.create(name='Empty')
+        self.products = [
+            create_product(self.category, name=f'Product{i}') for i in range(7)]
+        self.url = f'/api/product/categories/{self.category.pk}/'
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_list_counts_products(self):
+        with self.assertNumQueries(1):
+            res = self.client.get('/api/product/categories/')
+
+        counts = {category['name']: category['product_count'] for category in res.json()}
+        self.assertEqual(counts, {'Category': 7, 'Empty': 0})
+
+    def test_products_paged_through_nested_route(self):
+        res = self.client.get(f'{self.url}products/', {'page': 2})
+
+        page = res.json()
+        self.assertEqual(page['count'], 7)
+        self.assertEqual([product['id'] for product in page['results']],
+                         [product.pk for product in self.products[5:]])
+        self.assertIsNone(page['links']['next'])
+        self.assertEqual(page['links']['previous'], f'http://testserver{self.url}products/')
+        self.assertEqual(self.client.get(self.url, {'page': 2}).json()['products'], page)
+        self.assertEqual(self.client.get(self.url, {'page': 3}).status_code, 404)
+        self.assertEqual(self.client.get(f'{self.url}products/', {'page': 'x'}).status_code, 404)
+
+    def test_first_page_cached_until_products_change(self):
+        first = self.client.get(self.url).json()['products']
+        self.assertEqual(first['links']['next'], f'http://testserver{self.url}products/?page=2')
+
+        # the category only
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(f'{self.url}products/').json(), first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.products[0].name = 'Renamed'
+            self.products[0].save()
+
+        with self.assertNumQueries(1):
+            page = self.client.get(self.url).json()['products']
+        self.assertEqual(page['results'][0]['name'], 'Renamed')
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class WeeklyDealTests(TestCase):
+    """Test the current weekly deal is rendered ahead and served from the cache."""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        category = models.Category.objects.create(name='Category')
+        self.product = create_product(category, name='Deal')
+        models.ProductImage.objects.create(
+            product=self.product, is_thumbnail=True,
+            image=SimpleUploadedFile('p.jpg', b'', content_type='image/jpeg'))
+        self.now = timezone.now()
+        self.current = models.WeeklyDeal.objects.create(
+            product=self.product, starts_at=self.now - timedelta(days=1),
+            ends_at=self.now + timedelta(hours=1))
+        self.next = models.WeeklyDeal.objects.create(
+            product=create_product(category, name='Next'),
+            starts_at=self.now + timedelta(hours=1))
+        self.url = '/api/product/weekly-deal/latest/'
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_scheduled_from_the_deal_day(self):
+        deal = models.WeeklyDeal.objects.create(product=self.product, deal_time=date(2023, 11, 5))
+
+        self.assertEqual(deal.starts_at.isoformat(), '2023-11-05T00:00:00+00:00')
+        self.assertEqual(deal.ends_at - deal.starts_at, timedelta(weeks=1))
+        self.assertEqual(self.next.deal_time, timezone.localdate(self.next.starts_at))
+
+    def test_current_deal_cached(self):
+        data = self.client.get(self.url).json()
+        self.assertEqual(data['id'], self.current.pk)
+        self.assertEqual(data['product']['name'], 'Deal')
+        self.assertTrue(data['product']['thumbnail']['image'].endswith('.jpg'))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).json(), data)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.product.name = 'Renamed'
+            self.product.save()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).json()['product']['name'], 'Renamed')
+
+    def test_next_deal_rendered_before_it_starts(self):
+        self.client.get(self.url)
+        self.assertEqual(warm_weekly_deal(ahead=60, now=self.now), 0)
+        self.assertEqual(warm_weekly_deal(ahead=7200, now=self.now), 1)
+
+        with patch('django.utils.timezone.now',
+                   return_value=self.now + timedelta(hours=1, seconds=1)), \
+                self.assertNumQueries(0):
+            data = self.client.get(self.url).json()
+        self.assertEqual(data['id'], self.next.pk)
+
+    def test_home_switches_deal_at_boundary(self):
+        self.assertEqual(self.client.get('/api/home/').json()['weekly_deal']['id'],
+                         self.current.pk)
+        warm_weekly_deal(ahead=7200, now=self.now)
+
+        with patch('django.utils.timezone.now',
+                   return_value=self.now + timedelta(hours=1, seconds=1)), \
+                self.assertNumQueries(0):
+            data = self.client.get('/api/home/').json()
+        self.assertEqual(data['weekly_deal']['id'], self.next.pk)
+
+    def test_no_current_deal(self):
+        models.WeeklyDeal.objects.all().delete()
+
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class EffectivePriceTests(TestCase):
+    """Test the product list sorts and filters on the effective price."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.factory = AsyncRequestFactory()
+        self.category = models.Category.objects.create(name='Category')
+        self.full = create_product(self.category, name='Full', price=Decimal('30.00'))
+        self.sale = create_product(self.category, name='Sale', price=Decimal('50.00'),
+                                   is_on_sale=True, sale_amount=50)
+        self.cheap = create_product(self.category, name='Cheap', price=Decimal('20.00'),
+                                    is_on_sale=True, sale_amount=15)
+
+    def names(self, params):
+        res = self.client.get('/api/product/products/', params)
+        return [product['name'] for product in res.json()['results']]
+
+    def test_stored_when_sale_fields_change(self):
+        self.assertEqual(self.sale.effective_price, Decimal('25.00'))
+        self.assertEqual(self.cheap.effective_price, Decimal('17.00'))
+
+        self.full.is_on_sale = True
+        self.full.sale_amount = 33
+        self.full.save(update_fields=['is_on_sale', 'sale_amount'])
+        self.full.refresh_from_db()
+        self.assertEqual(self.full.effective_price, Decimal('20.10'))
+
+        product, = models.Product.objects.bulk_create([models.Product(
+            name='Bulk', price=Decimal('9.99'), stock=1, category=self.category,
+            is_on_sale=True, sale_amount=10)])
+        self.assertEqual(models.Product.objects.get(pk=product.pk).effective_price,
+                         Decimal('8.99'))
+
+    def test_ordering_by_price_uses_sale(self):
+        self.assertEqual(self.names({'ordering': 'price'}), ['Cheap', 'Sale', 'Full'])
+        self.assertEqual(self.names({'ordering': '-price'}), ['Full', 'Sale', 'Cheap'])
+
+    def test_price_range_filters(self):
+        self.assertEqual(self.names({'min_price': '20', 'ordering': 'price'}),
+                         ['Sale', 'Full'])
+        self.assertEqual(self.names({'max_price': '25.01', 'category': self.category.pk,
+                                     'ordering': 'price'}), ['Cheap', 'Sale'])
+        self.assertEqual(len(self.names({'min_price': 'x', 'max_price': 'nan', 'ordering': 'price'})), 3)
+
+    async def test_async_list_matches(self):
+        request = self.factory.get('/api/product/products/',
+                                   {'ordering': '-price', 'max_price': '26'})
+        res = await async_views.product_list(request)
+
+        names = [product['name'] for product in json.loads(res.content)['results']]
+        self.assertEqual(names, ['Sale', 'Cheap'])
+
+
+@override_settings(BACKGROUND_TASKS_EAGER=True)
+class FacetTests(TestCase):
+    """Test the product search counts every facet value in one query."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            email='user@example.com',
+            password='testpass123',
+            mobile_phone='01000000000',
+        )
+        self.category = models.Category.objects.create(name='Category')
+        other = models.Category.objects.create(name='Other')
+        self.products = [
+            create_product(self.category, name='Cheap', price=Decimal('30.00')),
+            create_product(self.category, name='Sale', price=Decimal('120.00'),
+                           is_on_sale=True, sale_amount=50),
+            create_product(self.category, name='Sold out', price=Decimal('80.00'), stock=0),
+            create_product(self.category, name='Premium', price=Decimal('600.00')),
+            create_product(other, name='Elsewhere', price=Decimal('30.00')),
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            for product, rating in zip(self.products, [5, 4, 2, 3, 5]):
+                models.Rating.objects.create(product=product, user=self.user, rating=rating)
+
+    def search(self, params):
+        res = self.client.get('/api/product/products/search/',
+                              {'category': self.category.pk, 'ordering': 'price', **params})
+        return res.json()
+
+    def counts(self, facets, name):
+        return [value['count'] for value in facets[name]]
+
+    def test_rating_average_follows_ratings(self):
+        product = self.products[0]
+        with self.captureOnCommitCallbacks(execute=True):
+            rating = models.Rating.objects.create(product=product, user=self.user, rating=2)
+        product.refresh_from_db()
+        self.assertEqual(product.rating_average, 3.5)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rating.delete()
+        product.refresh_from_db()
+        self.assertEqual(product.rating_average, 5)
+
+    def test_counts_every_facet_value(self):
+        # count, page, thumbnails and the facet counts
+        with self.assertNumQueries(4):
+            data = self.search({})
+
+        self.assertEqual(data['count'], 4)
+        facets = data['facets']
+        self.assertEqual(facets['price'][0], {'min_price': None, 'max_price': 50, 'count': 1})
+        self.assertEqual(self.counts(facets, 'price'), [1, 2, 0, 0, 1])
+        self.assertEqual(self.counts(facets, 'rating'), [2, 3, 4, 4])
+        self.assertEqual(self.counts(facets, 'in_stock'), [3])
+        self.assertEqual(self.counts(facets, 'on_sale'), [1])
+
+    def test_boundary_prices_counted_once(self):
+        for price in ('50.00', '100.00'):
+            create_product(self.category, name=price, price=Decimal(price))
+
+        data = self.search({})
+
+        self.assertEqual(self.counts(data['facets'], 'price'), [1, 3, 1, 0, 1])
+        self.assertEqual(sum(self.counts(data['facets'], 'price')), data['count'])
+        picked = self.search({'min_price': 50, 'max_price': 100})
+        self.assertEqual(picked['count'], 3)
+        self.assertNotIn('100.00', [product['name'] for product in picked['results']])
+
+    def test_facet_counted_under_the_other_facets(self):
+        data = self.search({'min_price': 50, 'max_price': 100, 'in_stock': 1})
+
+        self.assertEqual([product['name'] for product in data['results']], ['Sale'])
+        facets = data['facets']
+        # the other price ranges of the products in stock
+        self.assertEqual(self.counts(facets, 'price'), [1, 1, 0, 0, 1])
+        self.assertEqual(self.counts(facets, 'rating'), [1, 1, 1, 1])
+        self.assertEqual(self.counts(facets, 'in_stock'), [1])
+        self.assertEqual(self.counts(facets, 'on_sale'), [1])
+
+        data = self.search({'min_rating': 4})
+        self.assertEqual([product['name'] for product in data['results']], ['Cheap', 'Sale'])
+        self.assertEqual(self.counts(data['facets'], 'rating'), [2, 3, 4, 4])
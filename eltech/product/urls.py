@@ -1,11 +1,12 @@
 """
 URL mappings for the product app.
 """
+from django.conf import settings
 from django.urls import path, include
 
 from rest_framework.routers import DefaultRouter
 
-from product import views
+from product import async_views, views
 
 router = DefaultRouter()
 router.register('products', views.ProductViewSet)
@@ -22,3 +23,20 @@ urlpatterns = [
     path('products/<int:pk>/reviews/<int:review_id>/', views.ProductViewSet.as_view({'delete': 'delete_review'}),
          name='product-review-delete'),
 ]
+
+if settings.ASYNC_CATALOG_VIEWS:
+    # matched before the viewset routes, see product/async_views.py
+    urlpatterns = [
+        path('products/', async_views.product_list, name='product-list-async'),
+        path('products/search/', async_views.product_search,
+             name='product-search-async'),
+        path('products/<int:pk>/', async_views.product_detail,
+             name='product-detail-async'),
+        path('categories/', async_views.category_list, name='category-list-async'),
+        path('categories/<int:pk>/', async_views.category_detail,
+             name='category-detail-async'),
+        path('categories/<int:pk>/products/', async_views.category_products,
+             name='category-products-async'),
+        path('weekly-deal/latest/', async_views.weekly_deal_latest,
+             name='weeklydeal-latest-async'),
+    ] + urlpatterns
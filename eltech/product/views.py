@@ -11,97 +11,253 @@ from drf_spectacular.utils import (
 from rest_framework import views, viewsets, mixins, status
 
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
-from rest_framework.authentication import TokenAuthentication
+from core.authentication import CachedTokenAuthentication
+from core.fastserializers import FastListModelMixin
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.filters import OrderingFilter
 from rest_framework.pagination import PageNumberPagination
 
-from django.db.models import Q
+from django.conf import settings
+from django.db.models import Avg, Count, OuterRef, Prefetch, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils.functional import cached_property
 
-from core.models import Product, WeeklyDeal, Category, Review
+from core.models import Product, WeeklyDeal, Category, Rating, Review, \
+    related_products_prefetch
+from core.serializers import sparse_fields
+from core.trending import count_view
 
-from product import serializers
+from product import categories, deals, serializers
+from product import facets as product_facets
 
 
 class ProductPagination(PageNumberPagination):
     page_size = 12
 
 
+PRODUCT_FIELDS = serializers.ProductSerializer.Meta.fields
+PRODUCT_DETAIL_FIELDS = serializers.ProductDetailSerializer.Meta.fields + [
+    'average_rating', 'reviews_count', 'related_products']
+
+FIELDS_PARAMETERS = [
+    OpenApiParameter(
+        "fields",
+        OpenApiTypes.STR,
+        description="Comma separated fields to return instead of the default ones.",
+    ),
+    OpenApiParameter(
+        "expand",
+        OpenApiTypes.STR,
+        description="Comma separated detail fields to add, e.g. category,images.",
+    ),
+]
+
+
+FACET_PARAMETERS = [
+    OpenApiParameter(
+        "min_price",
+        OpenApiTypes.DECIMAL,
+        description="Lowest effective price, the sale applied, to return.",
+    ),
+    OpenApiParameter(
+        "max_price",
+        OpenApiTypes.DECIMAL,
+        description="Effective price, the sale applied, the products are below.",
+    ),
+    OpenApiParameter(
+        "min_rating",
+        OpenApiTypes.DECIMAL,
+        description="Lowest average rating to return.",
+    ),
+    OpenApiParameter(
+        "in_stock",
+        OpenApiTypes.INT,
+        enum=[0, 1],
+        description="Return the products in stock only.",
+    ),
+    OpenApiParameter(
+        "on_sale",
+        OpenApiTypes.INT,
+        enum=[0, 1],
+        description="Return the products on sale only.",
+    ),
+]
+
+
+def price_ordering(terms):
+    """Sort the `price` ordering terms by the effective price."""
+    return [term.replace('price', 'effective_price') for term in terms]
+
+
+class ProductOrderingFilter(OrderingFilter):
+    """OrderingFilter sorting `?ordering=price` by the effective price."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        return ordering and price_ordering(ordering)
+
+
+def filter_products(queryset, params, facets=True):
+    """Apply the product list query parameters to a queryset, facets unless told not to."""
+    is_featured = bool(int(params.get("is_featured", 0)))
+    is_trending = bool(int(params.get("is_trending", 0)))
+    is_popular = bool(int(params.get("is_popular", 0)))
+    category = params.get('category', None)
+    query = params.get("q")
+
+    if category is not None:
+        queryset = queryset.filter(category__id=category)
+
+    # covered by the product indexes, see product/facets.py
+    if facets:
+        queryset = queryset.filter(*product_facets.facet_filters(params).values())
+
+    if query:
+        queryset = queryset.filter(
+            Q(name__icontains=query) | Q(description__icontains=query)
+        )
+
+    if is_featured:
+        queryset = queryset.filter(is_featured=True)
+
+    if is_trending:
+        queryset = queryset.filter(is_trending=True).order_by('-trending_score')
+
+    if is_popular:
+        queryset = queryset.popular(category)
+
+    return queryset
+
+
+def prefetch_product_fields(queryset, fields=None):
+    """Load the relations read by the detail `fields` (all when None)."""
+    def wants(name):
+        return fields is None or name in fields
+
+    if wants('category'):
+        queryset = queryset.select_related('category')
+    if wants('thumbnail'):
+        queryset = queryset.with_thumbnail()
+    if wants('reviews'):
+        queryset = queryset.prefetch_related(
+            Prefetch('reviews', queryset=Review.objects.select_related('user')))
+    if wants('related_products'):
+        queryset = queryset.prefetch_related(related_products_prefetch())
+    lookups = [name for name in ['images', 'features', 'ratings'] if wants(name)]
+    queryset = queryset.prefetch_related(*lookups)
+
+    # aggregated per product in the same query, see ProductDetailSerializer
+    if wants('average_rating'):
+        queryset = queryset.annotate(average_rating=Subquery(
+            Rating.objects.filter(product=OuterRef('pk')).values('product')
+            .annotate(value=Avg('rating')).values('value')))
+    if wants('reviews_count'):
+        queryset = queryset.annotate(reviews_count=Coalesce(Subquery(
+            Review.objects.filter(product=OuterRef('pk')).values('product')
+            .annotate(value=Count('pk')).values('value')), 0))
+    return queryset
+
+
+LIST_PARAMETERS = [
+    OpenApiParameter(
+        "is_featured",
+        OpenApiTypes.INT,
+        enum=[0, 1],
+        description="Get featured products only.",
+    ),
+    OpenApiParameter(
+        "is_trending",
+        OpenApiTypes.INT,
+        enum=[0, 1],
+        description="Get trending products only.",
+    ),
+    OpenApiParameter(
+        "is_popular",
+        OpenApiTypes.INT,
+        enum=[0, 1],
+        description="Get popular products only.",
+    ),
+    OpenApiParameter(
+        "q",
+        OpenApiTypes.STR,
+        description="Search products by name or description.",
+    ),
+    OpenApiParameter(
+        "category",
+        OpenApiTypes.INT,
+        description="Get products according to category id.",
+    ),
+]
+
+
 @extend_schema_view(
     list=extend_schema(
+        parameters=LIST_PARAMETERS + FACET_PARAMETERS + FIELDS_PARAMETERS
+    ),
+    retrieve=extend_schema(parameters=FIELDS_PARAMETERS),
+    batch=extend_schema(
         parameters=[
             OpenApiParameter(
-                "is_featured",
-                OpenApiTypes.INT,
-                enum=[0, 1],
-                description="Get featured products only.",
-            ),
-            OpenApiParameter(
-                "is_trending",
-                OpenApiTypes.INT,
-                enum=[0, 1],
-                description="Get trending products only.",
-            ),
-            OpenApiParameter(
-                "is_popular",
-                OpenApiTypes.INT,
-                enum=[0, 1],
-                description="Get popular products only.",
-            ),
-            OpenApiParameter(
-                "q",
+                "ids",
                 OpenApiTypes.STR,
-                description="Search products by name or description.",
+                required=True,
+                description="Comma separated ids of the products, in the order to return them.",
             ),
             OpenApiParameter(
-                "category",
+                "detail",
                 OpenApiTypes.INT,
-                description="Get products according to category id.",
+                enum=[0, 1],
+                description="Return detail representations instead of product cards.",
             ),
-        ]
-    )
+        ] + FIELDS_PARAMETERS
+    ),
 )
 class ProductViewSet(
-    mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
+    FastListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet
 ):
     """Views for manage product APIs."""
 
     serializer_class = serializers.ProductDetailSerializer
+    fast_serializer_class = serializers.FastProductSerializer
     queryset = Product.objects.all()
-    authentication_classes = [TokenAuthentication]
-    filter_backends = [OrderingFilter]
+    authentication_classes = [CachedTokenAuthentication]
+    filter_backends = [ProductOrderingFilter]
     ordering_fields = ["price"]
     pagination_class = ProductPagination
 
     def get_queryset(self):
         """Filter queryset for products."""
-        is_featured = bool(int(self.request.query_params.get("is_featured", 0)))
-        is_trending = bool(int(self.request.query_params.get("is_trending", 0)))
-        is_popular = bool(int(self.request.query_params.get("is_popular", 0)))
-        category = self.request.query_params.get('category', None)
-        # ordering = self.request.query_params.get("ordering", 0)
-        query = self.request.query_params.get("q")
-        queryset = self.queryset.prefetch_related('ratings')
-
-        if category is not None:
-            queryset = queryset.filter(category__id=category)
-
-        if query:
-            queryset = queryset.filter(
-                Q(name__icontains=query) | Q(description__icontains=query)
-            )
-
-        if is_featured:
-            queryset = queryset.filter(is_featured=True)
-
-        if is_trending:
-            queryset = queryset.filter(is_trending=True)
-
-        if is_popular:
-            queryset = queryset.order_by("-view_count")
-
-        return queryset
+        queryset = self.queryset
+        if self.action == "retrieve" or self.is_expanded():
+            queryset = prefetch_product_fields(queryset, self.selected_fields)
+        return filter_products(queryset, self.request.query_params)
+
+    @cached_property
+    def selected_fields(self):
+        """Fields asked for with `?fields=` and `?expand=`, None for the defaults."""
+        if getattr(self, "request", None) is None:
+            return None
+        default = PRODUCT_FIELDS if self.returns_cards() else PRODUCT_DETAIL_FIELDS
+        return sparse_fields(
+            self.request.query_params, default, PRODUCT_DETAIL_FIELDS)
+
+    def returns_cards(self):
+        """Return whether the action answers with the product list fields."""
+        if self.action == "batch":
+            return not bool(int(self.request.query_params.get("detail", 0)))
+        return self.action in ["list", "search"]
+
+    def is_expanded(self):
+        """Return whether product cards are asked for more than their fields."""
+        return self.returns_cards() and self.selected_fields is not None \
+            and not self.selected_fields <= set(PRODUCT_FIELDS)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"] = self.selected_fields
+        return context
 
     def get_permissions(self):
         """
@@ -115,19 +271,71 @@ class ProductViewSet(
 
     def get_serializer_class(self):
         """Return the serializer class for request."""
-        if self.action == "list":
+        if self.returns_cards() and not self.is_expanded():
             return serializers.ProductSerializer
 
         return self.serializer_class
 
+    def list(self, request, *args, **kwargs):
+        """List products, through the serializer when details are expanded."""
+        if self.is_expanded():
+            return mixins.ListModelMixin.list(self, request, *args, **kwargs)
+        return super().list(request, *args, **kwargs)
+
     def retrieve(self, request, *args, **kwargs):
         """Retrieve a product and increment the views_count."""
         instance = self.get_object()
         instance.view_count += 1
-        instance.save()
+        # a view is not an edit, see product/home.py
+        instance.save(update_fields=["view_count"])
+        count_view(instance.pk)
         serializer = self.get_serializer(instance)
         return Response(serializer.data)
 
+    @extend_schema(parameters=LIST_PARAMETERS + [
+        OpenApiParameter("page", OpenApiTypes.INT, description="Page number of the results."),
+        OpenApiParameter("ordering", OpenApiTypes.STR, enum=["price", "-price"],
+                         description="Sort by effective price."),
+    ] + FACET_PARAMETERS + FIELDS_PARAMETERS)
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """List products with the counts of every facet value, see product/facets.py."""
+        response = self.list(request)
+        queryset = filter_products(Product.objects.all(), request.query_params, facets=False)
+        response.data["facets"] = product_facets.facet_counts(queryset, request.query_params)
+        return response
+
+    @action(detail=False, methods=["get"])
+    def batch(self, request):
+        """Retrieve the products of `?ids=`, in that order, without counting views."""
+        try:
+            ids = [int(pk) for pk in request.query_params.get("ids", "").split(",") if pk.strip()]
+        except ValueError:
+            return Response(
+                {"detail": "ids must be comma separated integers."},
+                status=status.HTTP_400_BAD_REQUEST)
+        ids = list(dict.fromkeys(ids))
+        if len(ids) > settings.PRODUCT_BATCH_MAX_IDS:
+            return Response(
+                {"detail": f"At most {settings.PRODUCT_BATCH_MAX_IDS} ids can be requested."},
+                status=status.HTTP_400_BAD_REQUEST)
+
+        queryset = Product.objects.filter(pk__in=ids)
+        context = self.get_serializer_context()
+        if self.returns_cards() and not self.is_expanded():
+            rows = list(self.fast_serializer_class.values(queryset, self.selected_fields))
+            data = self.fast_serializer_class(rows, context=context).data
+            products = {row["id"]: item for row, item in zip(rows, data)}
+        else:
+            instances = list(prefetch_product_fields(queryset, self.selected_fields))
+            data = self.get_serializer(instances, many=True).data
+            products = {instance.pk: item for instance, item in zip(instances, data)}
+
+        return Response({
+            "results": [products[pk] for pk in ids if pk in products],
+            "missing": [pk for pk in ids if pk not in products],
+        })
+
     @extend_schema(request=serializers.ReviewSerializer)
     @action(detail=True, methods=["post"])
     def reviews(self, request, pk=None):
@@ -179,13 +387,42 @@ class CategoryViewSet(
     serializer_class = serializers.CategoryDetailSerializer
     queryset = Category.objects.all()
 
+    def get_queryset(self):
+        """Count the products of the listed categories in the same query."""
+        if self.action == "list":
+            return self.queryset.with_product_count()
+        return self.queryset
+
     def get_serializer_class(self):
         """Return the serializer class for request."""
         if self.action == "list":
-            return serializers.CategorySerializer
+            return serializers.CategoryListSerializer
 
         return self.serializer_class
 
+    def retrieve(self, request, *args, **kwargs):
+        """Retrieve a category with the `?page=` of its products."""
+        instance = self.get_object()
+        page = categories.products_page(request, instance.pk)
+        if page is None:
+            raise NotFound("Invalid page.")
+        serializer = self.get_serializer(
+            instance, context={**self.get_serializer_context(), "products_page": page})
+        return Response(serializer.data)
+
+    @extend_schema(
+        parameters=[OpenApiParameter("page", OpenApiTypes.INT)],
+        responses={200: OpenApiTypes.OBJECT},
+    )
+    @action(detail=True, methods=["get"])
+    def products(self, request, pk=None):
+        """Page through the products of a category, the first page cached."""
+        instance = self.get_object()
+        page = categories.products_page(request, instance.pk)
+        if page is None:
+            raise NotFound("Invalid page.")
+        return Response(page)
+
 
 class WeeklyDealViewSet(viewsets.GenericViewSet):
     """Views for manage weekly deal APIs."""
@@ -195,7 +432,8 @@ class WeeklyDealViewSet(viewsets.GenericViewSet):
 
     @action(detail=False, methods=["get"])
     def latest(self, request):
-        """Retrieve the latest weekly deal."""
-        weekly_deal = WeeklyDeal.objects.latest("deal_time")
-        serializer = self.get_serializer(weekly_deal)
-        return Response(serializer.data)
+        """Retrieve the current weekly deal, rendered ahead, see product/deals.py."""
+        payload = deals.current_payload(request)
+        if payload is None:
+            raise NotFound()
+        return Response(payload)
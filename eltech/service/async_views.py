@@ -0,0 +1,13 @@
+"""
+Async variant of the service list, routed when ASYNC_CATALOG_VIEWS is set.
+"""
+from core.async_views import fetch, json_response, safe_methods_only
+from core.models import Service
+from service import serializers
+
+
+@safe_methods_only
+async def service_list(request):
+    services = await fetch(Service.objects.all())
+    return json_response(serializers.ServiceSerializer(
+        services, many=True, context={'request': request}).data)
@@ -3,12 +3,15 @@ Serialization of service app
 """
 from rest_framework import serializers
 from core.models import Service
+from core.serializers import SrcsetField
 from rest_framework.exceptions import ValidationError
 
 
 class ServiceSerializer(serializers.ModelSerializer):
     """Serializer for services."""
+    logo_srcset = SrcsetField()
+
     class Meta:
         model = Service
-        fields = ['id', 'description', 'title', 'logo']
+        fields = ['id', 'description', 'title', 'logo', 'logo_srcset']
         read_only_fields = ['id']
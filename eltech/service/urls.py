@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 from .views import ServiceViewSet
+from . import async_views
 
 router = DefaultRouter()
 router.register('services', ServiceViewSet, basename='services')
@@ -10,3 +12,7 @@ app_name = 'service'
 urlpatterns = [
     path('', include(router.urls)),
 ]
+
+if settings.ASYNC_CATALOG_VIEWS:
+    urlpatterns.insert(0, path('services/', async_views.service_list,
+                               name='services-list-async'))
@@ -1,5 +1,5 @@
 from rest_framework import viewsets, status
-from rest_framework.authentication import TokenAuthentication
+from core.authentication import CachedTokenAuthentication
 from rest_framework.permissions import IsAuthenticated, IsAdminUser, AllowAny
 from rest_framework.response import Response
 
@@ -11,7 +11,7 @@ class ServiceViewSet(viewsets.ReadOnlyModelViewSet):
     """View for the manage service APIs"""
     serializer_class = serializers.ServiceSerializer
     queryset = Service.objects.all()
-    authentication_classes = [TokenAuthentication]
+    authentication_classes = [CachedTokenAuthentication]
     permission_classes = [IsAuthenticated]
 
     def get_permissions(self):
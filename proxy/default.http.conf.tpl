@@ -0,0 +1,15 @@
+server {
+    listen ${LISTEN_PORT};
+
+    location /static {
+        alias /vol/static;
+    }
+
+    location / {
+        proxy_pass           http://${APP_HOST}:${APP_PORT};
+        proxy_set_header     Host $host;
+        proxy_set_header     X-Forwarded-For $remote_addr;
+        proxy_set_header     X-Forwarded-Proto $scheme;
+        client_max_body_size 10M;
+    }
+}
\ No newline at end of file
@@ -2,5 +2,10 @@
 
 set -e
 
-envsubst < /etc/nginx/default.conf.tpl > /etc/nginx/conf.d/default.conf
+if [ "$APP_PROTOCOL" = "http" ]; then
+    envsubst '${LISTEN_PORT} ${APP_HOST} ${APP_PORT}' \
+        < /etc/nginx/default.http.conf.tpl > /etc/nginx/conf.d/default.conf
+else
+    envsubst < /etc/nginx/default.conf.tpl > /etc/nginx/conf.d/default.conf
+fi
 nginx -g 'daemon off;'
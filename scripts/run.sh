@@ -4,6 +4,12 @@ set -e
 
 python manage.py wait_for_db
 python manage.py collectstatic --noinput
+python manage.py generate_schema
 python manage.py migrate
 
-uwsgi --socket :9000 --workers 4 --master --enable-threads --module app.wsgi
+if [ "$ASGI" = "true" ]; then
+    # plain HTTP, the proxy needs APP_PROTOCOL=http
+    uvicorn eltech.asgi:application --host 0.0.0.0 --port 9000 --workers 4
+else
+    uwsgi --socket :9000 --workers 4 --master --enable-threads --module app.wsgi
+fi
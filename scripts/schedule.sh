@@ -0,0 +1,27 @@
+#!/bin/sh
+
+# Runs the periodic jobs: the weekly deal warm-up every minute, the
+# popular ranking every 10 minutes, the trending scores and the related
+# products every hour. A failed job is retried at its next slot.
+
+python manage.py wait_for_db || exit 1
+
+last_popular=0
+last_hourly=0
+while true; do
+    now=$(date +%s)
+
+    python manage.py warm_weekly_deal
+    if [ $((now - last_popular)) -ge 600 ]; then
+        python manage.py rank_popular_products
+        last_popular=$now
+    fi
+    if [ $((now - last_hourly)) -ge 3600 ]; then
+        python manage.py score_trending_products
+        python manage.py update_related_products
+        last_hourly=$now
+    fi
+
+    # wake up on the next minute after this round started
+    sleep $((60 - ($(date +%s) - now) % 60))
+done